@@ -0,0 +1,103 @@
+"""
+Benchmark Luxafor write latency and throughput: direct HID transport vs the luxafor library path
+
+By default both paths run against in-memory devices, which measures the
+host-side cost per status change (report building, framing and the calls
+down to the USB write). The library path is modelled on pyluxafor's write():
+a fresh command list per call and every command sent twice. With --hardware
+the same loop drives a real flag through both paths.
+
+    python benchmarks/luxafor_transport.py [--writes N] [--hardware]
+"""
+import argparse
+import array
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mic_monitor.devices.luxafor import LuxaforDevice  # noqa: E402
+from mic_monitor.devices.luxafor_hid import HidTransport, LoopbackBackend, transport_factory  # noqa: E402
+from mic_monitor.devices.luxafor_protocol import LibraryTransport  # noqa: E402
+
+COLORS = [(255, 0, 0), (0, 255, 0), (255, 255, 0)]
+
+
+class _LoopbackUsbDevice:
+    """Stands in for a pyusb device; pyusb converts each payload to an array"""
+
+    def __init__(self):
+        self.writes = 0
+
+    def write(self, endpoint, data, timeout=None):
+        self.writes += 1
+        return len(array.array('B', data))
+
+
+class _LibraryStandIn:
+    """Same call pattern as the luxafor library: look up the device and write each command twice"""
+
+    def __init__(self):
+        self.device = _LoopbackUsbDevice()
+
+    def get_device(self):
+        return self.device
+
+    def write(self, values):
+        self.get_device().write(1, values)
+        self.get_device().write(1, values)
+
+
+def run(device, writes):
+    """Alternate colors, returning per-write latencies in microseconds"""
+    latencies = []
+    perf_counter = time.perf_counter
+    for i in range(writes):
+        r, g, b = COLORS[i % len(COLORS)]
+        started = perf_counter()
+        if not device.set_color(r, g, b):
+            raise RuntimeError(device.status['error'])
+        latencies.append((perf_counter() - started) * 1e6)
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    total = sum(latencies) / 1e6
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<22} median {statistics.median(latencies):8.2f} µs   "
+          f"p99 {p99:8.2f} µs   {len(latencies) / total:12,.0f} writes/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writes', type=int, default=100_000)
+    parser.add_argument('--hardware', action='store_true', help="drive a plugged-in flag")
+    args = parser.parse_args()
+
+    if args.hardware:
+        from luxafor import luxafor
+        paths = [
+            ('luxafor library', lambda: LibraryTransport(luxafor.Luxafor())),
+            ('direct HID', transport_factory('auto')),
+        ]
+    else:
+        paths = [
+            ('luxafor library', lambda: LibraryTransport(_LibraryStandIn())),
+            ('direct HID', lambda: HidTransport(LoopbackBackend())),
+        ]
+
+    for name, factory in paths:
+        device = LuxaforDevice(transport_factory=factory)
+        if not device.attach():
+            print(f"{name}: {device.status['error']}")
+            continue
+        run(device, min(1000, args.writes))  # warm up caches
+        report(name, run(device, args.writes))
+        device.transport.close()
+
+
+if __name__ == '__main__':
+    main()
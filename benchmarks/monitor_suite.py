@@ -0,0 +1,385 @@
+"""
+Benchmark the monitor tick, status decision, tray builders and device fan-out
+
+Drives SecureMicrophoneMonitor against a scripted platform backend and null
+devices, so it runs on any Linux box without a microphone, tray or flag:
+
+  tick       per-tick latency percentiles of SecureMicrophoneMonitor.tick()
+  alloc      bytes allocated per tick and blocks retained over the run
+  decision   StatusManager.update_status() per call
+  tray       icon lookup, menu key/lookup/build and status text per call
+  fanout     refresh() return time and time until every device has the
+             new status, for 1, 4 and 16 devices with 2 ms writes
+  idle       wakeups and context switches per idle hour, summed over all
+             threads from /proc/self/task/*/status and schedstat
+
+Results are written as JSON; --compare reports changes against a saved
+baseline and exits non-zero when a metric is more than --threshold worse.
+
+    python benchmarks/monitor_suite.py [--quick] [--save benchmarks/baseline.json]
+    python benchmarks/monitor_suite.py --compare benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Smallest increase that counts as a regression, in the metric's own unit.
+# Baselines smaller than this (retained blocks hover around zero and may be
+# negative) are judged on the absolute increase instead of a percentage.
+MIN_INCREASE = {'alloc.retained_blocks': 100}
+DEFAULT_MIN_INCREASE = 1.0
+
+
+def _install_tray_stand_in():
+    """Use pystray if it imports here, else a stand-in with the parts menus are built from"""
+    try:
+        import pystray  # noqa: F401
+        return 'pystray'
+    except Exception:
+        pass
+
+    class MenuItem:
+        def __init__(self, text, action=None, checked=None, **kwargs):
+            self.text, self.action, self.checked = text, action, checked
+
+    class Menu:
+        SEPARATOR = MenuItem('-')
+
+        def __init__(self, *items):
+            self.items = items
+
+    sys.modules['pystray'] = types.SimpleNamespace(Icon=None, Menu=Menu, MenuItem=MenuItem)
+    return 'stand-in'
+
+
+TRAY = _install_tray_stand_in()
+
+from mic_monitor.config import DEFAULTS  # noqa: E402
+from mic_monitor.devices.null import NullDevice  # noqa: E402
+from mic_monitor.platform import BACKEND_ENV, register_backend  # noqa: E402
+from mic_monitor.status_manager import StatusManager  # noqa: E402
+from secure_mic_monitor import SecureMicrophoneMonitor  # noqa: E402
+
+MEETING = {'in_use': True, 'using_apps': ['zoom.exe'], 'platform': 'bench'}
+IDLE = {'in_use': False, 'using_apps': [], 'platform': 'bench'}
+
+
+class ScriptedBackend:
+    """Platform backend that replays a list of statuses, one per get_status() call"""
+
+    def __init__(self):
+        self.script = [IDLE]
+        self.calls = 0
+
+    def get_status(self):
+        status = self.script[self.calls % len(self.script)]
+        self.calls += 1
+        return status
+
+
+class FakeTrayIcon:
+    """Takes the assignments update_icon() makes"""
+
+    icon = None
+    menu = None
+    title = None
+
+    def stop(self):
+        pass
+
+
+def bench_config():
+    config = dict(DEFAULTS)
+    # Transitions reach devices and the tray on the tick they happen
+    config.update(meeting_confirm_seconds=0, meeting_end_seconds=0, devices={}, metrics_interval=0)
+    return config
+
+
+def make_monitor(devices=1):
+    register_backend('bench', ScriptedBackend)
+    os.environ[BACKEND_ENV] = 'bench'
+    monitor = SecureMicrophoneMonitor(bench_config())
+    monitor.icon = FakeTrayIcon()
+    for _ in range(devices):
+        device = NullDevice()
+        device.connect()
+        monitor.status_manager.register_device(device)
+    return monitor
+
+
+def percentiles(samples_ns, prefix):
+    samples = sorted(samples_ns)
+
+    def at(q):
+        return samples[min(len(samples) - 1, int(q * len(samples)))] / 1000
+
+    return {
+        f'{prefix}.p50_us': at(0.50),
+        f'{prefix}.p95_us': at(0.95),
+        f'{prefix}.p99_us': at(0.99),
+        f'{prefix}.max_us': samples[-1] / 1000,
+        f'{prefix}.mean_us': statistics.fmean(samples) / 1000,
+    }
+
+
+def meeting_script(ticks, period):
+    """Mostly stable status with a meeting starting or ending every ``period`` ticks"""
+    return [MEETING if (i // period) % 2 else IDLE for i in range(ticks)]
+
+
+def bench_tick(ticks):
+    monitor = make_monitor()
+    monitor.mic_monitor.script = meeting_script(ticks, 200)
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(ticks):
+            started = time.perf_counter_ns()
+            monitor.tick()
+            samples.append(time.perf_counter_ns() - started)
+    monitor.status_manager.cleanup()
+    return percentiles(samples, 'tick')
+
+
+def bench_alloc(ticks):
+    monitor = make_monitor()
+    monitor.mic_monitor.script = meeting_script(ticks, 200)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm the icon, menu and report caches first
+        for _ in range(400):
+            monitor.tick()
+        monitor.status_manager.wait_for_devices(1.0)
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        allocated = 0
+        for _ in range(ticks):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            monitor.tick()
+            allocated += tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+    monitor.status_manager.wait_for_devices(1.0)
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks_before
+    monitor.status_manager.cleanup()
+    return {'alloc.bytes_per_tick': allocated / ticks, 'alloc.retained_blocks': retained}
+
+
+def bench_decision(calls):
+    config = bench_config()
+    manager = StatusManager(config)
+    samples = []
+    for i in range(calls):
+        busy = (i // 100) % 2 == 1
+        started = time.perf_counter_ns()
+        manager.update_status(busy)
+        samples.append(time.perf_counter_ns() - started)
+    manager.cleanup()
+    return percentiles(samples, 'decision')
+
+
+def _per_call(func, calls, rounds=5):
+    """Microseconds per call, best of ``rounds`` so a stray GC or preemption does not count"""
+    func()
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter_ns()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter_ns() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / calls / 1000
+
+
+def bench_tray(calls):
+    monitor = make_monitor(devices=0)
+    snapshot = monitor.status_manager.refresh(MEETING)
+    monitor.get_menu(snapshot)
+    results = {
+        'tray.icon_us': _per_call(lambda: monitor.create_icon_image(snapshot), calls),
+        'tray.menu_key_us': _per_call(lambda: monitor.menu_key(snapshot), calls),
+        'tray.menu_cached_us': _per_call(lambda: monitor.get_menu(snapshot), calls),
+        'tray.menu_build_us': _per_call(lambda: monitor.create_menu(snapshot), max(1, calls // 10)),
+        'tray.status_text_us': _per_call(lambda: monitor.update_status_text(snapshot), calls),
+    }
+    monitor.status_manager.cleanup()
+    return results
+
+
+def bench_fanout(transitions, latency=0.002):
+    results = {}
+    for count in (1, 4, 16):
+        manager = StatusManager(bench_config())
+        for _ in range(count):
+            device = NullDevice(latency)
+            device.connect()
+            manager.register_device(device)
+        returned, settled = [], []
+        for i in range(transitions):
+            started = time.perf_counter_ns()
+            manager.refresh(MEETING if i % 2 else IDLE)
+            returned.append(time.perf_counter_ns() - started)
+            manager.wait_for_devices(5.0)
+            settled.append(time.perf_counter_ns() - started)
+        manager.cleanup()
+        results[f'fanout.{count}.refresh_us'] = statistics.median(returned) / 1000
+        results[f'fanout.{count}.settled_us'] = statistics.median(settled) / 1000
+    return results
+
+
+def _read_task_counters():
+    """Context switches and times scheduled in, summed over every thread of this process"""
+    voluntary = involuntary = scheduled = 0
+    for task in os.listdir('/proc/self/task'):
+        try:
+            with open(f'/proc/self/task/{task}/status') as f:
+                for line in f:
+                    if line.startswith('voluntary_ctxt_switches'):
+                        voluntary += int(line.split()[1])
+                    elif line.startswith('nonvoluntary_ctxt_switches'):
+                        involuntary += int(line.split()[1])
+            with open(f'/proc/self/task/{task}/schedstat') as f:
+                scheduled += int(f.read().split()[2])
+        except (FileNotFoundError, ProcessLookupError):
+            # The thread exited while we were reading
+            continue
+    return voluntary, involuntary, scheduled
+
+
+def bench_idle(seconds):
+    if not os.path.exists('/proc/self/task'):
+        return {}
+    monitor = make_monitor()
+    monitor.mic_monitor.script = [IDLE]
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Settle the scheduler's interval first, as a monitor that has been idle for a while would have
+        for _ in range(50):
+            monitor.tick()
+        thread = threading.Thread(target=monitor.monitor_loop, daemon=True)
+        ticks_before = monitor.mic_monitor.calls
+        before = _read_task_counters()
+        started = time.monotonic()
+        thread.start()
+        time.sleep(seconds)
+        after = _read_task_counters()
+        elapsed = time.monotonic() - started
+        monitor.running = False
+        monitor._wakeup.set()
+        thread.join()
+    monitor.status_manager.cleanup()
+    per_hour = 3600 / elapsed
+    return {
+        'idle.ticks_per_hour': (monitor.mic_monitor.calls - ticks_before) * per_hour,
+        'idle.wakeups_per_hour': (after[2] - before[2]) * per_hour,
+        'idle.voluntary_switches_per_hour': (after[0] - before[0]) * per_hour,
+        'idle.involuntary_switches_per_hour': (after[1] - before[1]) * per_hour,
+    }
+
+
+def compare(results, settings, baseline_path, threshold):
+    """
+    Print each metric against the baseline.
+
+    Returns:
+        list: Names of metrics that grew by more than ``threshold`` of the
+        baseline's magnitude and by at least their MIN_INCREASE
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        document = json.load(f)
+    baseline = document['results']
+    if document.get('settings') != settings:
+        print(f"\nNote: baseline was recorded with {document.get('settings')}, this run used {settings}; "
+              "idle rates from windows of different length are not comparable")
+    regressions = []
+    print(f"\n{'metric':<40} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, value in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<40} {'-':>12} {value:>12.2f}")
+            continue
+        increase = value - old
+        floor = MIN_INCREASE.get(name, DEFAULT_MIN_INCREASE)
+        if abs(old) < floor:
+            regressed = increase > floor
+            change = f"{increase:>+8.2f}"
+        else:
+            regressed = increase > floor and increase / abs(old) > threshold
+            change = f"{increase / abs(old):>+8.0%}"
+        # Every metric here is a cost, so higher is worse; single worst samples are shown but not judged
+        flag = '  <-- regression' if regressed and not name.endswith('.max_us') else ''
+        if flag:
+            regressions.append(name)
+        print(f"{name:<40} {old:>12.2f} {value:>12.2f} {change}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quick', action='store_true', help="fewer iterations and a 5 s idle window")
+    parser.add_argument('--idle-seconds', type=float, help="idle window to measure (default 30, 5 with --quick)")
+    parser.add_argument('--save', nargs='?', const=BASELINE, help="write the results as a new baseline")
+    parser.add_argument('--compare', nargs='?', const=BASELINE, help="compare against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    scale = 0.2 if args.quick else 1.0
+    idle_seconds = args.idle_seconds or (5 if args.quick else 30)
+    settings = {'quick': args.quick, 'idle_seconds': idle_seconds}
+    results = {}
+    for name, run in [
+        ('tick', lambda: bench_tick(int(5000 * scale))),
+        ('alloc', lambda: bench_alloc(int(2000 * scale))),
+        ('decision', lambda: bench_decision(int(20000 * scale))),
+        ('tray', lambda: bench_tray(int(5000 * scale))),
+        ('fanout', lambda: bench_fanout(int(100 * scale))),
+        ('idle', lambda: bench_idle(idle_seconds)),
+    ]:
+        started = time.perf_counter()
+        section = run()
+        results.update(section)
+        print(f"{name:<9} done in {time.perf_counter() - started:5.1f} s")
+        for key, value in section.items():
+            print(f"  {key:<38} {value:12.2f}")
+
+    if args.compare:
+        regressions = compare(results, settings, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+    else:
+        regressions = []
+
+    if args.save:
+        document = {
+            'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'machine': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'tray': TRAY,
+            },
+            'settings': settings,
+            'results': results,
+        }
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nSaved {args.save}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
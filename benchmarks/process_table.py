@@ -0,0 +1,104 @@
+"""
+Measure the per-tick cost of process lookups on the Windows backend
+
+Replays one tick against synthetic process tables: the old path walked the
+whole process list once per registry entry and again per candidate app,
+the new path builds one ProcessTable and answers every check from it.
+Reports the time per tick and the number of processes read; on a real
+system each read is a kernel call, so the read count dominates.
+
+    python benchmarks/process_table.py [--sizes 100 1000 10000] [--registry 12] [--candidates 6]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mic_monitor.processes import ProcessTable  # noqa: E402
+
+APPS = ['teams.exe', 'zoom.exe', 'chrome.exe', 'msedge.exe', 'firefox.exe', 'slack.exe',
+        'discord.exe', 'obs64.exe', 'krisp.exe', 'nvidia broadcast.exe', 'skype.exe', 'vlc.exe']
+
+
+class FakeProcess:
+    """Stands in for the objects psutil.process_iter() yields"""
+
+    def __init__(self, pid, name):
+        self.info = {'pid': pid, 'name': name, 'create_time': 1700000000.0 + pid}
+
+
+class ProcessList:
+    """Counts how many processes each walk reads"""
+
+    def __init__(self, size):
+        # A few instances of each app at the end, the rest are background noise
+        self.processes = [FakeProcess(pid, f"svc{pid}.exe") for pid in range(size - 2 * len(APPS))]
+        for app in APPS:
+            for _ in range(2):
+                self.processes.append(FakeProcess(len(self.processes), app.upper()))
+        self.reads = 0
+
+    def process_iter(self):
+        for process in self.processes:
+            self.reads += 1
+            yield process
+
+
+def legacy_tick(processes, registry, candidates):
+    """The old _is_process_running() per registry entry plus a walk per candidate"""
+    for exe_name in registry:
+        for proc in processes.process_iter():
+            if proc.info['name'] and proc.info['name'].lower() == exe_name.lower():
+                break
+    for exe_name in candidates:
+        for proc in processes.process_iter():
+            if proc.info['name'] and proc.info['name'].lower() == exe_name:
+                pass
+
+
+def table_tick(processes, registry, candidates):
+    table = ProcessTable(
+        (proc.info['pid'], proc.info['name'], proc.info['create_time']) for proc in processes.process_iter()
+    )
+    for exe_name in registry:
+        table.is_running(exe_name)
+    for exe_name in candidates:
+        table.find(exe_name)
+
+
+def measure(tick, size, registry, candidates, repeat):
+    processes = ProcessList(size)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        tick(processes, registry, candidates)
+    elapsed = (time.perf_counter() - started) / repeat
+    return elapsed, processes.reads // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help="processes per table")
+    parser.add_argument('--registry', type=int, default=12, help="registry entries checked per tick")
+    parser.add_argument('--candidates', type=int, default=6, help="candidate apps verified per tick")
+    parser.add_argument('--repeat', type=int, default=20, help="ticks per measurement")
+    args = parser.parse_args()
+
+    registry = [APPS[i % len(APPS)] for i in range(args.registry)]
+    candidates = [APPS[i % len(APPS)] for i in range(args.candidates)]
+    print(f"{'processes':>9}  {'before':>10} {'reads':>8}  {'after':>10} {'reads':>8}  speedup")
+    for size in args.sizes:
+        before, before_reads = measure(legacy_tick, size, registry, candidates, args.repeat)
+        after, after_reads = measure(table_tick, size, registry, candidates, args.repeat)
+        print(f"{size:>9}  {before * 1000:>8.2f}ms {before_reads:>8}  {after * 1000:>8.2f}ms {after_reads:>8}  "
+              f"{before / after:6.1f}x")
+
+    started = time.perf_counter()
+    table = ProcessTable.scan()
+    print(f"\nProcessTable.scan() on this machine: {len(table)} processes in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
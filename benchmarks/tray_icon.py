@@ -0,0 +1,94 @@
+"""
+Measure the tray icon cost of an hour of idle running
+
+Replays one hour of idle ticks (one per second, the old fixed loop rate)
+through the old path, which drew a new 64x64 image and assigned it to the
+tray on every tick, and through the cached path, which looks the image up
+and only assigns it when the status color changes. Reports CPU time, bytes
+allocated and the number of bitmaps handed to the tray.
+
+    python benchmarks/tray_icon.py [--ticks N]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw  # noqa: E402
+from mic_monitor.icons import IconCache  # noqa: E402
+
+GREEN = (0, 255, 0)
+
+
+class FakeTrayIcon:
+    """Counts assignments; pystray converts and pushes a bitmap on each one"""
+
+    def __init__(self):
+        self.pushes = 0
+        self._icon = None
+
+    @property
+    def icon(self):
+        return self._icon
+
+    @icon.setter
+    def icon(self, image):
+        self.pushes += 1
+        self._icon = image
+
+
+def legacy_tick(tray, color):
+    """The old create_icon_image() + update_icon() path"""
+    image = Image.new('RGB', (64, 64), color=(245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse([20, 15, 44, 35], fill=(100, 100, 100))
+    draw.rectangle([30, 35, 34, 45], fill=(100, 100, 100))
+    draw.rectangle([25, 45, 39, 50], fill=(100, 100, 100))
+    draw.ellipse([45, 15, 55, 25], fill=color)
+    tray.icon = image
+
+
+def cached_path(icons):
+    last_color = [None]
+
+    def tick(tray, color):
+        if color != last_color[0]:
+            tray.icon = icons.get(color, 64)
+            last_color[0] = color
+    return tick
+
+
+def measure(name, tick, ticks):
+    tray = FakeTrayIcon()
+    tracemalloc.start()
+    allocated = 0
+    cpu_started = time.process_time()
+    for _ in range(ticks):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        tick(tray, GREEN)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    cpu = time.process_time() - cpu_started
+    tracemalloc.stop()
+    print(f"{name:<8} CPU {cpu * 1000:8.1f} ms/h   allocated {allocated / 1024:10.1f} KiB/h   "
+          f"bitmaps pushed {tray.pushes:5d}/h")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ticks', type=int, default=3600, help="ticks per simulated hour")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    icons = IconCache()
+    print(f"pre-rendering {len(icons)} icons took {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    measure('before', legacy_tick, args.ticks)
+    measure('after', cached_path(icons), args.ticks)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import argparse
+import json
 import sys
 import os
 import subprocess
@@ -29,6 +30,54 @@ def setup_environments(args):
         print(f"Error during setup: {e}")
         sys.exit(1)
 
+def _series(metric):
+    labels = ','.join(f'{name}="{value}"' for name, value in metric['labels'].items())
+    return f"{metric['name']}{{{labels}}}" if labels else metric['name']
+
+def _ms(seconds):
+    if seconds is None:
+        return '-'
+    return '>max' if seconds == float('inf') else f"{seconds * 1000:.2f}"
+
+def show_stats(args):
+    """Print the metrics published by the running monitor"""
+    from .metrics import COUNTER, GAUGE, HISTOGRAM, estimate_quantile, metrics_path, render_prometheus
+    path = args.path or metrics_path()
+    try:
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        print(f"No metrics at {path}: is the monitor running with metrics_interval > 0?")
+        sys.exit(1)
+    if args.format == 'json':
+        print(json.dumps(snapshot, indent=2))
+        return
+    if args.format == 'prometheus':
+        sys.stdout.write(render_prometheus(snapshot))
+        return
+
+    hours = max(snapshot['uptime'], 1) / 3600
+    print(f"Metrics written {snapshot['written_at']}, monitor up {snapshot['uptime'] / 3600:.1f} h\n")
+    by_type = {kind: [m for m in snapshot['metrics'] if m['type'] == kind] for kind in (COUNTER, GAUGE, HISTOGRAM)}
+    width = max([len(_series(m)) for m in snapshot['metrics']] + [20])
+    if by_type[COUNTER]:
+        print(f"{'counter':<{width}} {'total':>10} {'per hour':>10}")
+        for m in by_type[COUNTER]:
+            print(f"{_series(m):<{width}} {m['value']:>10} {m['value'] / hours:>10.1f}")
+        print()
+    if by_type[GAUGE]:
+        print(f"{'gauge':<{width}} {'value':>10}")
+        for m in by_type[GAUGE]:
+            print(f"{_series(m):<{width}} {m['value']:>10g}")
+        print()
+    if by_type[HISTOGRAM]:
+        print(f"{'histogram (ms)':<{width}} {'count':>8} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for m in by_type[HISTOGRAM]:
+            value = m['value']
+            mean = value['sum'] / value['count'] if value['count'] else None
+            quantiles = [_ms(estimate_quantile(value, q)) for q in (0.5, 0.95, 0.99)]
+            print(f"{_series(m):<{width}} {value['count']:>8} {_ms(mean):>8} " + ' '.join(f"{q:>8}" for q in quantiles))
+
 def run_monitor(args):
     """Run the microphone monitor"""
     from . import run_mic_monitor
@@ -44,12 +93,19 @@ def main():
     # Run command
     run_parser = subparsers.add_parser('run', help='Run the microphone monitor')
 
+    # Stats command
+    stats_parser = subparsers.add_parser('stats', help='Show metrics from the running monitor')
+    stats_parser.add_argument('--format', choices=['table', 'json', 'prometheus'], default='table')
+    stats_parser.add_argument('--path', help='Metrics file to read (defaults to the state directory)')
+
     args = parser.parse_args()
 
     if args.command == 'setup':
         setup_environments(args)
     elif args.command == 'run':
         run_monitor(args)
+    elif args.command == 'stats':
+        show_stats(args)
     else:
         # Default to run if no command specified
         run_monitor(args) 
\ No newline at end of file
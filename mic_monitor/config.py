@@ -0,0 +1,102 @@
+"""
+User configuration loaded from a JSON file
+"""
+import json
+import logging
+import os
+import sys
+
+CONFIG_ENV = 'MIC_MONITOR_CONFIG'
+
+DEFAULTS = {
+    # Adaptive polling: CPU budget as a percentage of one core, and the
+    # worst-case time between a microphone change and its detection
+    'cpu_budget_percent': 0.2,
+    'max_detection_latency': 5.0,
+    'min_poll_interval': 0.5,
+    # Hysteresis: how long the microphone must stay in use before a meeting
+    # is shown, and stay silent before it ends
+    'meeting_confirm_seconds': 2.0,
+    'meeting_end_seconds': 5.0,
+    # Devices are only written when their color changes, plus a periodic
+    # rewrite to recover flags that were reset or replugged
+    'device_reconcile_seconds': 300,
+    # Seconds before a device write that has not returned is logged as stalled
+    'device_write_timeout': 2.0,
+    # Per-state Luxafor effects that run on the flag itself, e.g.
+    # {"meeting": {"effect": "strobe", "speed": 20, "repeat": 255}}
+    'luxafor_effects': {},
+    # How to reach the flag: 'auto', 'hidraw' (Linux), 'pyusb' or 'library'
+    'luxafor_transport': 'auto',
+    # Per-flag settings keyed by serial number or USB bus path ('*' for the
+    # rest), e.g. {"A1B2C3": {"led": "front"}, "1-4.2": {"enabled": false}}
+    'luxafor_flags': {},
+    # Tray icon size in pixels; 0 picks the size the platform's tray displays
+    'tray_icon_size': 0,
+    # Device drivers to load, with their options; drivers not listed are
+    # never imported. Built in: luxafor, serial, file, null
+    'devices': {'luxafor': {}},
+    # Seconds between metrics snapshots for `mic-monitor stats` (0 turns them
+    # off), and an optional Prometheus textfile-collector file to write as well
+    'metrics_interval': 60,
+    'metrics_textfile': None,
+}
+
+
+def config_dir():
+    """Per-user configuration directory for the current platform"""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    return os.path.join(base, 'mic-monitor')
+
+
+def state_dir():
+    """Per-user directory for files the monitor writes at runtime"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_STATE_HOME') or os.path.expanduser('~/.local/state')
+    return os.path.join(base, 'mic-monitor')
+
+
+def default_config_path():
+    """Config file location: $MIC_MONITOR_CONFIG or config.json in config_dir()"""
+    return os.environ.get(CONFIG_ENV) or os.path.join(config_dir(), 'config.json')
+
+
+def load_config(path=None) -> dict:
+    """
+    Load the configuration, falling back to defaults.
+
+    A missing file is normal; unreadable files and unknown keys are logged.
+
+    Returns:
+        dict: DEFAULTS overlaid with the values from the file
+    """
+    config = dict(DEFAULTS)
+    path = path or default_config_path()
+    if not os.path.exists(path):
+        return config
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            values = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.error(f"❌ Could not read config {path}: {e}")
+        return config
+
+    if not isinstance(values, dict):
+        logging.error(f"❌ Config {path} must contain a JSON object")
+        return config
+
+    for key, value in values.items():
+        if key not in DEFAULTS:
+            logging.warning(f"⚠️ Unknown config key '{key}' in {path}")
+        config[key] = value
+    return config
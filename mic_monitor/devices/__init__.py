@@ -1,8 +1,85 @@
-"""Device integration for status indication"""
+"""
+Device integration for status indication.
+
+Device drivers are registered by name as 'module:attribute' strings and
+imported only when enabled in the 'devices' config key, so unused drivers
+cost nothing at startup. Third-party drivers can register through the
+'mic_monitor.devices' entry-point group.
+"""
+import importlib
+import inspect
+import logging
 from abc import ABC, abstractmethod
 
+ENTRY_POINT_GROUP = 'mic_monitor.devices'
+
+_DEVICES = {
+    'luxafor': 'mic_monitor.devices.luxafor:LuxaforDevice',
+    'serial': 'mic_monitor.devices.serial_strip:SerialLedDevice',
+    'file': 'mic_monitor.devices.file:FileStatusDevice',
+    'null': 'mic_monitor.devices.null:NullDevice',
+}
+
+_loaded = {}
+_entry_points_loaded = False
+
+# What a device can be driven with, detected once when it is registered
+CAPABILITY_STATE = 'state'                      # set_state(state), device picks its own rendering
+CAPABILITY_COLOR = 'color'                      # set_color(r, g, b)
+CAPABILITY_DETAILED_STATUS = 'detailed_status'  # set_status(mic_in_use, manual_busy, manual_free, ignore_until)
+CAPABILITY_HOTPLUG = 'hotplug'                  # attach()/detach(reason), reattached in the background
+
+
+def detect_capabilities(device) -> frozenset:
+    """
+    Return the ways a device can be driven.
+
+    Drivers declare a CAPABILITIES class attribute; other devices are
+    inspected once, when they are registered.
+    """
+    declared = getattr(device, 'CAPABILITIES', None)
+    if declared is not None:
+        return frozenset(declared)
+    capabilities = set()
+    if callable(getattr(device, 'set_state', None)):
+        capabilities.add(CAPABILITY_STATE)
+    if callable(getattr(device, 'set_color', None)):
+        capabilities.add(CAPABILITY_COLOR)
+    try:
+        parameters = inspect.signature(device.set_status).parameters
+    except (TypeError, ValueError):
+        parameters = {}
+    if 'manual_busy' in parameters:
+        capabilities.add(CAPABILITY_DETAILED_STATUS)
+    if callable(getattr(device, 'attach', None)) and callable(getattr(device, 'detach', None)):
+        capabilities.add(CAPABILITY_HOTPLUG)
+    return frozenset(capabilities)
+
+
 class StatusDevice(ABC):
     """Base class for status indicator devices"""
+
+    # Capabilities the driver supports (None: inspect the device instead)
+    CAPABILITIES = None
+
+    @classmethod
+    def setup(cls, manager, options: dict):
+        """
+        Create the driver's devices and register them with a StatusManager.
+
+        Args:
+            manager: StatusManager to call register_device() on
+            options: This driver's entry in the 'devices' config key
+
+        Returns:
+            Object with a stop() method to call at shutdown, or None
+        """
+        device = cls(**options)
+        if device.connect():
+            manager.register_device(device)
+        else:
+            logging.warning(f"⚠️ {cls.__name__} not available: {device.status.get('error')}")
+        return None
     
     @abstractmethod
     def connect(self) -> bool:
@@ -29,4 +106,68 @@ class StatusDevice(ABC):
     @abstractmethod
     def status(self) -> dict:
         """Get device status"""
-        pass
\ No newline at end of file
+        pass
+
+def register_device_driver(name, target):
+    """
+    Register a device driver.
+
+    Args:
+        name: Driver name used in the 'devices' config key
+        target: 'module:attribute' string, or the StatusDevice subclass itself
+    """
+    _DEVICES[name] = target
+    _loaded.pop(name, None)
+
+
+def _load_entry_points():
+    """Register drivers published by other packages (done once, on demand)"""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return
+
+    try:
+        eps = entry_points()
+        group = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, 'select') else eps.get(ENTRY_POINT_GROUP, [])
+    except Exception as e:
+        logging.debug(f"Could not read {ENTRY_POINT_GROUP} entry points: {e}")
+        return
+    for ep in group:
+        _DEVICES.setdefault(ep.name, ep.value)
+
+
+def available_device_drivers():
+    """Names of every registered driver, including entry-point plugins"""
+    _load_entry_points()
+    return sorted(_DEVICES)
+
+
+def load_device_driver(name):
+    """
+    Import a driver and return its StatusDevice subclass.
+
+    Raises:
+        NotImplementedError: If no driver with that name is registered
+    """
+    if name in _loaded:
+        return _loaded[name]
+    if name not in _DEVICES:
+        _load_entry_points()
+    if name not in _DEVICES:
+        raise NotImplementedError(f"No status device driver named '{name}'")
+
+    target = _DEVICES[name]
+    if isinstance(target, str):
+        module_name, _, attribute = target.partition(':')
+        driver = importlib.import_module(module_name)
+        for part in attribute.split('.'):
+            driver = getattr(driver, part)
+    else:
+        driver = target
+    _loaded[name] = driver
+    return driver
@@ -0,0 +1,87 @@
+"""
+Device that writes the current status to a JSON file for other tools
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from . import CAPABILITY_STATE, StatusDevice
+from ..config import state_dir
+from ..snapshot import BUSY_STATES, STATE_AVAILABLE, STATE_COLORS, STATE_DND
+
+
+class FileStatusDevice(StatusDevice):
+    """
+    Publishes the status as a small JSON document, e.g. for a shell prompt,
+    a status bar or a script that updates a chat presence:
+
+        {"state": "meeting", "busy": true, "color": [255, 0, 0],
+         "updated": "2024-08-27T10:15:00"}
+
+    The file is replaced atomically, so readers never see a partial write.
+    """
+
+    CAPABILITIES = frozenset({CAPABILITY_STATE})
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: File to write; defaults to status.json in the state directory
+        """
+        self.path = os.path.expanduser(path) if path else os.path.join(state_dir(), 'status.json')
+        self._status = {
+            'connected': False,
+            'error': None,
+            'last_update': None,
+            'path': self.path,
+        }
+
+    def is_connected(self) -> bool:
+        return self._status['connected']
+
+    @property
+    def status(self) -> dict:
+        return self._status
+
+    def connect(self) -> bool:
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        except OSError as e:
+            self._status['error'] = f"Cannot create {os.path.dirname(self.path)}: {e}"
+            return False
+        self._status['connected'] = True
+        self._status['error'] = None
+        return True
+
+    def disconnect(self):
+        """Remove the file so readers do not act on a stale status"""
+        self._status['connected'] = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.error(f"Error removing {self.path}: {e}")
+
+    def set_state(self, state: str) -> bool:
+        document = {
+            'state': state,
+            'busy': state in BUSY_STATES,
+            'color': list(STATE_COLORS[state]),
+            'updated': datetime.now().isoformat(timespec='seconds'),
+        }
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(document, f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            self._status['error'] = f"Cannot write {self.path}: {e}"
+            return False
+        self._status['last_update'] = time.time()
+        self._status['error'] = None
+        return True
+
+    def set_status(self, is_busy: bool) -> bool:
+        return self.set_state(STATE_DND if is_busy else STATE_AVAILABLE)
@@ -3,7 +3,11 @@ Luxafor device integration for status indication
 """
 import logging
 import time
-from . import StatusDevice
+from . import (CAPABILITY_COLOR, CAPABILITY_DETAILED_STATUS, CAPABILITY_HOTPLUG, CAPABILITY_STATE,
+               StatusDevice)
+from .luxafor_protocol import EFFECT_FADE, EFFECT_STATIC, LED_ALL, Effect, LibraryTransport, parse_led
+from .. import metrics
+from ..snapshot import STATE_COLORS, resolve_state
 
 try:
     from luxafor import luxafor
@@ -13,19 +17,83 @@ except ImportError:
     LUXAFOR_AVAILABLE = False
     logging.warning("Luxafor library not available. Install with: pip install git+https://github.com/fmartingr/pyluxafor.git#egg=luxafor")
 
+# USB IDs of the Luxafor Flag, used for hotplug detection
+LUXAFOR_VENDOR_ID = '04d8'
+LUXAFOR_PRODUCT_ID = 'f372'
+
+WRITE_SECONDS = metrics.histogram('mic_monitor_luxafor_write_seconds', "Duration of Luxafor USB writes")
+WRITE_ERRORS = metrics.counter('mic_monitor_luxafor_write_errors_total', "Luxafor USB writes that failed")
+
+
+def flag_settings(config, bus_path=None, serial=None) -> dict:
+    """
+    Per-flag settings from the 'luxafor_flags' config key.
+
+    Entries are keyed by serial number or USB bus path, with '*' applying to
+    every other flag, e.g. {"A1B2C3": {"led": "front"}, "*": {"enabled": false}}.
+    """
+    flags = config.get('luxafor_flags') or {}
+    for key in (serial, bus_path, '*'):
+        if key is not None and key in flags:
+            return flags[key]
+    return {}
+
 
 class LuxaforDevice(StatusDevice):
-    """Luxafor flag device for status indication"""
+    """
+    Luxafor flag device for status indication.
+
+    Writes never reconnect: while the flag is detached they fail straight
+    away, and a UsbConnectionManager attaches it again in the background.
+
+    Every command, including fades, strobes, waves and patterns, is a single
+    USB report; the effect then runs on the flag without further writes.
+    """
+
+    CAPABILITIES = frozenset({CAPABILITY_STATE, CAPABILITY_COLOR, CAPABILITY_DETAILED_STATUS, CAPABILITY_HOTPLUG})
     
-    def __init__(self):
-        self.device = None
+    def __init__(self, transport_factory=None, effects=None, led=LED_ALL, bus_path=None, serial=None):
+        """
+        Args:
+            transport_factory: Callable returning a LuxaforTransport; defaults
+                to the third-party luxafor library
+            effects: Status state -> Effect shown instead of the solid
+                status color, e.g. {'meeting': Effect('strobe', ...)}
+            led: LEDs that show the status (LED_ALL, LED_FRONT, LED_BACK or 1-6)
+            bus_path: USB bus path of this flag, when several are plugged in
+            serial: USB serial number of this flag, if it has one
+        """
+        self.transport_factory = transport_factory
+        self.effects = dict(effects or {})
+        self.led = led
+        self.bus_path = bus_path
+        self.serial = serial
+        self.transport = None
+        # Effect -> report bytes, so repeated commands are not rebuilt
+        self._reports = {}
+        # Called after a failed write detaches the flag, e.g. to wake the connection manager
+        self.on_detach = None
+        # Called after the first successful write since attach(), e.g. to reset its backoff
+        self.on_confirmed = None
+        self._confirmed = False
+        # Effect kinds the transport cannot send; a solid color is shown instead
+        self._unsupported = set()
         self._status = {
+            'driver': 'luxafor',
             'connected': False,
             'error': None,
             'last_update': None,
-            'last_color': [0, 0, 0]
+            'last_color': [0, 0, 0],
+            'bus_path': bus_path,
+            'serial': serial,
         }
         
+    @property
+    def label(self) -> str:
+        """Name for log messages, with the serial number or bus path when known"""
+        identity = self.serial or self.bus_path
+        return f"Luxafor Flag {identity}" if identity else "Luxafor Flag"
+
     def is_connected(self) -> bool:
         """Check if device is connected"""
         return self._status['connected']
@@ -40,60 +108,209 @@ class LuxaforDevice(StatusDevice):
         """Set device status"""
         self._status = value
         
-    def connect(self, max_retries=3, retry_delay=1) -> bool:
-        """Connect to the Luxafor device"""
+    @classmethod
+    def from_config(cls, config, transport_factory=None, bus_path=None, serial=None):
+        """
+        Build a device from the 'luxafor_effects' and 'luxafor_flags' config keys.
+
+        Effects take the status color unless they set their own, e.g.
+        {"meeting": {"effect": "strobe", "speed": 20, "repeat": 255},
+         "available": {"effect": "fade", "speed": 40}}
+
+        Returns:
+            LuxaforDevice, or None if this flag is disabled in 'luxafor_flags'
+        """
+        settings = flag_settings(config, bus_path, serial)
+        if not settings.get('enabled', True):
+            logging.info(f"Luxafor Flag {serial or bus_path} disabled in config")
+            return None
+        try:
+            led = parse_led(settings.get('led', LED_ALL))
+        except (TypeError, ValueError) as e:
+            logging.warning(f"⚠️ Using all LEDs of Luxafor Flag {serial or bus_path}: {e}")
+            led = LED_ALL
+
+        effects = {}
+        for state, values in (config.get('luxafor_effects') or {}).items():
+            if state not in STATE_COLORS:
+                logging.warning(f"⚠️ Ignoring Luxafor effect for unknown state '{state}'")
+                continue
+            try:
+                effects[state] = Effect.from_config(values, STATE_COLORS[state], led)
+            except (TypeError, ValueError) as e:
+                logging.warning(f"⚠️ Ignoring Luxafor effect for '{state}': {e}")
+        return cls(transport_factory=transport_factory, effects=effects, led=led,
+                   bus_path=bus_path, serial=serial)
+
+    @classmethod
+    def setup(cls, manager, options: dict):
+        """
+        Register a device for every plugged-in flag.
+
+        Each flag is registered as soon as it is seen and attached by a
+        background connection manager whenever it appears, so startup never
+        waits for USB. A flag unplugged for good, or plugged into another
+        port, is unregistered again. Where flags cannot be enumerated, a single device is
+        registered for the first flag found.
+
+        Returns:
+            UsbConnectionManager to stop at shutdown, or None if no transport is available
+        """
+        from . import luxafor_hid
+        from .usb_hotplug import UsbConnectionManager
+
+        config = dict(manager.config, **options)
+        transport = config['luxafor_transport']
+        if luxafor_hid.transport_factory(transport) is None and not LUXAFOR_AVAILABLE:
+            logging.warning("⚠️ Luxafor Flag not available: Luxafor library not installed")
+            return None
+
+        def create_device(bus_path, serial):
+            return cls.from_config(
+                config,
+                transport_factory=luxafor_hid.transport_factory(transport, bus_path),
+                bus_path=bus_path,
+                serial=serial
+            )
+
+        connections = UsbConnectionManager(
+            LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID,
+            device_factory=create_device,
+            on_new_device=manager.register_device,
+            on_attach=manager.resync_device,
+            on_removed_device=manager.unregister_device,
+            enumerate_devices=luxafor_hid.enumerate_pyusb if luxafor_hid.pyusb_available() else None
+        )
+        connections.start()
+        logging.info("✅ Luxafor Flag integration enabled")
+        return connections
+
+    def _open_transport(self):
+        if self.transport_factory is not None:
+            return self.transport_factory()
         if not LUXAFOR_AVAILABLE:
+            raise RuntimeError("Luxafor library not installed")
+        return LibraryTransport(luxafor.Luxafor())
+
+    def attach(self) -> bool:
+        """Open the flag once, without retrying or sleeping"""
+        if self.transport_factory is None and not LUXAFOR_AVAILABLE:
             self._status['error'] = "Luxafor library not installed"
             return False
-            
-        for attempt in range(max_retries):
+
+        try:
+            self.transport = self._open_transport()
+        except Exception as e:
+            self.transport = None
+            self._status['connected'] = False
+            self._status['error'] = f"Cannot open Luxafor Flag: {e}"
+            return False
+
+        self._status['connected'] = True
+        self._status['error'] = None
+        self._confirmed = False
+        logging.info(f"✅ {self.label} connected successfully")
+        return True
+
+    def detach(self, reason: str):
+        """Drop the handle after the flag was unplugged or a write failed"""
+        was_connected = self._status['connected']
+        transport, self.transport = self.transport, None
+        if transport is not None:
             try:
-                self.device = luxafor.Luxafor()
-                self._status['connected'] = True
-                self._status['error'] = None
-                logging.info("✅ Luxafor Flag connected successfully")
+                transport.close()
+            except Exception:
+                pass
+        self._status['connected'] = False
+        self._status['error'] = reason
+        if was_connected:
+            logging.warning(f"⚠️ {self.label} detached: {reason}")
+            if self.on_detach:
+                self.on_detach()
+
+    def connect(self, max_retries=1, retry_delay=1) -> bool:
+        """
+        Connect to the Luxafor device.
+
+        Only sleeps between attempts when max_retries > 1; the monitor itself
+        relies on UsbConnectionManager instead.
+        """
+        for attempt in range(max_retries):
+            if self.attach():
                 return True
-            except Exception as e:
-                error_msg = f"Attempt {attempt + 1}/{max_retries}: {e}"
-                logging.warning(error_msg)
-                self._status['error'] = error_msg
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
+            logging.warning(f"Attempt {attempt + 1}/{max_retries}: {self._status['error']}")
+            if attempt < max_retries - 1:
+                time.sleep(retry_delay)
         
-        self._status['connected'] = False
         logging.error("❌ Failed to connect to Luxafor Flag after all attempts")
         return False
         
     def disconnect(self):
         """Disconnect and turn off the device"""
-        if self.device:
+        if self.transport:
             try:
-                self.set_color(0, 0, 0)  # Turn off
-                self.device = None
+                self.play(Effect(EFFECT_STATIC, (0, 0, 0)))  # Turn off all LEDs
+                if self.transport:
+                    self.transport.close()
+                self.transport = None
                 self._status['connected'] = False
                 logging.info("Luxafor device disconnected")
             except Exception as e:
                 logging.error(f"Error disconnecting Luxafor: {e}")
                 
-    def set_color(self, r: int, g: int, b: int) -> bool:
-        """Set the Luxafor color"""
-        if not self.device:
-            if not self.connect():
-                return False
-                
+    def play(self, effect: Effect) -> bool:
+        """Start an effect with a single USB write; fails immediately while the flag is detached"""
+        transport = self.transport
+        if not transport:
+            return False
+        if effect.kind in self._unsupported:
+            effect = Effect(EFFECT_STATIC, effect.color, led=self.led)
+
         try:
-            # Set all LEDs
-            self.device.set_color(r, g, b, 255)
+            report = self._reports.get(effect)
+            if report is None:
+                report = self._reports[effect] = effect.report()
+            with WRITE_SECONDS.time():
+                transport.write(report)
             self._status['last_update'] = time.time()
-            self._status['last_color'] = [r, g, b]
+            if effect.kind in (EFFECT_STATIC, EFFECT_FADE):
+                self._status['last_color'] = list(effect.color)
+            self._status['last_effect'] = effect.kind
             self._status['error'] = None
+            if not self._confirmed:
+                self._confirmed = True
+                if self.on_confirmed:
+                    self.on_confirmed()
             return True
+        except NotImplementedError as e:
+            # The transport cannot send this effect: a configuration problem, not an unplugged flag
+            self._status['error'] = f"Unsupported effect '{effect.kind}': {e}"
+            if effect.kind == EFFECT_STATIC:
+                logging.error(f"❌ {self.label}: {e}")
+                return False
+            self._unsupported.add(effect.kind)
+            logging.error(f"❌ {self.label} cannot play '{effect.kind}' effects ({e}); showing a solid color instead. "
+                          f"Set luxafor_transport to hidraw or pyusb to use effects")
+            return self.play(effect)
         except Exception as e:
             error_msg = f"Error setting color: {e}"
+            WRITE_ERRORS.inc()
             logging.error(error_msg)
-            self._status['error'] = error_msg
-            self._status['connected'] = False
+            self.detach(error_msg)
             return False
+
+    def set_color(self, r: int, g: int, b: int) -> bool:
+        """Set this flag's status LEDs to a solid color"""
+        return self.play(Effect(EFFECT_STATIC, (r, g, b), led=self.led))
+
+    def fade_to(self, r: int, g: int, b: int, speed: int = 40, led=None) -> bool:
+        """Fade from the current color on the device"""
+        return self.play(Effect(EFFECT_FADE, (r, g, b), led=self.led if led is None else led, speed=speed))
+
+    def set_state(self, state: str) -> bool:
+        """Show a status state, using its configured effect if there is one"""
+        effect = self.effects.get(state) or Effect(EFFECT_STATIC, STATE_COLORS[state], led=self.led)
+        return self.play(effect)
             
     def set_status(self, mic_in_use: bool, manual_busy: bool = False, 
                    manual_free: bool = False, ignore_until = None) -> bool:
@@ -103,18 +320,6 @@ class LuxaforDevice(StatusDevice):
         🔴 Red [255,0,0]     = Busy (DND or In Meeting)
         🟡 Yellow [255,255,0] = Away
         """
-        
-        # Priority order: manual overrides > ignore > mic status
-        
-        # Check for "Away" status (ignoring mic)
-        if ignore_until:
-            return self.set_color(255, 255, 0)  # Yellow for Away
-            
-        # Check for manual overrides or mic status
-        if manual_busy or mic_in_use:
-            return self.set_color(255, 0, 0)    # Red for Busy (DND or In Meeting)
-        elif manual_free:
-            return self.set_color(0, 255, 0)    # Green for Available
-            
-        # Default: Available
-        return self.set_color(0, 255, 0)        # Green for Available
\ No newline at end of file
+        # Priority order is resolved in one place, shared with the tray icon
+        state = resolve_state(mic_in_use, manual_busy, manual_free, ignore_until)
+        return self.set_state(state)
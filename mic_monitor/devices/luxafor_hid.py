@@ -0,0 +1,282 @@
+"""
+Direct HID transport for the Luxafor Flag
+
+Opens the flag once and keeps the handle (a hidraw file descriptor or a
+claimed pyusb OUT endpoint) for as long as it stays plugged in. Reports are
+framed once per distinct command and cached, so a write is a single
+os.write()/endpoint.write() call.
+"""
+import glob
+import logging
+import os
+import re
+import sys
+import time
+
+from .luxafor_protocol import LuxaforTransport
+
+LUXAFOR_VENDOR = 0x04d8
+LUXAFOR_PRODUCT = 0xf372
+
+TRANSPORT_AUTO = 'auto'
+TRANSPORT_HIDRAW = 'hidraw'
+TRANSPORT_PYUSB = 'pyusb'
+TRANSPORT_LIBRARY = 'library'
+
+WRITE_TIMEOUT_MS = 500
+
+# USB device directories in sysfs are named after their bus path, e.g. 1-2.3
+_BUS_PATH_RE = re.compile(r'^\d+-\d+(\.\d+)*$')
+
+
+class HidBackend:
+    """
+    Low-level access to one flag.
+
+    open() returns a handle that stays valid until close(); write() sends
+    a buffer produced by frame().
+    """
+
+    def open(self):
+        raise NotImplementedError
+
+    def frame(self, report: bytes) -> bytes:
+        """Wrap an 8-byte report the way this backend sends it"""
+        return report
+
+    def write(self, handle, buffer: bytes) -> None:
+        raise NotImplementedError
+
+    def close(self, handle) -> None:
+        pass
+
+
+def find_hidraw_nodes(sysfs_root='/sys/class/hidraw', dev_root='/dev'):
+    """
+    Find the hidraw nodes of all plugged-in Luxafor Flags.
+
+    Returns:
+        dict: USB bus path (as in /sys/bus/usb/devices) -> /dev/hidrawN
+    """
+    wanted = f"HID_ID=0003:{LUXAFOR_VENDOR:08X}:{LUXAFOR_PRODUCT:08X}"
+    nodes = {}
+    for uevent in sorted(glob.glob(os.path.join(sysfs_root, 'hidraw*', 'device', 'uevent'))):
+        try:
+            with open(uevent) as f:
+                if wanted not in f.read().upper():
+                    continue
+        except OSError:
+            continue
+        name = uevent[len(sysfs_root):].strip(os.sep).split(os.sep)[0]
+        # .../usb1/1-2/1-2:1.0/0003:04D8:F372.0001 -> 1-2
+        parts = os.path.realpath(os.path.dirname(uevent)).split(os.sep)
+        bus_paths = [part for part in parts if _BUS_PATH_RE.match(part)]
+        nodes[bus_paths[-1] if bus_paths else name] = os.path.join(dev_root, name)
+    return nodes
+
+
+def find_hidraw_node(bus_path=None, sysfs_root='/sys/class/hidraw', dev_root='/dev'):
+    """Return the /dev/hidrawN node of the flag at bus_path (any flag if None), or None"""
+    nodes = find_hidraw_nodes(sysfs_root, dev_root)
+    if bus_path is not None:
+        return nodes.get(bus_path)
+    return next(iter(nodes.values()), None)
+
+
+class HidrawBackend(HidBackend):
+    """Linux hidraw node; needs no USB library and no interface claiming"""
+
+    def __init__(self, path=None, bus_path=None):
+        self.path = path
+        self.bus_path = bus_path
+
+    def open(self):
+        path = self.path or find_hidraw_node(self.bus_path)
+        if path is None:
+            raise OSError("No Luxafor hidraw node found")
+        return os.open(path, os.O_WRONLY | getattr(os, 'O_CLOEXEC', 0))
+
+    def frame(self, report: bytes) -> bytes:
+        # hidraw expects the report ID first; the flag uses unnumbered reports
+        return b'\x00' + report
+
+    def write(self, handle, buffer: bytes) -> None:
+        os.write(handle, buffer)
+
+    def close(self, handle) -> None:
+        os.close(handle)
+
+
+class PyUsbBackend(HidBackend):
+    """
+    pyusb access to the flag's interrupt OUT endpoint.
+
+    The kernel HID driver is detached and the interface claimed once in
+    open(); the endpoint object is then reused for every write.
+    """
+
+    def __init__(self, bus_path=None, timeout_ms=WRITE_TIMEOUT_MS):
+        import usb.core
+        import usb.util
+        self._core = usb.core
+        self._util = usb.util
+        self.bus_path = bus_path
+        self.timeout_ms = timeout_ms
+
+    def open(self):
+        device = None
+        for candidate in self._core.find(find_all=True, idVendor=LUXAFOR_VENDOR, idProduct=LUXAFOR_PRODUCT):
+            if self.bus_path is None or usb_bus_path(candidate) == self.bus_path:
+                device = candidate
+                break
+        if device is None:
+            raise OSError(f"No Luxafor Flag found at {self.bus_path or 'any USB port'}")
+        try:
+            if device.is_kernel_driver_active(0):
+                device.detach_kernel_driver(0)
+        except (NotImplementedError, self._core.USBError):
+            # Not supported on Windows/macOS
+            pass
+        device.set_configuration()
+        interface = device.get_active_configuration()[(0, 0)]
+        self._util.claim_interface(device, interface)
+        endpoint = self._util.find_descriptor(
+            interface,
+            custom_match=lambda e: self._util.endpoint_direction(e.bEndpointAddress) == self._util.ENDPOINT_OUT
+        )
+        if endpoint is None:
+            self._util.dispose_resources(device)
+            raise OSError("Luxafor Flag has no OUT endpoint")
+        return device, endpoint
+
+    def write(self, handle, buffer: bytes) -> None:
+        _, endpoint = handle
+        endpoint.write(buffer, self.timeout_ms)
+
+    def close(self, handle) -> None:
+        device, _ = handle
+        self._util.dispose_resources(device)
+
+
+def usb_bus_path(device):
+    """sysfs-style bus path ('1-2.3') of a pyusb device"""
+    ports = getattr(device, 'port_numbers', None) or (getattr(device, 'address', 0),)
+    return f"{device.bus}-{'.'.join(str(port) for port in ports)}"
+
+
+def enumerate_pyusb():
+    """
+    List plugged-in flags through pyusb, for systems without sysfs.
+
+    Returns:
+        dict: Bus path -> serial number (None when it cannot be read)
+    """
+    import usb.core
+    import usb.util
+    found = {}
+    for device in usb.core.find(find_all=True, idVendor=LUXAFOR_VENDOR, idProduct=LUXAFOR_PRODUCT):
+        try:
+            serial = usb.util.get_string(device, device.iSerialNumber) if device.iSerialNumber else None
+        except (usb.core.USBError, ValueError, NotImplementedError):
+            serial = None
+        found[usb_bus_path(device)] = serial
+    return found
+
+
+class LoopbackBackend(HidBackend):
+    """
+    In-memory backend for tests and benchmarks.
+
+    Records every buffer; set ``fail`` to an exception to make writes raise
+    it, ``open_error`` to make open() raise, and ``latency`` to make each
+    write take that many seconds, like a slow USB round trip.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.buffers = []
+        self.opens = 0
+        self.closes = 0
+        self.fail = None
+        self.open_error = None
+
+    def open(self):
+        if self.open_error is not None:
+            raise self.open_error
+        self.opens += 1
+        return self.opens
+
+    def write(self, handle, buffer: bytes) -> None:
+        if self.fail is not None:
+            raise self.fail
+        if self.latency:
+            time.sleep(self.latency)
+        self.buffers.append(buffer)
+
+    def close(self, handle) -> None:
+        self.closes += 1
+
+
+class HidTransport(LuxaforTransport):
+    """Keeps one backend handle open and sends cached, pre-framed reports"""
+
+    def __init__(self, backend: HidBackend):
+        self.backend = backend
+        self._handle = backend.open()
+        self._frames = {}
+
+    def write(self, report: bytes) -> None:
+        buffer = self._frames.get(report)
+        if buffer is None:
+            buffer = self._frames[report] = self.backend.frame(report)
+        self.backend.write(self._handle, buffer)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            handle, self._handle = self._handle, None
+            self.backend.close(handle)
+
+
+def pyusb_available() -> bool:
+    try:
+        import usb.core  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def transport_factory(name=TRANSPORT_AUTO, bus_path=None):
+    """
+    Choose how LuxaforDevice talks to a flag.
+
+    'auto' picks a writable hidraw node on Linux each time the flag is
+    attached, then pyusb. The third-party luxafor library is only used where
+    neither is possible; it cannot address a particular flag.
+
+    Args:
+        name: 'auto', 'hidraw', 'pyusb' or 'library'
+        bus_path: USB bus path of the flag, or None for the first one found
+
+    Returns:
+        Callable returning a HidTransport, or None to use the luxafor library
+    """
+    if name == TRANSPORT_LIBRARY:
+        return None
+    if name == TRANSPORT_HIDRAW:
+        return lambda: HidTransport(HidrawBackend(bus_path=bus_path))
+    if name == TRANSPORT_PYUSB:
+        return lambda: HidTransport(PyUsbBackend(bus_path))
+    if name != TRANSPORT_AUTO:
+        logging.warning(f"⚠️ Unknown Luxafor transport '{name}', using auto")
+
+    linux = sys.platform.startswith('linux')
+    if not linux and not pyusb_available():
+        return None
+
+    def open_transport():
+        # The hidraw node only exists while the flag is plugged in
+        node = find_hidraw_node(bus_path) if linux else None
+        if node and os.access(node, os.W_OK):
+            return HidTransport(HidrawBackend(node))
+        return HidTransport(PyUsbBackend(bus_path))
+    return open_transport
@@ -0,0 +1,202 @@
+"""
+Luxafor Flag USB report format and transports
+
+Every command is a single 8-byte output report. Fades, strobes, waves and
+the built-in patterns run on the flag itself, so one transfer starts an
+effect that would otherwise need a stream of host-side color writes.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Tuple
+
+REPORT_SIZE = 8
+
+# First byte of each report
+MODE_STATIC = 1
+MODE_FADE = 2
+MODE_STROBE = 3
+MODE_WAVE = 4
+MODE_PATTERN = 6
+
+# LED selectors (individual LEDs are 1-6)
+LED_ALL = 0xFF
+LED_FRONT = 0x41
+LED_BACK = 0x42
+
+LED_GROUPS = {'all': LED_ALL, 'front': LED_FRONT, 'back': LED_BACK}
+
+WAVE_SHORT = 1
+WAVE_LONG = 2
+WAVE_OVERLAPPING_SHORT = 3
+WAVE_OVERLAPPING_LONG = 4
+
+PATTERN_TRAFFIC_LIGHTS = 1
+PATTERN_POLICE = 5
+PATTERN_RAINBOW_WAVE = 8
+
+EFFECT_STATIC = 'static'
+EFFECT_FADE = 'fade'
+EFFECT_STROBE = 'strobe'
+EFFECT_WAVE = 'wave'
+EFFECT_PATTERN = 'pattern'
+
+
+def _byte(name, value) -> int:
+    value = int(value)
+    if not 0 <= value <= 0xFF:
+        raise ValueError(f"{name} must be between 0 and 255, got {value}")
+    return value
+
+
+def parse_led(value) -> int:
+    """Turn a config value ('all', 'front', 'back' or an LED number 1-6) into an LED selector"""
+    if isinstance(value, str):
+        if value.lower() in LED_GROUPS:
+            return LED_GROUPS[value.lower()]
+        if not value.isdigit():
+            raise ValueError(f"Unknown LED group '{value}'")
+    led = int(value)
+    if led not in LED_GROUPS.values() and not 1 <= led <= 6:
+        raise ValueError(f"LED must be 1-6, 'all', 'front' or 'back', got {value}")
+    return led
+
+
+def _report(*values) -> bytes:
+    return bytes(values) + bytes(REPORT_SIZE - len(values))
+
+
+def static_report(led, r, g, b) -> bytes:
+    """Set LEDs to a color immediately"""
+    return _report(MODE_STATIC, _byte('led', led), _byte('r', r), _byte('g', g), _byte('b', b))
+
+
+def fade_report(led, r, g, b, speed) -> bytes:
+    """Fade LEDs from their current color; higher speed values fade more slowly"""
+    return _report(MODE_FADE, _byte('led', led), _byte('r', r), _byte('g', g), _byte('b', b),
+                   _byte('speed', speed))
+
+
+def strobe_report(led, r, g, b, speed, repeat) -> bytes:
+    """Flash LEDs ``repeat`` times"""
+    return _report(MODE_STROBE, _byte('led', led), _byte('r', r), _byte('g', g), _byte('b', b),
+                   _byte('speed', speed), 0, _byte('repeat', repeat))
+
+
+def wave_report(wave_type, r, g, b, speed, repeat) -> bytes:
+    """Run a color wave across all LEDs"""
+    return _report(MODE_WAVE, _byte('wave_type', wave_type), _byte('r', r), _byte('g', g), _byte('b', b),
+                   0, _byte('repeat', repeat), _byte('speed', speed))
+
+
+def pattern_report(pattern_id, repeat) -> bytes:
+    """Play one of the flag's built-in patterns"""
+    return _report(MODE_PATTERN, _byte('pattern_id', pattern_id), _byte('repeat', repeat))
+
+
+@dataclass(frozen=True)
+class Effect:
+    """
+    One on-device effect, e.g. ``Effect('strobe', (255, 0, 0), speed=20, repeat=255)``.
+
+    ``led`` is ignored by waves and patterns, which always use the whole
+    flag; ``variant`` is the wave type or pattern id.
+    """
+    kind: str = EFFECT_STATIC
+    color: Tuple[int, int, int] = (0, 0, 0)
+    led: int = LED_ALL
+    speed: int = 0
+    repeat: int = 1
+    variant: int = 0
+
+    def report(self) -> bytes:
+        """Build the USB report that starts this effect"""
+        r, g, b = self.color
+        if self.kind == EFFECT_STATIC:
+            return static_report(self.led, r, g, b)
+        if self.kind == EFFECT_FADE:
+            return fade_report(self.led, r, g, b, self.speed)
+        if self.kind == EFFECT_STROBE:
+            return strobe_report(self.led, r, g, b, self.speed, self.repeat)
+        if self.kind == EFFECT_WAVE:
+            return wave_report(self.variant or WAVE_SHORT, r, g, b, self.speed, self.repeat)
+        if self.kind == EFFECT_PATTERN:
+            return pattern_report(self.variant or PATTERN_TRAFFIC_LIGHTS, self.repeat)
+        raise ValueError(f"Unknown Luxafor effect '{self.kind}'")
+
+    @classmethod
+    def from_config(cls, values: dict, color=(0, 0, 0), led=LED_ALL):
+        """
+        Build an effect from a config entry such as
+        ``{"effect": "strobe", "speed": 20, "repeat": 255}``.
+
+        The given color and LEDs are used unless the entry sets its own
+        "color" or "led".
+        """
+        effect = cls(
+            kind=values.get('effect', EFFECT_STATIC),
+            color=tuple(values.get('color', color)),
+            led=parse_led(values['led']) if 'led' in values else led,
+            speed=values.get('speed', 0),
+            repeat=values.get('repeat', 1),
+            variant=values.get('variant', 0),
+        )
+        effect.report()  # Validate now rather than on the first write
+        return effect
+
+
+class LuxaforTransport(ABC):
+    """Sends raw reports to one flag"""
+
+    @abstractmethod
+    def write(self, report: bytes) -> None:
+        """Send one report; raises on I/O errors"""
+        pass
+
+    def close(self) -> None:
+        """Release the underlying handle"""
+        pass
+
+
+class LibraryTransport(LuxaforTransport):
+    """Sends reports through a handle from the third-party ``luxafor`` package"""
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def write(self, report: bytes) -> None:
+        if callable(getattr(self.handle, 'write', None)):
+            self.handle.write(list(report))
+        elif report[0] == MODE_STATIC:
+            # Oldest library versions only expose set_color(r, g, b, led)
+            self.handle.set_color(report[2], report[3], report[4], report[1])
+        else:
+            raise NotImplementedError("This luxafor library version only supports static colors")
+
+    def close(self) -> None:
+        self.handle = None
+
+
+class RecordingTransport(LuxaforTransport):
+    """
+    In-memory transport for tests and benchmarks.
+
+    Every report is appended to ``reports``; set ``fail`` to an exception to
+    make the next writes raise it, as an unplugged flag would.
+    """
+
+    def __init__(self):
+        self.reports = []
+        self.fail = None
+        self.closed = False
+
+    def write(self, report: bytes) -> None:
+        if self.fail is not None:
+            raise self.fail
+        self.reports.append(bytes(report))
+
+    def close(self) -> None:
+        self.closed = True
+
+    @property
+    def writes(self) -> int:
+        return len(self.reports)
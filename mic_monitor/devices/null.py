@@ -0,0 +1,52 @@
+"""
+Device that accepts every write and does nothing, for benchmarks and headless runs
+"""
+import time
+from . import CAPABILITY_STATE, StatusDevice
+from ..snapshot import STATE_AVAILABLE, STATE_DND
+
+
+class NullDevice(StatusDevice):
+    """
+    Counts writes without touching any hardware.
+
+    ``latency`` makes each write take that many seconds, to stand in for a
+    slow device when measuring the monitor loop.
+    """
+
+    CAPABILITIES = frozenset({CAPABILITY_STATE})
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.writes = 0
+        self._status = {
+            'connected': False,
+            'error': None,
+            'last_update': None,
+            'last_state': None,
+        }
+
+    def is_connected(self) -> bool:
+        return self._status['connected']
+
+    @property
+    def status(self) -> dict:
+        return self._status
+
+    def connect(self) -> bool:
+        self._status['connected'] = True
+        return True
+
+    def disconnect(self):
+        self._status['connected'] = False
+
+    def set_state(self, state: str) -> bool:
+        if self.latency:
+            time.sleep(self.latency)
+        self.writes += 1
+        self._status['last_state'] = state
+        self._status['last_update'] = time.time()
+        return True
+
+    def set_status(self, is_busy: bool) -> bool:
+        return self.set_state(STATE_DND if is_busy else STATE_AVAILABLE)
@@ -0,0 +1,100 @@
+"""
+Serial-attached LED strips (e.g. an Arduino or ESP32 driving WS2812 LEDs)
+"""
+import logging
+import time
+from . import CAPABILITY_COLOR, StatusDevice
+from ..snapshot import STATE_AVAILABLE, STATE_COLORS, STATE_DND
+
+
+class SerialLedDevice(StatusDevice):
+    """
+    Sends one text line per color change over a serial port.
+
+    The line format is configurable so it fits whatever sketch runs on the
+    board; the default "{r},{g},{b}\\n" sends e.g. "255,0,0". Requires
+    pyserial (pip install pyserial).
+    """
+
+    CAPABILITIES = frozenset({CAPABILITY_COLOR})
+
+    def __init__(self, port, baudrate=115200, line_format="{r},{g},{b}\n", timeout=1.0):
+        """
+        Args:
+            port: Serial port, e.g. /dev/ttyUSB0 or COM3
+            baudrate: Port speed
+            line_format: str.format template with r, g and b fields
+            timeout: Seconds before a write is abandoned
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.line_format = line_format
+        self.timeout = timeout
+        self._serial = None
+        self._status = {
+            'connected': False,
+            'error': None,
+            'last_update': None,
+            'last_color': [0, 0, 0],
+            'port': port,
+        }
+
+    def is_connected(self) -> bool:
+        return self._status['connected']
+
+    @property
+    def status(self) -> dict:
+        return self._status
+
+    def connect(self) -> bool:
+        try:
+            import serial
+        except ImportError:
+            self._status['error'] = "pyserial not installed"
+            return False
+        try:
+            self._serial = serial.Serial(self.port, self.baudrate, timeout=self.timeout,
+                                         write_timeout=self.timeout)
+        except (serial.SerialException, ValueError) as e:
+            self._serial = None
+            self._status['connected'] = False
+            self._status['error'] = f"Cannot open {self.port}: {e}"
+            return False
+        self._status['connected'] = True
+        self._status['error'] = None
+        logging.info(f"✅ Serial LED strip connected on {self.port}")
+        return True
+
+    def disconnect(self):
+        if self._serial is not None:
+            self.set_color(0, 0, 0)
+            try:
+                self._serial.close()
+            except Exception as e:
+                logging.error(f"Error closing {self.port}: {e}")
+            self._serial = None
+        self._status['connected'] = False
+
+    def set_color(self, r: int, g: int, b: int) -> bool:
+        # Writes run on the device worker, so reopening here never blocks the monitor
+        if self._serial is None and not self.connect():
+            return False
+        try:
+            self._serial.write(self.line_format.format(r=r, g=g, b=b).encode('ascii'))
+            self._serial.flush()
+        except Exception as e:
+            self._status['error'] = f"Error writing to {self.port}: {e}"
+            self._status['connected'] = False
+            try:
+                self._serial.close()
+            except Exception:
+                pass
+            self._serial = None
+            return False
+        self._status['last_update'] = time.time()
+        self._status['last_color'] = [r, g, b]
+        self._status['error'] = None
+        return True
+
+    def set_status(self, is_busy: bool) -> bool:
+        return self.set_color(*STATE_COLORS[STATE_DND if is_busy else STATE_AVAILABLE])
@@ -0,0 +1,354 @@
+"""
+Background USB presence tracking and reconnection for status devices
+"""
+import logging
+import os
+import select
+import socket
+import threading
+import time
+
+SYSFS_USB_ROOT = '/sys/bus/usb/devices'
+
+# Kernel uevents are multicast on group 1 of NETLINK_KOBJECT_UEVENT, the same
+# stream udev listens to; used only as a wake-up hint before rescanning sysfs
+NETLINK_KOBJECT_UEVENT = 15
+_UEVENT_GROUP = 1
+
+
+def _read_attribute(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def find_usb_devices(vendor_id: str, product_id: str, sysfs_root=SYSFS_USB_ROOT):
+    """
+    Scan sysfs for USB devices with the given IDs.
+
+    Args:
+        vendor_id: Four-digit hex vendor ID, e.g. '04d8'
+        product_id: Four-digit hex product ID
+
+    Returns:
+        dict: Bus path (e.g. '1-2.3') -> serial number (None if the device has
+        none) of every matching device, or None if sysfs is not available
+    """
+    try:
+        entries = os.listdir(sysfs_root)
+    except OSError:
+        return None
+
+    found = {}
+    for entry in sorted(entries):
+        # Interfaces ('1-2:1.0') have no idVendor; only whole devices are matched
+        if ':' in entry:
+            continue
+        base = os.path.join(sysfs_root, entry)
+        vendor = _read_attribute(os.path.join(base, 'idVendor'))
+        if vendor is None or vendor.lower() != vendor_id:
+            continue
+        product = _read_attribute(os.path.join(base, 'idProduct'))
+        if product is None or product.lower() != product_id:
+            continue
+        found[entry] = _read_attribute(os.path.join(base, 'serial'))
+    return found
+
+
+def _open_uevent_socket():
+    """Subscribe to kernel uevents, or return None where netlink is unavailable"""
+    family = getattr(socket, 'AF_NETLINK', None)
+    if family is None:
+        return None
+    try:
+        sock = socket.socket(family, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        sock.bind((0, _UEVENT_GROUP))
+    except OSError as e:
+        logging.debug(f"USB uevents not available: {e}")
+        return None
+    sock.setblocking(False)
+    return sock
+
+
+class _Slot:
+    """Attach bookkeeping for one physical device"""
+
+    def __init__(self, device, serial, retry_delay):
+        self.device = device
+        self.serial = serial
+        self.present = None
+        self.absent_since = None
+        self.backoff = retry_delay
+        self.next_attempt = 0.0
+
+
+class UsbConnectionManager:
+    """
+    Keeps USB status devices attached without blocking their writers.
+
+    A background thread lists matching devices in sysfs (woken early by
+    kernel uevents where netlink is available). Each bus path gets its own
+    device from ``device_factory``; it is attached when it appears and
+    detached when it goes away, and a new flag plugged in later gets a
+    device of its own. A device whose bus path stays empty for
+    ``forget_after`` seconds, or whose serial number turns up at another
+    bus path, is dropped and passed to ``on_removed_device``.
+
+    On systems without sysfs, ``enumerate_devices`` may list the devices
+    instead (e.g. through pyusb). Without either, presence is unknown: a
+    single device with no bus path is created and attaching it is retried
+    with exponential backoff while it is detached.
+
+    Writers never reconnect inline: a failed write detaches the device and
+    the next attempt happens here, after the slot's backoff. The backoff is
+    only reset once a write after attaching succeeds, so a flag that opens
+    but rejects every write is retried at growing intervals instead of in a
+    tight attach/write/detach loop.
+    """
+
+    def __init__(self, vendor_id, product_id, device_factory, on_new_device=None, on_attach=None,
+                 on_removed_device=None, sysfs_root=SYSFS_USB_ROOT, enumerate_devices=None,
+                 poll_interval=5.0, retry_delay=1.0, max_retry_delay=60.0, forget_after=30.0):
+        """
+        Args:
+            vendor_id: Four-digit hex USB vendor ID
+            product_id: Four-digit hex USB product ID
+            device_factory: Called as device_factory(bus_path, serial) for each
+                new physical device; returns a device with attach() -> bool,
+                detach(reason) and is_connected(), or None to ignore it. The
+                manager sets the device's on_detach and on_confirmed hooks
+                when it has them
+            on_new_device: Called with each device created by the factory
+            on_attach: Called with a device after it was attached
+            on_removed_device: Called with each device that was dropped
+            sysfs_root: Directory listing USB devices
+            enumerate_devices: Fallback returning {bus_path: serial} where
+                sysfs is not available
+            poll_interval: Seconds between scans when no uevent arrives
+            retry_delay: First delay after a failed attach
+            max_retry_delay: Upper bound for the backoff
+            forget_after: Seconds a bus path may stay empty before its device is dropped
+        """
+        self.vendor_id = vendor_id.lower()
+        self.product_id = product_id.lower()
+        self.device_factory = device_factory
+        self.on_new_device = on_new_device
+        self.on_attach = on_attach
+        self.on_removed_device = on_removed_device
+        self.sysfs_root = sysfs_root
+        self.enumerate_devices = enumerate_devices
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.forget_after = forget_after
+        self.attach_attempts = 0
+        self._slots = {}  # bus path (None when presence is unknown) -> _Slot
+        self._ignored = set()
+        self._running = False
+        self._uevents = None
+        self._wake_r = None
+        self._wake_w = None
+        self._thread = None
+
+    @property
+    def devices(self) -> list:
+        """Devices created so far, whether attached or not"""
+        return [slot.device for slot in list(self._slots.values())]
+
+    def start(self):
+        """Start the manager thread; the first scan and attach happen right away"""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._uevents = _open_uevent_socket()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._thread = threading.Thread(target=self._run, name='usb-hotplug', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop the manager thread"""
+        if self._thread is None:
+            return
+        self._running = False
+        self.wake()
+        self._thread.join(timeout)
+        for sock in (self._uevents, self._wake_r, self._wake_w):
+            if sock is not None:
+                sock.close()
+        self._uevents = None
+        self._thread = None
+
+    def wake(self):
+        """Rescan and retry now instead of waiting for the next poll (thread-safe)"""
+        for slot in list(self._slots.values()):
+            slot.next_attempt = 0.0
+        self._interrupt()
+
+    def _interrupt(self):
+        try:
+            self._wake_w.send(b'x')
+        except (AttributeError, OSError):
+            pass
+
+    def _detached(self, slot):
+        """A write failed or the device went away: retry after the backoff, which keeps growing"""
+        slot.next_attempt = time.monotonic() + slot.backoff
+        slot.backoff = min(slot.backoff * 2, self.max_retry_delay)
+        self._interrupt()
+
+    def _confirmed(self, slot):
+        """The first write after attaching worked"""
+        slot.backoff = self.retry_delay
+
+    def _drain(self, sock) -> bytes:
+        data = b''
+        while True:
+            try:
+                chunk = sock.recv(8192)
+            except (BlockingIOError, InterruptedError):
+                return data
+            except OSError:
+                return data
+            if not chunk:
+                return data
+            data += chunk
+
+    def _scan(self):
+        found = find_usb_devices(self.vendor_id, self.product_id, self.sysfs_root)
+        if found is None and self.enumerate_devices is not None:
+            try:
+                found = self.enumerate_devices()
+            except Exception as e:
+                logging.debug(f"USB enumeration failed: {e}")
+                found = None
+        return found
+
+    def _slot_for(self, bus_path, serial):
+        slot = self._slots.get(bus_path)
+        if slot is not None or bus_path in self._ignored:
+            return slot
+
+        device = self.device_factory(bus_path, serial)
+        if device is None:
+            self._ignored.add(bus_path)
+            return None
+        slot = self._slots[bus_path] = _Slot(device, serial, self.retry_delay)
+        if hasattr(device, 'on_detach'):
+            device.on_detach = lambda: self._detached(slot)
+        if hasattr(device, 'on_confirmed'):
+            device.on_confirmed = lambda: self._confirmed(slot)
+        if self.on_new_device:
+            try:
+                self.on_new_device(device)
+            except Exception as e:
+                logging.error(f"Error registering USB device: {e}")
+        return slot
+
+    def _remove(self, bus_path, reason):
+        slot = self._slots.pop(bus_path)
+        logging.info(f"🔌 Forgetting USB device at {bus_path}: {reason}")
+        if slot.device.is_connected():
+            slot.device.detach(reason)
+        if self.on_removed_device:
+            try:
+                self.on_removed_device(slot.device)
+            except Exception as e:
+                logging.error(f"Error unregistering USB device: {e}")
+
+    def _try_attach(self, slot, now):
+        if now < slot.next_attempt:
+            return
+        self.attach_attempts += 1
+        try:
+            attached = slot.device.attach()
+        except Exception as e:
+            logging.debug(f"Attach failed: {e}")
+            attached = False
+
+        if not attached:
+            slot.next_attempt = now + slot.backoff
+            slot.backoff = min(slot.backoff * 2, self.max_retry_delay)
+            return
+
+        # The backoff is reset by on_confirmed once a write gets through
+        if not hasattr(slot.device, 'on_confirmed'):
+            slot.backoff = self.retry_delay
+        slot.next_attempt = 0.0
+        if self.on_attach:
+            try:
+                self.on_attach(slot.device)
+            except Exception as e:
+                logging.error(f"Error in attach callback: {e}")
+
+    def check(self, now=None):
+        """Run one scan/attach step (normally called by the manager thread)"""
+        now = time.monotonic() if now is None else now
+        found = self._scan()
+        if found is None:
+            # Presence unknown: keep one device and retry attaching it
+            found = {None: None}
+
+        # A flag re-plugged into another port keeps its serial number; its old device is a ghost now
+        moved = {serial for bus_path, serial in found.items()
+                 if serial is not None and bus_path not in self._slots}
+        for bus_path, slot in list(self._slots.items()):
+            if bus_path not in found and bus_path is not None and slot.serial in moved:
+                self._remove(bus_path, "Device moved to another port")
+
+        for bus_path, serial in found.items():
+            slot = self._slot_for(bus_path, serial)
+            if slot is None:
+                continue
+            if slot.present is not True and bus_path is not None:
+                logging.info(f"🔌 USB device {self.vendor_id}:{self.product_id} plugged in at {bus_path}")
+                # A fresh plug-in is worth trying immediately
+                slot.backoff = self.retry_delay
+                slot.next_attempt = 0.0
+            slot.present = True
+            slot.absent_since = None
+            if not slot.device.is_connected():
+                self._try_attach(slot, now)
+
+        for bus_path, slot in list(self._slots.items()):
+            if bus_path in found or bus_path is None:
+                continue
+            if slot.present:
+                logging.info(f"🔌 USB device {self.vendor_id}:{self.product_id} unplugged from {bus_path}")
+            if slot.absent_since is None:
+                slot.absent_since = now
+            slot.present = False
+            if slot.device.is_connected():
+                slot.device.detach("Device unplugged")
+            if now - slot.absent_since >= self.forget_after:
+                self._remove(bus_path, "Device unplugged")
+
+    def _next_timeout(self):
+        timeout = self.poll_interval
+        now = time.monotonic()
+        for slot in list(self._slots.values()):
+            if slot.present and not slot.device.is_connected():
+                timeout = min(timeout, max(0.0, slot.next_attempt - now))
+        return timeout
+
+    def _run(self):
+        sockets = [self._wake_r] + ([self._uevents] if self._uevents else [])
+        while self._running:
+            self.check()
+            if not self._running:
+                return
+
+            try:
+                readable, _, _ = select.select(sockets, [], [], self._next_timeout())
+            except (OSError, ValueError):
+                return
+
+            if self._wake_r in readable:
+                self._drain(self._wake_r)
+            if self._uevents in readable:
+                events = self._drain(self._uevents)
+                if b'SUBSYSTEM=usb' in events:
+                    # Let the kernel finish populating sysfs before rescanning
+                    time.sleep(0.1)
@@ -0,0 +1,116 @@
+"""
+Per-device I/O worker with a one-slot, latest-wins mailbox
+"""
+import logging
+import threading
+import time
+
+
+class DeviceWorker:
+    """
+    Runs a device's writes on its own thread.
+
+    The mailbox holds a single command: submitting while a write is in flight
+    replaces whatever was waiting, so if three status changes arrive during a
+    slow USB write only the newest one is sent next. Callers never block on
+    device I/O.
+    """
+
+    def __init__(self, device, on_result=None, timeout=2.0, name=None):
+        """
+        Args:
+            device: The StatusDevice to drive
+            on_result: Called as on_result(key, ok) on the worker thread after each write
+            timeout: Seconds after which an in-flight write is reported as stalled
+            name: Thread name
+        """
+        self.device = device
+        self.on_result = on_result
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._pending = None
+        self._in_flight_since = None
+        self._stalled_reported = False
+        self._running = True
+        self.writes = 0
+        self.coalesced = 0
+        self._thread = threading.Thread(
+            target=self._run, name=name or f"device-{type(device).__name__}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, key, write):
+        """
+        Queue a write, replacing any write that has not started yet.
+
+        Args:
+            key: Identifies the command (passed back to on_result)
+            write: Callable taking the device and returning True on success
+        """
+        with self._condition:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (key, write)
+            self._condition.notify()
+
+    def is_stalled(self) -> bool:
+        """True if the current write has been running longer than the timeout"""
+        since = self._in_flight_since
+        return since is not None and time.monotonic() - since > self.timeout
+
+    def check_stalled(self) -> bool:
+        """Log a stalled write once; returns True while the write is stalled"""
+        if not self.is_stalled():
+            self._stalled_reported = False
+            return False
+        if not self._stalled_reported:
+            self._stalled_reported = True
+            logging.warning(f"⚠️ {type(self.device).__name__} write has not returned after {self.timeout}s")
+        return True
+
+    def wait_idle(self, timeout=None) -> bool:
+        """Wait until the mailbox is empty and no write is running"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending is not None or self._in_flight_since is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stop(self, timeout=2.0):
+        """Stop the worker after the current write; pending writes are dropped"""
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                key, write = self._pending
+                self._pending = None
+                self._in_flight_since = time.monotonic()
+
+            ok = False
+            try:
+                ok = bool(write(self.device))
+            except Exception as e:
+                logging.error(f"Error updating device: {e}")
+
+            if self.on_result:
+                try:
+                    self.on_result(key, ok)
+                except Exception as e:
+                    logging.error(f"Error handling device result: {e}")
+
+            with self._condition:
+                self._in_flight_since = None
+                self.writes += 1
+                self._condition.notify_all()
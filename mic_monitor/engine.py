@@ -0,0 +1,143 @@
+"""
+asyncio detection engine: runs a backend's probes concurrently with per-probe deadlines
+"""
+import asyncio
+import logging
+import os
+import subprocess
+import threading
+import time
+from . import metrics
+
+SUBPROCESSES = metrics.ByLabel(metrics.counter, 'mic_monitor_subprocesses_total',
+                               "Subprocesses started by detection probes", 'command')
+PROBE_SECONDS = metrics.ByLabel(metrics.histogram, 'mic_monitor_probe_seconds',
+                                "Duration of each detection probe", 'probe')
+PROBE_TIMEOUTS = metrics.ByLabel(metrics.counter, 'mic_monitor_probe_failures_total',
+                                 "Probes that failed or missed their deadline", 'probe', reason='timeout')
+PROBE_ERRORS = metrics.ByLabel(metrics.counter, 'mic_monitor_probe_failures_total',
+                               "Probes that failed or missed their deadline", 'probe', reason='error')
+
+
+class Probe:
+    """
+    One detection step.
+
+    Args:
+        name: Key of the result in DetectionEngine.gather()
+        factory: Callable returning the coroutine to run
+        deadline: Seconds before the probe is cancelled
+        required: Optional probes are cancelled once every required probe is done
+    """
+
+    def __init__(self, name, factory, deadline, required=True):
+        self.name = name
+        self.factory = factory
+        self.deadline = deadline
+        self.required = required
+
+
+async def run_command(args, timeout, **kwargs):
+    """
+    Run a command as an async subprocess.
+
+    The process is killed if the deadline passes or the caller is cancelled.
+
+    Returns:
+        tuple: (returncode, stdout text)
+    """
+    SUBPROCESSES[os.path.basename(args[0])].inc()
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **kwargs
+    )
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+    finally:
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+    return process.returncode, stdout.decode('utf-8', errors='replace')
+
+
+async def run_in_thread(func, *args):
+    """Run a blocking call (registry walk, psutil) without stalling other probes"""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+class DetectionEngine:
+    """
+    Runs probes concurrently so a tick takes about as long as its slowest
+    required probe instead of the sum of all of them.
+
+    The event loop is kept for the lifetime of the engine and driven from
+    the calling thread (the monitor thread).
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+        self.last_tick = {}
+
+    def run(self, coro):
+        """Run a coroutine to completion on the engine's event loop"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(coro)
+
+    def close(self):
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.close()
+            self._loop = None
+
+    async def gather(self, probes):
+        """
+        Run probes concurrently.
+
+        Returns:
+            dict: Probe name -> result, or None if the probe failed or missed its deadline
+        """
+        started = time.perf_counter()
+        timings = {}
+
+        async def guarded(probe):
+            probe_started = time.perf_counter()
+            try:
+                return await asyncio.wait_for(probe.factory(), probe.deadline)
+            except asyncio.TimeoutError:
+                logging.debug(f"Probe {probe.name} missed its {probe.deadline}s deadline")
+                PROBE_TIMEOUTS[probe.name].inc()
+            except asyncio.CancelledError:
+                logging.debug(f"Probe {probe.name} cancelled")
+                raise
+            except Exception as e:
+                logging.debug(f"Probe {probe.name} failed: {e}")
+                PROBE_ERRORS[probe.name].inc()
+            finally:
+                timings[probe.name] = time.perf_counter() - probe_started
+                PROBE_SECONDS[probe.name].observe(timings[probe.name])
+            return None
+
+        tasks = {probe.name: asyncio.ensure_future(guarded(probe)) for probe in probes}
+        required = [tasks[probe.name] for probe in probes if probe.required]
+        if required:
+            await asyncio.wait(required)
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+        if tasks:
+            await asyncio.wait(list(tasks.values()))
+
+        results = {}
+        for name, task in tasks.items():
+            results[name] = None if task.cancelled() else task.result()
+
+        self.last_tick = {
+            'duration': time.perf_counter() - started,
+            'probes': timings,
+        }
+        return results
@@ -0,0 +1,218 @@
+"""
+Long-lived helper interpreters (PowerShell, osascript) that answer probe requests over a pipe
+"""
+import asyncio
+import json
+import logging
+import subprocess
+import time
+from . import metrics
+from .scheduler import track_child, untrack_child
+
+# Replies can carry a whole process or window list
+LINE_LIMIT = 1024 * 1024
+
+REQUESTS = metrics.ByLabel(metrics.counter, 'mic_monitor_helper_requests_total',
+                           "Requests sent to helper processes", 'helper')
+STARTS = metrics.ByLabel(metrics.counter, 'mic_monitor_helper_starts_total',
+                         "Helper processes started (including restarts)", 'helper')
+FAILURES = metrics.ByLabel(metrics.counter, 'mic_monitor_helper_failures_total',
+                           "Helper processes killed after crashing or stalling", 'helper')
+
+
+class HelperError(Exception):
+    """The helper could not answer: not running, crashed, stalled or returned an error"""
+
+
+class HelperProcess:
+    """
+    Keeps one interpreter running and sends it requests instead of starting
+    a new process per probe.
+
+    The protocol is one JSON object per line in each direction. A request is
+    ``{"id": n, ...}`` and its reply ``{"id": n, "ok": true, "result": ...}``
+    or ``{"id": n, "ok": false, "error": "..."}``. Lines that are not JSON or
+    carry another id (e.g. the late reply to an abandoned request) are
+    skipped. Requests are sent one at a time; use a HelperPool to run
+    several at once.
+
+    The request timeout starts when the request is sent, not while it waits
+    for the previous one. If the helper exits or does not reply in time, it
+    is killed and started again on a later request; restarts back off from
+    ``restart_delay`` to ``max_restart_delay`` seconds while it keeps
+    failing, and requests during the back-off fail immediately. A caller
+    that is cancelled does not kill the helper: its reply is skipped when it
+    arrives, and a helper that really is stuck fails the next request's
+    timeout.
+    """
+
+    def __init__(self, name, command, timeout=5.0, restart_delay=1.0, max_restart_delay=60.0, **popen_kwargs):
+        """
+        Args:
+            name: Label for log messages
+            command: Argument list that starts the helper
+            timeout: Default seconds to wait for a reply
+            restart_delay: Initial wait before restarting a failed helper
+            max_restart_delay: Longest wait between restarts
+            popen_kwargs: Extra arguments for the subprocess (e.g. creationflags)
+        """
+        self.name = name
+        self.command = command
+        self.timeout = timeout
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.popen_kwargs = popen_kwargs
+        self._process = None
+        self._lock = None
+        self._next_id = 0
+        self._delay = restart_delay
+        self._retry_at = 0.0
+        self.starts = 0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def request(self, payload: dict, timeout=None):
+        """
+        Send a request and wait for its reply.
+
+        Args:
+            payload: JSON-serialisable fields of the request; "id" is added
+            timeout: Seconds to wait for the reply once sent (defaults to self.timeout)
+
+        Returns:
+            The reply's "result"
+
+        Raises:
+            HelperError: The helper failed or reported an error
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            process = await self._ensure_started()
+            self._next_id += 1
+            request_id = self._next_id
+            self.requests += 1
+            REQUESTS[self.name].inc()
+            try:
+                process.stdin.write(json.dumps(dict(payload, id=request_id)).encode('utf-8') + b'\n')
+                await process.stdin.drain()
+                reply = await asyncio.wait_for(self._read_reply(process, request_id), timeout or self.timeout)
+            except asyncio.TimeoutError:
+                await self._failed(f"no reply within {timeout or self.timeout}s")
+                raise HelperError(f"{self.name} helper stalled")
+            except (OSError, EOFError) as e:
+                await self._failed(str(e) or "exited")
+                raise HelperError(f"{self.name} helper exited")
+            self._delay = self.restart_delay
+            if not reply.get('ok', False):
+                raise HelperError(reply.get('error') or f"{self.name} helper request failed")
+            return reply.get('result')
+
+    async def _ensure_started(self):
+        if self.running:
+            return self._process
+        if time.monotonic() < self._retry_at:
+            raise HelperError(f"{self.name} helper is restarting")
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                limit=LINE_LIMIT, **self.popen_kwargs
+            )
+        except OSError as e:
+            self._schedule_restart()
+            raise HelperError(f"Cannot start {self.name} helper: {e}")
+        self.starts += 1
+        track_child(self._process.pid)
+        STARTS[self.name].inc()
+        logging.debug(f"Started {self.name} helper (pid {self._process.pid})")
+        return self._process
+
+    async def _read_reply(self, process, request_id):
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                raise EOFError()
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                logging.debug(f"{self.name} helper: skipping output {line[:80]!r}")
+                continue
+            if isinstance(reply, dict) and reply.get('id') == request_id:
+                return reply
+
+    async def _failed(self, reason):
+        """Kill the helper and back off before starting it again"""
+        self.failures += 1
+        FAILURES[self.name].inc()
+        logging.warning(f"⚠️ {self.name} helper failed ({reason}), restarting in {self._delay:g}s")
+        await self._kill()
+        self._schedule_restart()
+
+    def _schedule_restart(self):
+        self._retry_at = time.monotonic() + self._delay
+        self._delay = min(self._delay * 2, self.max_restart_delay)
+
+    async def _kill(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+        untrack_child(process.pid)
+
+    async def close(self):
+        """Stop the helper; closing its stdin lets it exit on its own first"""
+        process = self._process
+        if process is None:
+            return
+        if process.returncode is None:
+            try:
+                process.stdin.close()
+                await asyncio.wait_for(process.wait(), 1.0)
+            except (OSError, asyncio.TimeoutError):
+                pass
+        await self._kill()
+
+
+class HelperPool:
+    """
+    Several copies of one helper, so that requests run in parallel instead
+    of queueing behind each other. A request goes to the first idle helper
+    and waits for one only when all are busy; each request's timeout starts
+    when its helper sends it.
+    """
+
+    def __init__(self, name, command, size=2, **kwargs):
+        """
+        Args:
+            name: Label for log messages and metrics
+            command: Argument list that starts each helper
+            size: Number of helpers; each is started on first use
+            kwargs: HelperProcess options (timeout, restart delays, popen arguments)
+        """
+        self.helpers = [HelperProcess(name, command, **kwargs) for _ in range(size)]
+        self._idle = None
+
+    async def request(self, payload: dict, timeout=None):
+        """Send a request to an idle helper; see HelperProcess.request()"""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for helper in self.helpers:
+                self._idle.put_nowait(helper)
+        helper = await self._idle.get()
+        try:
+            return await helper.request(payload, timeout)
+        finally:
+            self._idle.put_nowait(helper)
+
+    async def close(self):
+        for helper in self.helpers:
+            await helper.close()
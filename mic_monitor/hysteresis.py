@@ -0,0 +1,106 @@
+"""
+Hysteresis between raw microphone detection and the devices/UI
+"""
+import time
+
+STATE_IDLE = 'idle'
+STATE_ENTERING = 'entering'
+STATE_ACTIVE = 'active'
+STATE_EXITING = 'exiting'
+
+
+class MeetingDebouncer:
+    """
+    Debounces the raw ``in_use`` flag with enter/exit dwell times.
+
+    A meeting is confirmed only after the microphone has been in use for
+    ``enter_dwell`` seconds, and ends only after ``exit_dwell`` seconds of
+    silence. Readings that flip back before the dwell time is up are
+    ignored, so a borderline CPU check does not flap the flag red/green.
+
+        idle --in use--> entering --enter_dwell--> active
+        active --silent--> exiting --exit_dwell--> idle
+    """
+
+    def __init__(self, enter_dwell=2.0, exit_dwell=5.0, clock=time.monotonic):
+        """
+        Args:
+            enter_dwell: Seconds of continuous use before a meeting is confirmed
+            exit_dwell: Seconds of continuous silence before a meeting ends
+            clock: Monotonic time source
+        """
+        self.enter_dwell = enter_dwell
+        self.exit_dwell = exit_dwell
+        self.clock = clock
+        self.state = STATE_IDLE
+        self.confirmed_apps = []
+        self._since = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a debouncer from the user configuration"""
+        return cls(enter_dwell=config['meeting_confirm_seconds'],
+                   exit_dwell=config['meeting_end_seconds'])
+
+    @property
+    def confirmed(self) -> bool:
+        """True while a meeting is confirmed (including its exit dwell)"""
+        return self.state in (STATE_ACTIVE, STATE_EXITING)
+
+    def update(self, in_use: bool, now=None) -> bool:
+        """
+        Feed one raw reading.
+
+        Returns:
+            bool: The confirmed microphone state
+        """
+        now = self.clock() if now is None else now
+
+        if self.state == STATE_IDLE:
+            if in_use:
+                self.state, self._since = STATE_ENTERING, now
+        elif self.state == STATE_ENTERING:
+            if not in_use:
+                self.state = STATE_IDLE
+        elif self.state == STATE_ACTIVE:
+            if not in_use:
+                self.state, self._since = STATE_EXITING, now
+        elif self.state == STATE_EXITING:
+            if in_use:
+                self.state = STATE_ACTIVE
+
+        # Dwell times are checked right away so a zero dwell passes straight through
+        if self.state == STATE_ENTERING and now - self._since >= self.enter_dwell:
+            self.state = STATE_ACTIVE
+        elif self.state == STATE_EXITING and now - self._since >= self.exit_dwell:
+            self.state = STATE_IDLE
+        return self.confirmed
+
+    def time_to_decision(self, now=None):
+        """Seconds until a pending transition is confirmed, or None if nothing is pending"""
+        now = self.clock() if now is None else now
+        if self.state == STATE_ENTERING:
+            return max(0.0, self._since + self.enter_dwell - now)
+        if self.state == STATE_EXITING:
+            return max(0.0, self._since + self.exit_dwell - now)
+        return None
+
+    def filter(self, mic_status: dict, now=None) -> dict:
+        """
+        Apply the debouncer to a platform monitor status.
+
+        Returns:
+            dict: Copy of the status with the confirmed 'in_use' flag; during
+            the exit dwell the last confirmed apps are kept
+        """
+        mic_status = dict(mic_status or {})
+        raw_in_use = bool(mic_status.get('in_use', False))
+        confirmed = self.update(raw_in_use, now)
+
+        if confirmed and raw_in_use:
+            self.confirmed_apps = list(mic_status.get('using_apps') or [])
+        elif not confirmed:
+            self.confirmed_apps = []
+        mic_status['in_use'] = confirmed
+        mic_status['using_apps'] = list(self.confirmed_apps)
+        return mic_status
@@ -0,0 +1,95 @@
+"""
+Tray icon rasters, rendered once per status color and size
+"""
+import logging
+import sys
+from PIL import Image, ImageDraw
+from .snapshot import STATE_COLORS
+
+# Sizes tray hosts ask for: 16/24/32 on Windows at 100-200% scaling, 44
+# (22pt @2x) on macOS, 22-64 on Linux panels, and larger for HiDPI
+ICON_SIZES = (16, 24, 32, 48, 64, 128, 256)
+
+BACKGROUND = (245, 245, 245)
+MICROPHONE = (100, 100, 100)
+
+# Shapes are drawn on a 64x64 grid, scaled to the target size
+_GRID = 64
+_MIC_HEAD = (20, 15, 44, 35)
+_MIC_STEM = (30, 35, 34, 45)
+_MIC_BASE = (25, 45, 39, 50)
+_STATUS_DOT = (45, 15, 55, 25)
+
+
+def _scaled(box, scale):
+    return [round(value * scale) for value in box]
+
+
+def render_icon(color, size=64) -> Image.Image:
+    """
+    Draw the microphone icon with a status dot.
+
+    Small sizes are drawn at 4x and downsampled so the shapes stay smooth.
+    """
+    supersample = 4 if size < _GRID else 1
+    canvas = size * supersample
+    scale = canvas / _GRID
+    image = Image.new('RGB', (canvas, canvas), color=BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    draw.ellipse(_scaled(_MIC_HEAD, scale), fill=MICROPHONE)
+    draw.rectangle(_scaled(_MIC_STEM, scale), fill=MICROPHONE)
+    draw.rectangle(_scaled(_MIC_BASE, scale), fill=MICROPHONE)
+    draw.ellipse(_scaled(_STATUS_DOT, scale), fill=tuple(color))
+    if supersample > 1:
+        image = image.resize((size, size), Image.LANCZOS)
+    return image
+
+
+def pick_size(requested: int) -> int:
+    """Smallest pre-rendered size that is at least ``requested`` pixels"""
+    for size in ICON_SIZES:
+        if size >= requested:
+            return size
+    return ICON_SIZES[-1]
+
+
+def tray_icon_size() -> int:
+    """Pixel size the system tray displays icons at on this platform"""
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            user32 = ctypes.windll.user32
+            small_icon = user32.GetSystemMetrics(49)  # SM_CXSMICON
+            dpi = user32.GetDpiForSystem() if hasattr(user32, 'GetDpiForSystem') else 96
+            return pick_size(round(small_icon * dpi / 96))
+        except Exception as e:
+            logging.debug(f"Could not read the tray icon size: {e}")
+            return 32
+    if sys.platform == 'darwin':
+        return pick_size(44)
+    return 64
+
+
+class IconCache:
+    """
+    Pre-rendered icons for every status color.
+
+    Images are shared between ticks and must not be modified by callers.
+    """
+
+    def __init__(self, sizes=ICON_SIZES, colors=None):
+        self._images = {}
+        for color in colors or set(STATE_COLORS.values()):
+            for size in sizes:
+                self._images[(tuple(color), size)] = render_icon(color, size)
+
+    def get(self, color, size=64) -> Image.Image:
+        """Icon for a status color, rendered on first use for unexpected colors or sizes"""
+        key = (tuple(color), size)
+        image = self._images.get(key)
+        if image is None:
+            image = self._images[key] = render_icon(color, size)
+        return image
+
+    def __len__(self):
+        return len(self._images)
@@ -0,0 +1,282 @@
+"""
+In-process metrics: counters, gauges and fixed-bucket histograms
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from .config import state_dir
+
+# Upper bounds in seconds, from sub-millisecond probes to stalled subprocesses
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+
+class Counter:
+    """A value that only goes up (events, writes, failures)"""
+
+    kind = COUNTER
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def export(self):
+        return self.value
+
+
+class Gauge:
+    """A value that is set to the current reading (pending items, open helpers)"""
+
+    kind = GAUGE
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def export(self):
+        return self.value
+
+
+class Histogram:
+    """
+    Observations counted into fixed buckets.
+
+    Recording is a bisect and three additions; quantiles are estimated as
+    the upper bound of the bucket they fall in.
+    """
+
+    kind = HISTOGRAM
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        # One count per bucket plus one for values above the last bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        """Observe the wall-clock duration of a block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def export(self):
+        with self._lock:
+            return {'count': self.count, 'sum': self.sum, 'buckets': list(self.buckets), 'counts': list(self.counts)}
+
+
+def estimate_quantile(exported: dict, q: float):
+    """Upper bound of the bucket holding quantile ``q`` of an exported histogram (None if empty)"""
+    total = exported['count']
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, count in zip(exported['buckets'], exported['counts']):
+        seen += count
+        if seen >= rank:
+            return bound
+    return float('inf')
+
+
+class Registry:
+    """
+    Named metrics, optionally with labels.
+
+    Each (name, labels) pair is created on first use and returned on later
+    calls, so call sites can look metrics up once and keep them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._help = {}
+        self._kinds = {}
+        self.started = time.time()
+
+    def _get(self, factory, name, help, labels, **kwargs):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                if self._kinds.setdefault(name, factory.kind) != factory.kind:
+                    raise ValueError(f"Metric {name} is already registered as a {self._kinds[name]}")
+                metric = self._metrics[key] = factory(**kwargs)
+                self._help.setdefault(name, help)
+            return metric
+
+    def counter(self, name, help='', **labels) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help='', **labels) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help='', buckets=DEFAULT_BUCKETS, **labels) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def snapshot(self) -> dict:
+        """All current values as a JSON-serialisable document"""
+        with self._lock:
+            items = sorted(self._metrics.items())
+        return {
+            'written_at': datetime.now().isoformat(timespec='seconds'),
+            'uptime': time.time() - self.started,
+            'metrics': [
+                {'name': name, 'type': metric.kind, 'help': self._help.get(name, ''),
+                 'labels': dict(labels), 'value': metric.export()}
+                for (name, labels), metric in items
+            ],
+        }
+
+
+def _label_text(labels: dict, extra=None) -> str:
+    pairs = dict(labels, **(extra or {}))
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in pairs.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(pairs, escaped)) + '}'
+
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(snapshot: dict) -> str:
+    """Format a snapshot in the Prometheus text exposition format"""
+    lines = []
+    described = set()
+    for metric in snapshot['metrics']:
+        name, labels, value = metric['name'], metric['labels'], metric['value']
+        if name not in described:
+            described.add(name)
+            if metric['help']:
+                lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+        if metric['type'] != HISTOGRAM:
+            lines.append(f"{name}{_label_text(labels)} {_number(value)}")
+            continue
+        cumulative = 0
+        for bound, count in zip(value['buckets'] + [float('inf')], value['counts']):
+            cumulative += count
+            lines.append(f"{name}_bucket{_label_text(labels, {'le': _number(bound)})} {cumulative}")
+        lines.append(f"{name}_sum{_label_text(labels)} {_number(value['sum'])}")
+        lines.append(f"{name}_count{_label_text(labels)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_path() -> str:
+    """Where the running monitor publishes its metrics for `mic-monitor stats`"""
+    return os.path.join(state_dir(), 'metrics.json')
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+class MetricsWriter:
+    """
+    Publishes the registry every ``interval`` seconds: as JSON for
+    `mic-monitor stats`, and optionally as a Prometheus textfile-collector
+    file (a .prom file that node_exporter picks up), so metrics can be
+    scraped without the monitor opening a port.
+    """
+
+    def __init__(self, registry, interval=60.0, path=None, textfile=None):
+        self.registry = registry
+        self.interval = interval
+        self.path = path or metrics_path()
+        self.textfile = os.path.expanduser(textfile) if textfile else None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, registry, config):
+        """Build a writer from the user configuration, or None when disabled"""
+        if not config['metrics_interval']:
+            return None
+        return cls(registry, config['metrics_interval'], textfile=config['metrics_textfile'])
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread after one last write"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write(self):
+        snapshot = self.registry.snapshot()
+        try:
+            _write_atomic(self.path, json.dumps(snapshot))
+            if self.textfile:
+                _write_atomic(self.textfile, render_prometheus(snapshot))
+        except OSError as e:
+            logging.warning(f"⚠️ Could not write metrics: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+        self.write()
+
+
+# The process-wide registry every module records into
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+class ByLabel(dict):
+    """
+    One metric per value of a label, e.g. ``PROBE_SECONDS['registry']``.
+
+    Each metric is registered on first use; after that a lookup is a plain
+    dict read. ``labels`` are fixed labels shared by every metric.
+    """
+
+    def __init__(self, factory, name, help, label, **labels):
+        super().__init__()
+        self._factory = factory
+        self._name = name
+        self._help = help
+        self._label = label
+        self._labels = labels
+
+    def __missing__(self, value):
+        metric = self[value] = self._factory(self._name, self._help, **self._labels, **{self._label: value})
+        return metric
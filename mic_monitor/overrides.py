@@ -0,0 +1,125 @@
+"""
+Expiry of timed overrides ("Do Not Disturb for 30 minutes", "Away for 1 hour")
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+# Deadlines are wall-clock times, but waits run on the monotonic clock, which
+# stops during suspend on some platforms. Pending deadlines are re-checked at
+# least this often so an override still ends on time after a laptop wakes up.
+MAX_WAIT = 60.0
+
+
+class OverrideScheduler:
+    """
+    Runs callbacks at wall-clock deadlines from a single thread.
+
+    Entries are kept in a heap ordered by deadline. cancel() only forgets the
+    handle; the heap entry is dropped when it comes due (or when stale entries
+    outnumber live ones), so cancelling is O(1) and a cancelled callback never
+    runs. Each callback runs at most once, on the scheduler thread, with its
+    handle as the only argument.
+    """
+
+    def __init__(self, max_wait=MAX_WAIT):
+        self.max_wait = max_wait
+        self._heap = []
+        self._live = {}
+        self._handles = itertools.count(1)
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.fired = 0
+
+    def call_at(self, when: float, callback) -> int:
+        """
+        Schedule ``callback(handle)`` at ``when`` (a time.time() timestamp).
+
+        Returns:
+            int: Handle for cancel()
+        """
+        with self._condition:
+            handle = next(self._handles)
+            self._live[handle] = callback
+            heapq.heappush(self._heap, (when, handle))
+            self._compact()
+            self._ensure_thread()
+            # Wake the thread if this is now the earliest deadline
+            self._condition.notify()
+        return handle
+
+    def call_later(self, delay: float, callback) -> int:
+        """Schedule ``callback(handle)`` in ``delay`` seconds"""
+        return self.call_at(time.time() + delay, callback)
+
+    def cancel(self, handle) -> bool:
+        """
+        Forget a scheduled callback.
+
+        Returns:
+            bool: False if it already ran, was cancelled or never existed
+        """
+        if handle is None:
+            return False
+        with self._condition:
+            cancelled = self._live.pop(handle, None) is not None
+            self._compact()
+        return cancelled
+
+    def pending(self) -> int:
+        """Number of callbacks still waiting to run"""
+        with self._condition:
+            return len(self._live)
+
+    def stop(self):
+        """Stop the thread; pending callbacks are dropped"""
+        with self._condition:
+            self._running = False
+            self._live.clear()
+            self._heap.clear()
+            self._condition.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="override-scheduler", daemon=True)
+            self._thread.start()
+
+    def _compact(self):
+        """Drop cancelled entries once they make up most of the heap"""
+        if len(self._heap) > 2 * len(self._live) + 16:
+            self._heap = [entry for entry in self._heap if entry[1] in self._live]
+            heapq.heapify(self._heap)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                callback = None
+                while self._running and callback is None:
+                    # Cancelled entries at the front are discarded without waiting
+                    while self._heap and self._heap[0][1] not in self._live:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    when, handle = self._heap[0]
+                    remaining = when - time.time()
+                    if remaining > 0:
+                        self._condition.wait(min(remaining, self.max_wait))
+                        continue
+                    heapq.heappop(self._heap)
+                    callback = self._live.pop(handle)
+                if not self._running:
+                    return
+            # Run outside the lock so callbacks can schedule or cancel
+            self.fired += 1
+            try:
+                callback(handle)
+            except Exception as e:
+                logging.error(f"Error in scheduled override callback: {e}", exc_info=True)
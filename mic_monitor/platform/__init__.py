@@ -1,25 +1,122 @@
-import sys
-import platform
+"""
+Registry of microphone monitor backends.
+
+Backends are registered by name as 'module:attribute' strings and imported
+only when first selected, so importing this package never pulls in winreg,
+pyobjc or sound-server clients for platforms that will not use them.
+Third-party backends can register through the 'mic_monitor.platforms'
+entry-point group.
+"""
+import importlib
 import logging
-from .windows import WindowsMicrophoneMonitor
-from .macos import MacOSMicrophoneMonitor
-from .linux import LinuxMicrophoneMonitor
+import os
+import sys
+
+ENTRY_POINT_GROUP = 'mic_monitor.platforms'
+
+# Environment variable that overrides the backend chosen from sys.platform
+BACKEND_ENV = 'MIC_MONITOR_BACKEND'
+
+_BACKENDS = {
+    'windows': 'mic_monitor.platform.windows:WindowsMicrophoneMonitor',
+    'macos': 'mic_monitor.platform.macos:MacOSMicrophoneMonitor',
+    'linux': 'mic_monitor.platform.linux:LinuxMicrophoneMonitor',
+}
+
+_loaded = {}
+_entry_points_loaded = False
+
+
+def register_backend(name, target):
+    """
+    Register a monitor backend.
+
+    Args:
+        name: Backend name used for selection
+        target: 'module:attribute' string, or the monitor class/factory itself
+    """
+    _BACKENDS[name] = target
+    _loaded.pop(name, None)
+
+
+def default_backend_name(platform_name=None):
+    """Backend name for a sys.platform value"""
+    platform_name = platform_name or sys.platform
+    if platform_name == 'win32':
+        return 'windows'
+    if platform_name == 'darwin':
+        return 'macos'
+    if platform_name.startswith('linux'):
+        return 'linux'
+    return None
+
 
-def get_platform_monitor():
+def _load_entry_points():
+    """Register backends published by other packages (done once, on demand)"""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return
+
+    try:
+        eps = entry_points()
+        group = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, 'select') else eps.get(ENTRY_POINT_GROUP, [])
+    except Exception as e:
+        logging.debug(f"Could not read {ENTRY_POINT_GROUP} entry points: {e}")
+        return
+    for ep in group:
+        _BACKENDS.setdefault(ep.name, ep.value)
+
+
+def available_backends():
+    """Names of every registered backend, including entry-point plugins"""
+    _load_entry_points()
+    return sorted(_BACKENDS)
+
+
+def load_backend(name):
+    """
+    Import a backend and return its monitor class.
+
+    Raises:
+        NotImplementedError: If no backend with that name is registered
+    """
+    if name in _loaded:
+        return _loaded[name]
+    if name not in _BACKENDS:
+        _load_entry_points()
+    if name not in _BACKENDS:
+        raise NotImplementedError(f"No microphone monitor backend named '{name}'")
+
+    target = _BACKENDS[name]
+    if isinstance(target, str):
+        module_name, _, attribute = target.partition(':')
+        factory = importlib.import_module(module_name)
+        for part in attribute.split('.'):
+            factory = getattr(factory, part)
+    else:
+        factory = target
+    _loaded[name] = factory
+    return factory
+
+
+def get_platform_monitor(name=None, **kwargs):
     """
     Factory function to get the appropriate microphone monitor for the current platform.
-    
+
+    Args:
+        name: Backend name; defaults to $MIC_MONITOR_BACKEND, then sys.platform
+        **kwargs: Passed to the backend constructor
+
     Returns:
         object: Platform-specific microphone monitor instance
     """
-    system = platform.system().lower()
-    
-    if system == 'windows':
-        return WindowsMicrophoneMonitor()
-    elif system == 'darwin':
-        return MacOSMicrophoneMonitor()
-    elif system == 'linux':
-        return LinuxMicrophoneMonitor()
-    else:
-        logging.error(f"Unsupported platform: {system}")
-        raise NotImplementedError(f"Microphone monitoring not supported on {system}") 
\ No newline at end of file
+    name = name or os.environ.get(BACKEND_ENV) or default_backend_name()
+    if not name:
+        logging.error(f"Unsupported platform: {sys.platform}")
+        raise NotImplementedError(f"Microphone monitoring not supported on {sys.platform}")
+    return load_backend(name)(**kwargs)
@@ -1,38 +1,232 @@
 import logging
-import subprocess
+import os
+import re
+import time
+
+# Capture PCM directories are named pcm<device>c, playback ones pcm<device>p
+_CARD_RE = re.compile(r'^card(\d+)$')
+_CAPTURE_PCM_RE = re.compile(r'^pcm(\d+)c$')
+_SUBSTREAM_RE = re.compile(r'^sub\d+$')
+
+# Substream states that mean audio is actually being captured
+_ACTIVE_STATES = ('RUNNING', 'XRUN', 'DRAINING')
+
+
+BACKEND_AUTO = 'auto'
+BACKEND_ALSA = 'alsa'
+BACKEND_PIPEWIRE = 'pipewire'
+BACKEND_PULSEAUDIO = 'pulseaudio'
+
 
 class LinuxMicrophoneMonitor:
-    """Linux implementation of microphone monitoring"""
-    
-    def __init__(self):
-        # TODO: Implement Linux-specific initialization
-        pass
-        
+    """
+    Linux implementation of microphone monitoring.
+
+    The 'alsa' backend reads capture state from /proc/asound. The 'pipewire'
+    backend keeps a pw-dump monitor running and the 'pulseaudio' backend
+    subscribes over the native protocol; both can name the recording client
+    behind the sound server. 'auto' picks the first sound server it finds.
+    """
+
+    def __init__(self, asound_root='/proc/asound', proc_root='/proc', rescan_interval=5.0,
+                 backend=BACKEND_AUTO):
+        """
+        Args:
+            asound_root: Location of the ALSA procfs tree
+            proc_root: Location of procfs, used to resolve owner_pid
+            rescan_interval: Seconds between rescans for hotplugged cards
+            backend: 'auto', 'alsa', 'pipewire' or 'pulseaudio'
+        """
+        self.asound_root = asound_root
+        self.proc_root = proc_root
+        self.rescan_interval = rescan_interval
+        self._substreams = []
+        self._device_names = {}
+        self._last_scan = None
+        self.stream_monitor = None
+
+        if backend == BACKEND_AUTO:
+            from .pipewire import pipewire_available
+            from .pulseaudio import pulseaudio_available
+            if pipewire_available():
+                backend = BACKEND_PIPEWIRE
+            elif pulseaudio_available():
+                backend = BACKEND_PULSEAUDIO
+            else:
+                backend = BACKEND_ALSA
+        if backend == BACKEND_PIPEWIRE:
+            from .pipewire import PipeWireStreamMonitor
+            self.stream_monitor = PipeWireStreamMonitor()
+            self.stream_monitor.start()
+        elif backend == BACKEND_PULSEAUDIO:
+            from .pulseaudio import PulseSourceOutputMonitor
+            self.stream_monitor = PulseSourceOutputMonitor()
+            self.stream_monitor.start()
+        elif backend != BACKEND_ALSA:
+            raise ValueError(f"Unknown Linux backend: {backend}")
+        self.backend = backend
+        logging.info(f"🎤 Linux microphone backend: {backend}")
+
+    def _scan_substreams(self):
+        """Find every capture substream status file (cards can be hotplugged)"""
+        substreams = []
+        try:
+            cards = os.listdir(self.asound_root)
+        except OSError as e:
+            logging.debug(f"ALSA procfs not available: {e}")
+            cards = []
+
+        for card in cards:
+            card_match = _CARD_RE.match(card)
+            if not card_match:
+                continue
+            card_path = os.path.join(self.asound_root, card)
+            try:
+                pcms = os.listdir(card_path)
+            except OSError:
+                continue
+            for pcm in pcms:
+                pcm_match = _CAPTURE_PCM_RE.match(pcm)
+                if not pcm_match:
+                    continue
+                pcm_path = os.path.join(card_path, pcm)
+                device = self._describe_device(card_path, pcm_path, card_match.group(1), pcm_match.group(1))
+                try:
+                    subs = os.listdir(pcm_path)
+                except OSError:
+                    continue
+                for sub in subs:
+                    if _SUBSTREAM_RE.match(sub):
+                        substreams.append((os.path.join(pcm_path, sub, 'status'), device))
+
+        self._substreams = substreams
+        self._last_scan = time.monotonic()
+
+    def _describe_device(self, card_path, pcm_path, card_index, device_index):
+        """Build a readable name such as 'PCH: ALC257 Analog (hw:0,0)'"""
+        key = (card_index, device_index)
+        if key in self._device_names:
+            return self._device_names[key]
+
+        card_id = self._read_file(os.path.join(card_path, 'id')) or f"card{card_index}"
+        pcm_name = None
+        info = self._read_file(os.path.join(pcm_path, 'info')) or ''
+        for line in info.splitlines():
+            name, _, value = line.partition(':')
+            if name.strip() == 'name':
+                pcm_name = value.strip()
+                break
+
+        label = f"{card_id}: {pcm_name}" if pcm_name else card_id
+        self._device_names[key] = f"{label} (hw:{card_index},{device_index})"
+        return self._device_names[key]
+
+    @staticmethod
+    def _read_file(path):
+        """Read a small procfs file, returning None if it is gone"""
+        try:
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _process_name(self, pid):
+        """Turn an owner_pid into a process name"""
+        name = self._read_file(os.path.join(self.proc_root, str(pid), 'comm'))
+        return name or f"pid {pid}"
+
+    def get_active_streams(self):
+        """
+        Get the capture substreams that are currently running.
+
+        Returns:
+            list: Dicts with 'device', 'pid' and 'process' for each active stream
+        """
+        if self._last_scan is None or time.monotonic() - self._last_scan > self.rescan_interval:
+            self._scan_substreams()
+
+        streams = []
+        for status_path, device in self._substreams:
+            status = self._read_file(status_path)
+            if not status or status == 'closed':
+                continue
+
+            fields = {}
+            for line in status.splitlines():
+                name, sep, value = line.partition(':')
+                if sep:
+                    fields[name.strip()] = value.strip()
+
+            if fields.get('state') not in _ACTIVE_STATES:
+                continue
+
+            pid = fields.get('owner_pid')
+            streams.append({
+                'device': device,
+                'pid': int(pid) if pid and pid.isdigit() else None,
+                'process': self._process_name(pid) if pid and pid.isdigit() else None,
+            })
+        return streams
+
     def get_active_apps(self):
         """
         Get list of applications currently using the microphone.
-        
+
+        On desktops running PipeWire or PulseAudio the owner of the capture
+        device is the sound server itself rather than the recording client.
+
         Returns:
             list: Names of applications currently using the microphone
         """
-        # TODO: Implement using Linux APIs/tools
-        # Possible approaches:
-        # 1. Monitor PulseAudio/PipeWire
-        # 2. Check ALSA device status
-        # 3. Use D-Bus to monitor audio services
-        logging.warning("Linux microphone monitoring not yet implemented")
-        return []
-    
+        if self.stream_monitor:
+            return self.stream_monitor.get_status()['using_apps']
+        return self._apps_from_streams(self.get_active_streams())
+
+    @staticmethod
+    def _apps_from_streams(streams):
+        """Unique process names, in device order"""
+        apps = []
+        for stream in streams:
+            name = stream['process'] or stream['device']
+            if name not in apps:
+                apps.append(name)
+        return apps
+
+    def watch(self, callback, reconcile_interval=30.0):
+        """
+        Push-style alternative to get_status(): call back only on changes.
+
+        Args:
+            callback: Called with the new status dict when capture starts or stops
+            reconcile_interval: Seconds between safety-net polls
+
+        Returns:
+            CaptureDeviceWatcher: The running watcher, or None if inotify is unavailable
+        """
+        if self.stream_monitor:
+            # Sound server feeds are already push-based
+            return self.stream_monitor.watch(callback)
+
+        from .linux_watcher import CaptureDeviceWatcher
+        watcher = CaptureDeviceWatcher(self, callback, reconcile_interval=reconcile_interval)
+        return watcher if watcher.start() else None
+
     def get_status(self):
         """
         Get current microphone status.
-        
+
         Returns:
-            dict: Status object with 'in_use' and 'using_apps' fields
+            dict: Status object with 'in_use', 'using_apps' and 'devices' fields
         """
-        active_apps = self.get_active_apps()
+        if self.stream_monitor:
+            # Answered from the sound server's in-memory state, no subprocess per call
+            return self.stream_monitor.get_status()
+
+        streams = self.get_active_streams()
+        active_apps = self._apps_from_streams(streams)
         return {
             'in_use': len(active_apps) > 0,
             'using_apps': active_apps,
+            'devices': sorted({stream['device'] for stream in streams}),
             'platform': 'linux'
-        } 
\ No newline at end of file
+        }
@@ -0,0 +1,185 @@
+"""
+Event-driven Linux microphone detection using inotify on /dev/snd capture nodes
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import select
+import struct
+import threading
+import time
+
+# inotify event masks (see <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_CLOSE_NOWRITE = 0x00000010
+IN_OPEN = 0x00000020
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_OPEN | IN_CLOSE_WRITE | IN_CLOSE_NOWRITE | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Capture device nodes look like pcmC0D0c (playback nodes end in 'p')
+_CAPTURE_NODE_RE = re.compile(r'^pcmC\d+D\d+c$')
+
+# A stream is opened before it starts running, so an open is confirmed a few
+# times until the state settles; a close is visible on the first read.
+_OPEN_CONFIRM_DELAYS = (0.05, 0.25, 1.0)
+_CLOSE_CONFIRM_DELAYS = (0.05,)
+
+
+def _load_libc():
+    """Load libc with errno support, or None when inotify is not available"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class CaptureDeviceWatcher:
+    """
+    Push-style alternative to polling LinuxMicrophoneMonitor.get_status().
+
+    Wakes only when a capture device node is opened or closed, confirms the
+    change with a cheap /proc/asound read and then calls ``callback(status)``.
+    A slow reconciliation poll catches anything inotify cannot see, such as a
+    sound server that keeps the device open while pausing the stream.
+    """
+
+    def __init__(self, monitor, callback, dev_root='/dev/snd', reconcile_interval=30.0):
+        """
+        Args:
+            monitor: LinuxMicrophoneMonitor used for confirmation reads
+            callback: Called with the new status dict whenever it changes
+            dev_root: Directory holding the ALSA device nodes
+            reconcile_interval: Seconds between safety-net polls
+        """
+        self.monitor = monitor
+        self.callback = callback
+        self.dev_root = dev_root
+        self.reconcile_interval = reconcile_interval
+        self.last_status = None
+        self._fd = None
+        self._stop_r = None
+        self._stop_w = None
+        self._thread = None
+
+    @staticmethod
+    def _status_key(status):
+        return status['in_use'], tuple(status['using_apps'])
+
+    def start(self) -> bool:
+        """Start watching; returns False when inotify cannot be used"""
+        libc = _load_libc()
+        if libc is None:
+            logging.debug("inotify not available, falling back to polling")
+            return False
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logging.debug(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+            return False
+
+        if libc.inotify_add_watch(fd, self.dev_root.encode(), _WATCH_MASK) < 0:
+            logging.debug(f"Cannot watch {self.dev_root}: {os.strerror(ctypes.get_errno())}")
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        self._stop_r, self._stop_w = os.pipe()
+        self.last_status = self.monitor.get_status()
+        self._thread = threading.Thread(target=self._run, name='capture-watcher', daemon=True)
+        self._thread.start()
+        logging.info(f"👂 Watching {self.dev_root} for capture device activity")
+        return True
+
+    def stop(self):
+        """Stop the watcher thread and release the inotify descriptor"""
+        if self._thread is None:
+            return
+        os.write(self._stop_w, b'x')
+        self._thread.join(timeout=2)
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._thread = None
+
+    def _read_events(self):
+        """
+        Drain pending inotify events.
+
+        Returns:
+            tuple: (opened, closed) flags for capture nodes
+        """
+        opened = closed = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0').decode(errors='replace')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    opened = closed = True
+                elif _CAPTURE_NODE_RE.match(name):
+                    if mask & (IN_OPEN | IN_CREATE):
+                        opened = True
+                    if mask & (IN_CLOSE_WRITE | IN_CLOSE_NOWRITE | IN_DELETE):
+                        closed = True
+        return opened, closed
+
+    def _confirm(self) -> bool:
+        """Re-read the capture state; notify and return True if it changed"""
+        try:
+            status = self.monitor.get_status()
+        except Exception as e:
+            logging.error(f"Capture state read failed: {e}")
+            return False
+        if self.last_status is not None and self._status_key(status) == self._status_key(self.last_status):
+            return False
+        self.last_status = status
+        try:
+            self.callback(status)
+        except Exception as e:
+            logging.error(f"Error in capture watcher callback: {e}")
+        return True
+
+    def _run(self):
+        pending = []  # monotonic deadlines for confirmation reads
+        next_reconcile = time.monotonic() + self.reconcile_interval
+        while True:
+            now = time.monotonic()
+            deadline = min(pending[0] if pending else next_reconcile, next_reconcile)
+            readable, _, _ = select.select([self._fd, self._stop_r], [], [], max(0.0, deadline - now))
+
+            if self._stop_r in readable:
+                return
+
+            now = time.monotonic()
+            if self._fd in readable:
+                opened, closed = self._read_events()
+                delays = _OPEN_CONFIRM_DELAYS if opened else _CLOSE_CONFIRM_DELAYS if closed else ()
+                pending = sorted(set(pending) | {now + delay for delay in delays})
+
+            if pending and pending[0] <= now:
+                while pending and pending[0] <= now:
+                    pending.pop(0)
+                if self._confirm():
+                    pending = []
+            elif now >= next_reconcile:
+                self._confirm()
+                next_reconcile = now + self.reconcile_interval
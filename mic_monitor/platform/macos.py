@@ -1,13 +1,86 @@
 import logging
-import subprocess
 import json
 import os
+from ..engine import DetectionEngine, Probe, run_command, run_in_thread
+from ..helper_host import HelperError, HelperPool
+from ..processes import CpuSampler, ProcessTable
+
+# Deadline for each one-off osascript/sqlite3 call and the process table, in seconds
+OSASCRIPT_DEADLINE = 2.0
+
+# osascript helpers kept running; a tick's six scripts run at most two deep
+OSASCRIPT_HELPERS = 3
+
+# Seconds a helper has to answer once a script is sent, short enough to
+# leave a one-off osascript call time to run after a stall
+HELPER_TIMEOUT = 1.0
+
+# Deadline of an AppleScript probe: waiting for a free helper, its reply and a one-off fallback
+APPLESCRIPT_PROBE_DEADLINE = 2 * HELPER_TIMEOUT + OSASCRIPT_DEADLINE
+
+# Common communication apps: process name -> display name
+KNOWN_APPS = {
+    'zoom.us': 'Zoom',
+    'Teams': 'Microsoft Teams',
+    'Slack': 'Slack',
+    'Discord': 'Discord',
+    'Skype': 'Skype',
+    'FaceTime': 'FaceTime',
+    'Google Chrome': 'Chrome',
+    'Safari': 'Safari',
+    'Firefox': 'Firefox'
+}
+
+BROWSERS = ['Google Chrome', 'Safari', 'Firefox']
+
+# CPU percent above which a known app is probably in a call
+ACTIVE_CPU_PERCENT = 5.0
+
+# JavaScript for Automation loop that runs each requested AppleScript in one
+# long-lived osascript process (see HelperProcess for the protocol). Lists are
+# joined with ", " so results read like the output of `osascript -e`.
+OSASCRIPT_HELPER_SCRIPT = '''
+ObjC.import('Foundation');
+var app = Application.currentApplication();
+app.includeStandardAdditions = true;
+var input = $.NSFileHandle.fileHandleWithStandardInput;
+var output = $.NSFileHandle.fileHandleWithStandardOutput;
+function send(reply) {
+    var text = $.NSString.alloc.initWithUTF8String(JSON.stringify(reply) + "\\n");
+    output.writeData(text.dataUsingEncoding($.NSUTF8StringEncoding));
+}
+var buffer = "";
+while (true) {
+    var data = input.availableData;
+    if (data.length === 0) break;
+    buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+    var newline;
+    while ((newline = buffer.indexOf("\\n")) >= 0) {
+        var line = buffer.slice(0, newline);
+        buffer = buffer.slice(newline + 1);
+        var request;
+        try { request = JSON.parse(line); } catch (e) { continue; }
+        try {
+            var result = app.runScript(request.script, {in: "AppleScript"});
+            if (Array.isArray(result)) result = result.join(", ");
+            send({id: request.id, ok: true, result: result === undefined || result === null ? "" : String(result)});
+        } catch (e) {
+            send({id: request.id, ok: false, error: String(e)});
+        }
+    }
+}
+'''
 
 class MacOSMicrophoneMonitor:
     """macOS implementation of microphone monitoring"""
     
     def __init__(self):
         self.last_known_state = False
+        self.engine = DetectionEngine()
+        self.cpu = CpuSampler()
+        # A few long-lived osascript processes serve every AppleScript probe instead of one per call
+        self.helpers = HelperPool('osascript', ['osascript', '-l', 'JavaScript', '-e', OSASCRIPT_HELPER_SCRIPT],
+                                  size=OSASCRIPT_HELPERS, timeout=HELPER_TIMEOUT)
         
     def get_active_apps(self):
         """
@@ -16,98 +89,106 @@ class MacOSMicrophoneMonitor:
         Returns:
             list: Names of applications currently using the microphone
         """
-        using_apps = []
-        
-        try:
-            # Method 1: Check using system logs for microphone access
-            # This checks the TCC (Transparency, Consent, and Control) database
-            result = subprocess.run(
-                ['log', 'show', '--predicate', 'eventMessage contains "microphone"', 
-                 '--style', 'json', '--last', '1m'],
-                capture_output=True, text=True, timeout=5
-            )
-            
-            if result.returncode == 0 and result.stdout:
-                # Parse log entries for microphone access
-                for line in result.stdout.split('\n'):
-                    if 'microphone' in line.lower() and 'granted' in line.lower():
-                        # Extract app name from log
-                        # This is a simplified approach
-                        pass
-        except Exception as e:
-            logging.debug(f"Log-based detection failed: {e}")
+        return self.engine.run(self.get_active_apps_async())
+    
+    async def get_active_apps_async(self):
+        """
+        Run every osascript probe concurrently. The input-engine check and the
+        known-app checks no longer wait on each other, so a tick takes about as
+        long as the slowest osascript call instead of the sum of all of them.
+        The process table and CPU samples of the known apps are read once per
+        tick, alongside the osascript calls.
+        """
+        probes = [
+            # Method 1: Check using CoreAudio via AppleScript
+            Probe('mic_active', self._check_input_active, APPLESCRIPT_PROBE_DEADLINE),
+            Probe('running_apps', self._get_running_apps, APPLESCRIPT_PROBE_DEADLINE),
+            Probe('processes', lambda: run_in_thread(self._sample_processes), OSASCRIPT_DEADLINE),
+            # Method 2: Check common communication apps
+            Probe('zoom', self._check_zoom_meeting, APPLESCRIPT_PROBE_DEADLINE),
+            Probe('teams', self._check_teams_meeting, APPLESCRIPT_PROBE_DEADLINE),
+        ]
+        for browser in BROWSERS:
+            probes.append(Probe(browser, lambda browser=browser: self._check_browser_meeting(browser),
+                                APPLESCRIPT_PROBE_DEADLINE))
+        results = await self.engine.gather(probes)
         
-        # Method 2: Check using CoreAudio via Python script
-        try:
-            # Use osascript to check microphone usage
-            script = '''
-            tell application "System Events"
-                set micInUse to false
-                try
-                    -- Check if any audio input is active
-                    do shell script "ioreg -c AppleHDAEngineInput | grep -i 'IOAudioEngineState' | grep -i '1'"
-                    set micInUse to true
-                end try
-                return micInUse
-            end tell
-            '''
-            
-            result = subprocess.run(
-                ['osascript', '-e', script],
-                capture_output=True, text=True, timeout=2
-            )
-            
-            if result.returncode == 0 and 'true' in result.stdout.lower():
-                # Microphone is in use, try to identify which app
-                using_apps = self._identify_audio_apps()
-        except Exception as e:
-            logging.debug(f"AppleScript detection failed: {e}")
+        using_apps = []
+        if results['mic_active']:
+            # Microphone is in use, try to identify which app
+            using_apps = await self._identify_audio_apps(results['running_apps'] or [],
+                                                         results['processes'] or ProcessTable())
         
-        # Method 3: Check common communication apps
+        # Fall back to the known communication apps
         if not using_apps:
-            using_apps = self._check_known_apps()
+            if results['zoom']:
+                using_apps.append('Zoom')
+            if results['teams']:
+                using_apps.append('Microsoft Teams')
+            if any(results[browser] for browser in BROWSERS):
+                using_apps.append('Browser')
         
         return using_apps
     
-    def _identify_audio_apps(self):
-        """Identify which apps are using audio"""
-        apps = []
-        
-        # Check if common communication apps are running and likely using mic
-        known_apps = {
-            'zoom.us': 'Zoom',
-            'Teams': 'Microsoft Teams',
-            'Slack': 'Slack',
-            'Discord': 'Discord',
-            'Skype': 'Skype',
-            'FaceTime': 'FaceTime',
-            'Google Chrome': 'Chrome',
-            'Safari': 'Safari',
-            'Firefox': 'Firefox'
-        }
+    async def _osascript(self, script):
+        """
+        Run an AppleScript and return its output ('' on failure).
         
+        Scripts run in the long-lived osascript helpers, up to
+        OSASCRIPT_HELPERS at once. While a helper cannot be used (it failed to
+        start, crashed or is backing off after a stall) the script runs in a
+        one-off osascript process.
+        """
         try:
-            # Get list of running applications
-            script = 'tell application "System Events" to get name of every process whose background only is false'
-            result = subprocess.run(
-                ['osascript', '-e', script],
-                capture_output=True, text=True, timeout=2
-            )
-            
-            if result.returncode == 0:
-                running_apps = result.stdout.strip().split(', ')
-                
-                for app_name, display_name in known_apps.items():
-                    if any(app_name in running for running in running_apps):
-                        # Check if the app has microphone permission and is likely using it
-                        if self._check_app_mic_permission(app_name):
-                            apps.append(display_name)
-        except Exception as e:
-            logging.debug(f"Failed to identify audio apps: {e}")
+            return await self.helpers.request({'script': script})
+        except HelperError as e:
+            logging.debug(f"osascript helper unavailable, running the script directly: {e}")
+        returncode, stdout = await run_command(['osascript', '-e', script], OSASCRIPT_DEADLINE)
+        return stdout if returncode == 0 else ''
+    
+    async def _check_input_active(self):
+        """Check if any audio input engine is running"""
+        script = '''
+        tell application "System Events"
+            set micInUse to false
+            try
+                -- Check if any audio input is active
+                do shell script "ioreg -c AppleHDAEngineInput | grep -i 'IOAudioEngineState' | grep -i '1'"
+                set micInUse to true
+            end try
+            return micInUse
+        end tell
+        '''
+        return 'true' in (await self._osascript(script)).lower()
+    
+    async def _get_running_apps(self):
+        """Get list of running (foreground) applications"""
+        script = 'tell application "System Events" to get name of every process whose background only is false'
+        output = (await self._osascript(script)).strip()
+        return output.split(', ') if output else []
+    
+    def _sample_processes(self):
+        """Read the process table and the CPU times of every known app's processes"""
+        return self.cpu.scan(lambda processes: [
+            entry for app_name in KNOWN_APPS for entry in processes.matching(app_name)
+        ])
+    
+    async def _identify_audio_apps(self, running_apps, processes):
+        """Identify which apps are using audio"""
+        candidates = [
+            (app_name, display_name) for app_name, display_name in KNOWN_APPS.items()
+            if any(app_name in running for running in running_apps)
+        ]
         
-        return apps
+        # Check if the app has microphone permission and is likely using it
+        results = await self.engine.gather([
+            Probe(app_name, lambda app_name=app_name: self._check_app_mic_permission(app_name, processes),
+                  OSASCRIPT_DEADLINE)
+            for app_name, _ in candidates
+        ])
+        return [display_name for app_name, display_name in candidates if results[app_name]]
     
-    def _check_app_mic_permission(self, app_name):
+    async def _check_app_mic_permission(self, app_name, processes):
         """Check if an app has microphone permission and might be using it"""
         try:
             # Check TCC database for microphone permissions
@@ -116,153 +197,86 @@ class MacOSMicrophoneMonitor:
             
             if os.path.exists(tcc_db):
                 # Use sqlite3 to check permissions (requires appropriate access)
-                result = subprocess.run(
-                    ['sqlite3', tcc_db, 
+                returncode, stdout = await run_command(
+                    ['sqlite3', tcc_db,
                      f"SELECT allowed FROM access WHERE service='kTCCServiceMicrophone' AND client LIKE '%{app_name}%';"],
-                    capture_output=True, text=True, timeout=2
+                    OSASCRIPT_DEADLINE
                 )
                 
-                if result.returncode == 0 and '1' in result.stdout:
+                if returncode == 0 and '1' in stdout:
                     # App has microphone permission
                     # Now check if it's actively using it (simplified check)
-                    return self._is_app_active(app_name)
+                    return self._is_app_active(app_name, processes)
         except Exception as e:
             logging.debug(f"Failed to check app permission: {e}")
         
         # Default to checking if the app is in the foreground and likely in a call
-        return self._is_app_active(app_name)
+        return self._is_app_active(app_name, processes)
     
-    def _is_app_active(self, app_name):
-        """Check if an app is actively using resources (likely in a call)"""
-        try:
-            # Get CPU usage for the app
-            result = subprocess.run(
-                ['ps', 'aux'],
-                capture_output=True, text=True, timeout=2
-            )
-            
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if app_name.lower() in line.lower():
-                        # Parse CPU usage (third column)
-                        parts = line.split()
-                        if len(parts) > 2:
-                            try:
-                                cpu_usage = float(parts[2])
-                                # If CPU usage is significant, might be in a call
-                                if cpu_usage > 5.0:
-                                    return True
-                            except ValueError:
-                                pass
-        except Exception as e:
-            logging.debug(f"Failed to check app activity: {e}")
-        
-        return False
-    
-    def _check_known_apps(self):
-        """Check if known communication apps are in an active call"""
-        active_apps = []
-        
-        # Check Zoom
-        if self._check_zoom_meeting():
-            active_apps.append('Zoom')
-        
-        # Check Teams
-        if self._check_teams_meeting():
-            active_apps.append('Microsoft Teams')
-        
-        # Check for browser-based meetings
-        if self._check_browser_meeting():
-            active_apps.append('Browser')
+    def _is_app_active(self, app_name, processes):
+        """
+        Check if an app is actively using resources (likely in a call).
         
-        return active_apps
+        Uses the CPU samples taken in _sample_processes(); any process whose
+        name contains the app name counts, including helper processes.
+        """
+        cpu = self.cpu.busiest(processes.matching(app_name))
+        # If CPU usage is significant, might be in a call
+        return cpu is not None and cpu > ACTIVE_CPU_PERCENT
     
-    def _check_zoom_meeting(self):
+    async def _check_zoom_meeting(self):
         """Check if Zoom is in an active meeting"""
-        try:
-            # Check if Zoom is running and in a meeting
-            script = '''
-            tell application "System Events"
-                if exists (process "zoom.us") then
-                    set windowList to name of every window of process "zoom.us"
-                    repeat with windowName in windowList
-                        if windowName contains "Meeting" or windowName contains "Zoom" then
-                            return true
-                        end if
-                    end repeat
-                end if
-                return false
-            end tell
-            '''
-            
-            result = subprocess.run(
-                ['osascript', '-e', script],
-                capture_output=True, text=True, timeout=2
-            )
-            
-            return result.returncode == 0 and 'true' in result.stdout.lower()
-        except:
-            return False
+        # Check if Zoom is running and in a meeting
+        script = '''
+        tell application "System Events"
+            if exists (process "zoom.us") then
+                set windowList to name of every window of process "zoom.us"
+                repeat with windowName in windowList
+                    if windowName contains "Meeting" or windowName contains "Zoom" then
+                        return true
+                    end if
+                end repeat
+            end if
+            return false
+        end tell
+        '''
+        return 'true' in (await self._osascript(script)).lower()
     
-    def _check_teams_meeting(self):
+    async def _check_teams_meeting(self):
         """Check if Microsoft Teams is in an active meeting"""
-        try:
-            # Check if Teams is running and in a meeting
-            script = '''
-            tell application "System Events"
-                if exists (process "Microsoft Teams") then
-                    set windowList to name of every window of process "Microsoft Teams"
-                    repeat with windowName in windowList
-                        if windowName contains "Meeting" or windowName contains "Call" then
-                            return true
-                        end if
-                    end repeat
-                end if
-                return false
-            end tell
-            '''
-            
-            result = subprocess.run(
-                ['osascript', '-e', script],
-                capture_output=True, text=True, timeout=2
-            )
-            
-            return result.returncode == 0 and 'true' in result.stdout.lower()
-        except:
-            return False
+        # Check if Teams is running and in a meeting
+        script = '''
+        tell application "System Events"
+            if exists (process "Microsoft Teams") then
+                set windowList to name of every window of process "Microsoft Teams"
+                repeat with windowName in windowList
+                    if windowName contains "Meeting" or windowName contains "Call" then
+                        return true
+                    end if
+                end repeat
+            end if
+            return false
+        end tell
+        '''
+        return 'true' in (await self._osascript(script)).lower()
     
-    def _check_browser_meeting(self):
+    async def _check_browser_meeting(self, browser):
         """Check if a browser might be in a web-based meeting"""
-        try:
-            # Check browser tabs for meeting-related content
-            browsers = ['Google Chrome', 'Safari', 'Firefox']
-            
-            for browser in browsers:
-                script = f'''
-                tell application "System Events"
-                    if exists (process "{browser}") then
-                        set windowList to name of every window of process "{browser}"
-                        repeat with windowName in windowList
-                            if windowName contains "Meet" or windowName contains "Zoom" or windowName contains "Teams" then
-                                return true
-                            end if
-                        end repeat
+        # Check browser tabs for meeting-related content
+        script = f'''
+        tell application "System Events"
+            if exists (process "{browser}") then
+                set windowList to name of every window of process "{browser}"
+                repeat with windowName in windowList
+                    if windowName contains "Meet" or windowName contains "Zoom" or windowName contains "Teams" then
+                        return true
                     end if
-                    return false
-                end tell
-                '''
-                
-                result = subprocess.run(
-                    ['osascript', '-e', script],
-                    capture_output=True, text=True, timeout=2
-                )
-                
-                if result.returncode == 0 and 'true' in result.stdout.lower():
-                    return True
-        except:
-            pass
-        
-        return False
+                end repeat
+            end if
+            return false
+        end tell
+        '''
+        return 'true' in (await self._osascript(script)).lower()
     
     def get_status(self):
         """
@@ -0,0 +1,334 @@
+"""
+PipeWire microphone detection from a long-lived ``pw-dump --monitor`` feed
+"""
+import codecs
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from ..scheduler import track_child, untrack_child
+
+PW_DUMP_COMMAND = ['pw-dump', '--monitor', '--no-colors']
+
+NODE_TYPE = 'PipeWire:Interface:Node'
+LINK_TYPE = 'PipeWire:Interface:Link'
+
+# Recording clients are input streams; capture devices are sources
+CAPTURE_STREAM_CLASS = 'Stream/Input/Audio'
+SOURCE_CLASS = 'Audio/Source'
+
+
+def pipewire_available() -> bool:
+    """Check for a PipeWire session and the pw-dump tool"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if not runtime_dir or not shutil.which(PW_DUMP_COMMAND[0]):
+        return False
+    remote = os.environ.get('PIPEWIRE_REMOTE', 'pipewire-0')
+    return os.path.exists(os.path.join(runtime_dir, remote))
+
+
+class JsonStreamSplitter:
+    """
+    Incrementally split a stream of concatenated JSON values.
+
+    pw-dump prints one pretty-printed JSON array per update. Only the bytes
+    of a complete top-level value are handed to the JSON parser, so partial
+    reads never cause a re-parse of the whole buffer.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> list:
+        """
+        Feed the next chunk of text.
+
+        Returns:
+            list: Every top-level value completed by this chunk
+        """
+        values = []
+        start = 0
+        for i, char in enumerate(text):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '[{':
+                if self._depth == 0:
+                    # Drop anything between top-level values (whitespace, warnings)
+                    start = i
+                    self._buffer = []
+                self._depth += 1
+            elif char in ']}' and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buffer.append(text[start:i + 1])
+                    document = ''.join(self._buffer)
+                    self._buffer = []
+                    try:
+                        values.append(json.loads(document))
+                    except ValueError as e:
+                        logging.debug(f"Skipping malformed pw-dump output: {e}")
+        if self._depth:
+            self._buffer.append(text[start:])
+        return values
+
+
+class PipeWireGraph:
+    """In-memory view of the PipeWire nodes and links relevant to capture"""
+
+    def __init__(self):
+        self.nodes = {}
+        self.links = {}
+
+    def clear(self):
+        self.nodes.clear()
+        self.links.clear()
+
+    def apply(self, objects) -> bool:
+        """
+        Apply one pw-dump update (a list of objects).
+
+        Returns:
+            bool: True if a capture stream, source or link changed
+        """
+        changed = False
+        for obj in objects if isinstance(objects, list) else [objects]:
+            if not isinstance(obj, dict) or 'id' not in obj:
+                continue
+            obj_id = obj['id']
+            info = obj.get('info')
+
+            if info is None:
+                # Removed object
+                changed |= self.nodes.pop(obj_id, None) is not None
+                changed |= self.links.pop(obj_id, None) is not None
+                continue
+
+            obj_type = obj.get('type')
+            if obj_type == NODE_TYPE or obj_id in self.nodes:
+                changed |= self._update_node(obj_id, info)
+            elif obj_type == LINK_TYPE or obj_id in self.links:
+                changed |= self._update_link(obj_id, info)
+        return changed
+
+    def _update_node(self, node_id, info) -> bool:
+        node = self.nodes.get(node_id)
+        props = dict(node['props']) if node else {}
+        props.update(info.get('props') or {})
+        media_class = props.get('media.class')
+        if media_class not in (CAPTURE_STREAM_CLASS, SOURCE_CLASS):
+            return self.nodes.pop(node_id, None) is not None
+
+        updated = {
+            'props': props,
+            'state': info.get('state', node['state'] if node else None),
+            'media_class': media_class,
+        }
+        if updated == node:
+            return False
+        self.nodes[node_id] = updated
+        return True
+
+    def _update_link(self, link_id, info) -> bool:
+        link = (info.get('output-node-id'), info.get('input-node-id'))
+        if self.links.get(link_id) == link:
+            return False
+        self.links[link_id] = link
+        return True
+
+    def active_streams(self) -> list:
+        """
+        Get the recording streams that are currently running.
+
+        Returns:
+            list: Dicts with 'app', 'pid' and 'device' for each running input stream
+        """
+        streams = []
+        for node_id, node in self.nodes.items():
+            if node['media_class'] != CAPTURE_STREAM_CLASS or node['state'] != 'running':
+                continue
+            props = node['props']
+            if props.get('stream.monitor') in (True, 'true'):
+                # Peak meters (e.g. pavucontrol) are not really recording
+                continue
+
+            pid = props.get('application.process.id')
+            streams.append({
+                'app': (props.get('application.name') or props.get('application.process.binary')
+                        or props.get('node.name') or f"node {node_id}"),
+                'pid': int(pid) if str(pid).isdigit() else None,
+                'device': self._source_for(node_id),
+            })
+        return streams
+
+    def _source_for(self, stream_id):
+        """Name of the capture device linked into a stream, if any"""
+        for output_id, input_id in self.links.values():
+            if input_id != stream_id:
+                continue
+            source = self.nodes.get(output_id)
+            if source and source['media_class'] == SOURCE_CLASS:
+                props = source['props']
+                return props.get('node.description') or props.get('node.name')
+        return None
+
+
+class PipeWireStreamMonitor:
+    """Keeps one pw-dump process running and answers status queries from memory"""
+
+    def __init__(self, command=None, popen_factory=subprocess.Popen,
+                 restart_delay=2.0, startup_timeout=1.0):
+        """
+        Args:
+            command: Monitor command line (defaults to pw-dump --monitor)
+            popen_factory: Callable used to start the process; a stub can replay recorded output
+            restart_delay: Seconds to wait before restarting a monitor process that exited
+            startup_timeout: Seconds start() waits for the initial dump
+        """
+        self.command = command or PW_DUMP_COMMAND
+        self.popen_factory = popen_factory
+        self.restart_delay = restart_delay
+        self.startup_timeout = startup_timeout
+        self.graph = PipeWireGraph()
+        self._lock = threading.Lock()
+        self._status = self._build_status([])
+        self._listeners = []
+        self._process = None
+        self._thread = None
+        self._running = False
+        self._ready = threading.Event()
+
+    @staticmethod
+    def _build_status(streams):
+        apps = []
+        for stream in streams:
+            if stream['app'] not in apps:
+                apps.append(stream['app'])
+        return {
+            'in_use': len(apps) > 0,
+            'using_apps': apps,
+            'devices': sorted({stream['device'] for stream in streams if stream['device']}),
+            'platform': 'linux'
+        }
+
+    def start(self):
+        """Start the monitor process and wait briefly for the initial dump"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='pipewire-monitor', daemon=True)
+        self._thread.start()
+        self._ready.wait(self.startup_timeout)
+
+    def stop(self):
+        """Stop the monitor process"""
+        self._running = False
+        process = self._process
+        if process and process.poll() is None:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def watch(self, callback):
+        """
+        Call ``callback(status)`` whenever the capture state changes.
+
+        Returns:
+            PipeWireSubscription: Handle whose stop() detaches the callback
+        """
+        self._listeners.append(callback)
+        return PipeWireSubscription(self, callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def get_status(self):
+        """
+        Get current microphone status from the in-memory graph.
+
+        Returns:
+            dict: Status object with 'in_use', 'using_apps' and 'devices' fields
+        """
+        with self._lock:
+            status = self._status
+        return dict(status, using_apps=list(status['using_apps']), devices=list(status['devices']))
+
+    def _run(self):
+        while self._running:
+            try:
+                self._process = self.popen_factory(
+                    self.command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                )
+            except OSError as e:
+                logging.error(f"Cannot start {self.command[0]}: {e}")
+                self._ready.set()
+                return
+
+            track_child(self._process.pid)
+            self._consume(self._process.stdout)
+            self._process.wait()
+            untrack_child(self._process.pid)
+            if self._running:
+                logging.warning(f"{self.command[0]} exited, restarting in {self.restart_delay}s")
+                time.sleep(self.restart_delay)
+
+    def _consume(self, stream):
+        """Parse the process output incrementally until it ends"""
+        splitter = JsonStreamSplitter()
+        # Keeps a multi-byte character split across two reads intact
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        fresh = True
+        read = getattr(stream, 'read1', stream.read)
+        while self._running:
+            chunk = read(65536)
+            if not chunk:
+                break
+            for update in splitter.feed(decoder.decode(chunk)):
+                with self._lock:
+                    if fresh:
+                        # A new process starts with a full dump of the graph
+                        self.graph.clear()
+                        fresh = False
+                    if not self.graph.apply(update):
+                        continue
+                    previous = self._status
+                    self._status = self._build_status(self.graph.active_streams())
+                    status = self._status
+                if (status['in_use'], status['using_apps']) != (previous['in_use'], previous['using_apps']):
+                    self._notify(status)
+            self._ready.set()
+
+    def _notify(self, status):
+        for callback in list(self._listeners):
+            try:
+                callback(dict(status))
+            except Exception as e:
+                logging.error(f"Error in PipeWire listener: {e}")
+
+
+class PipeWireSubscription:
+    """Listener handle returned by PipeWireStreamMonitor.watch()"""
+
+    def __init__(self, monitor, callback):
+        self.monitor = monitor
+        self.callback = callback
+
+    def stop(self):
+        self.monitor.remove_listener(self.callback)
@@ -0,0 +1,535 @@
+"""
+PulseAudio microphone detection over the native protocol (no pactl subprocesses)
+
+Only the small subset of the protocol needed to follow recording clients is
+implemented: AUTH, SET_CLIENT_NAME, SUBSCRIBE and the source-output queries.
+"""
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+
+PROTOCOL_VERSION = 32
+CONTROL_CHANNEL = 0xFFFFFFFF
+COOKIE_LENGTH = 256
+
+# Commands (pulsecore/native-common.h)
+COMMAND_ERROR = 0
+COMMAND_REPLY = 2
+COMMAND_AUTH = 8
+COMMAND_SET_CLIENT_NAME = 9
+COMMAND_GET_SOURCE_OUTPUT_INFO = 31
+COMMAND_GET_SOURCE_OUTPUT_INFO_LIST = 32
+COMMAND_SUBSCRIBE = 35
+COMMAND_SUBSCRIBE_EVENT = 66
+
+# Subscription masks and event bits
+SUBSCRIPTION_MASK_SOURCE_OUTPUT = 0x0008
+EVENT_FACILITY_MASK = 0x0F
+EVENT_TYPE_MASK = 0x30
+EVENT_SOURCE_OUTPUT = 0x03
+EVENT_NEW = 0x00
+EVENT_CHANGE = 0x10
+EVENT_REMOVE = 0x20
+
+ERROR_NOENTITY = 5
+
+_DESCRIPTOR = struct.Struct('>IIIII')
+_U32 = struct.Struct('>I')
+_U64 = struct.Struct('>Q')
+
+
+class PulseProtocolError(Exception):
+    """Raised for malformed packets or error replies"""
+
+
+class TagWriter:
+    """Builds a PulseAudio tagstruct"""
+
+    def __init__(self):
+        self._parts = []
+
+    def u32(self, value):
+        self._parts.append(b'L' + _U32.pack(value))
+        return self
+
+    def u8(self, value):
+        self._parts.append(b'B' + bytes((value,)))
+        return self
+
+    def usec(self, value):
+        self._parts.append(b'U' + _U64.pack(value))
+        return self
+
+    def boolean(self, value):
+        self._parts.append(b'1' if value else b'0')
+        return self
+
+    def string(self, value):
+        if value is None:
+            self._parts.append(b'N')
+        else:
+            self._parts.append(b't' + value.encode('utf-8') + b'\0')
+        return self
+
+    def arbitrary(self, data):
+        self._parts.append(b'x' + _U32.pack(len(data)) + data)
+        return self
+
+    def sample_spec(self, sample_format, channels, rate):
+        self._parts.append(b'a' + bytes((sample_format, channels)) + _U32.pack(rate))
+        return self
+
+    def channel_map(self, positions):
+        self._parts.append(b'm' + bytes((len(positions),)) + bytes(positions))
+        return self
+
+    def cvolume(self, volumes):
+        self._parts.append(b'v' + bytes((len(volumes),)) + b''.join(_U32.pack(v) for v in volumes))
+        return self
+
+    def proplist(self, props):
+        self._parts.append(b'P')
+        for key, value in props.items():
+            data = str(value).encode('utf-8') + b'\0'
+            self.string(key).u32(len(data)).arbitrary(data)
+        self.string(None)
+        return self
+
+    def format_info(self, encoding, props):
+        self._parts.append(b'f')
+        return self.u8(encoding).proplist(props)
+
+    def to_bytes(self) -> bytes:
+        return b''.join(self._parts)
+
+
+class TagReader:
+    """Reads values back out of a PulseAudio tagstruct"""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def eof(self) -> bool:
+        return self.pos >= len(self.data)
+
+    def _take(self, count):
+        if self.pos + count > len(self.data):
+            raise PulseProtocolError("Truncated tagstruct")
+        chunk = self.data[self.pos:self.pos + count]
+        self.pos += count
+        return chunk
+
+    def _expect(self, *tags):
+        tag = self._take(1)
+        if tag not in tags:
+            raise PulseProtocolError(f"Expected tag {tags}, got {tag!r}")
+        return tag
+
+    def u32(self):
+        self._expect(b'L')
+        return _U32.unpack(self._take(4))[0]
+
+    def string(self):
+        if self._expect(b't', b'N') == b'N':
+            return None
+        end = self.data.find(b'\0', self.pos)
+        if end < 0:
+            raise PulseProtocolError("Unterminated string in tagstruct")
+        value = self.data[self.pos:end].decode('utf-8', errors='replace')
+        self.pos = end + 1
+        return value
+
+    def proplist(self):
+        self._expect(b'P')
+        props = {}
+        while True:
+            key = self.string()
+            if key is None:
+                return props
+            self.u32()
+            self._expect(b'x')
+            length = _U32.unpack(self._take(4))[0]
+            props[key] = self._take(length).rstrip(b'\0').decode('utf-8', errors='replace')
+
+    def value(self):
+        """Read the next value of any type"""
+        tag = self.data[self.pos:self.pos + 1]
+        if tag == b'L':
+            return self.u32()
+        if tag in (b't', b'N'):
+            return self.string()
+        if tag == b'P':
+            return self.proplist()
+        self.pos += 1
+        if tag == b'1':
+            return True
+        if tag == b'0':
+            return False
+        if tag == b'B':
+            return self._take(1)[0]
+        if tag in (b'U', b'R', b'r'):
+            return _U64.unpack(self._take(8))[0]
+        if tag == b'T':
+            return struct.unpack('>II', self._take(8))
+        if tag == b'V':
+            return _U32.unpack(self._take(4))[0]
+        if tag == b'x':
+            return self._take(_U32.unpack(self._take(4))[0])
+        if tag == b'a':
+            sample_format, channels = self._take(2)
+            return sample_format, channels, _U32.unpack(self._take(4))[0]
+        if tag == b'm':
+            return tuple(self._take(self._take(1)[0]))
+        if tag == b'v':
+            count = self._take(1)[0]
+            return tuple(_U32.unpack(self._take(4))[0] for _ in range(count))
+        if tag == b'f':
+            encoding = self.value()
+            return encoding, self.proplist()
+        raise PulseProtocolError(f"Unknown tag {tag!r}")
+
+
+def encode_packet(payload: bytes) -> bytes:
+    """Frame a control-channel packet"""
+    return _DESCRIPTOR.pack(len(payload), CONTROL_CHANNEL, 0, 0, 0) + payload
+
+
+def _recv_exact(sock, count):
+    chunks = []
+    while count:
+        chunk = sock.recv(count)
+        if not chunk:
+            raise ConnectionError("Connection closed by PulseAudio server")
+        chunks.append(chunk)
+        count -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_packet(sock):
+    """
+    Read one packet.
+
+    Returns:
+        tuple: (channel, payload)
+    """
+    length, channel, _, _, _ = _DESCRIPTOR.unpack(_recv_exact(sock, _DESCRIPTOR.size))
+    return channel, _recv_exact(sock, length)
+
+
+def source_output_field_count(version):
+    """Number of values in a source output info record for a protocol version"""
+    count = 11
+    if version >= 13:
+        count += 1  # proplist
+    if version >= 19:
+        count += 1  # corked
+    if version >= 22:
+        count += 5  # volume, mute, has_volume, volume_writable, format
+    return count
+
+
+def parse_source_output(reader, version):
+    """
+    Parse one source output info record.
+
+    Returns:
+        dict: 'index', 'props', 'corked' and 'resample_method'
+    """
+    values = [reader.value() for _ in range(source_output_field_count(version))]
+    return {
+        'index': values[0],
+        'resample_method': values[9],
+        'props': values[11] if version >= 13 else {},
+        'corked': values[12] if version >= 19 else False,
+    }
+
+
+def default_server_path():
+    """Location of the user's PulseAudio native socket"""
+    server = os.environ.get('PULSE_SERVER', '')
+    for entry in server.split():
+        if entry.startswith('unix:'):
+            return entry[len('unix:'):]
+        if entry.startswith('/'):
+            return entry
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or f"/run/user/{os.getuid()}"
+    return os.path.join(runtime_dir, 'pulse', 'native')
+
+
+def pulseaudio_available() -> bool:
+    """Check whether a PulseAudio-compatible server socket exists"""
+    return os.path.exists(default_server_path())
+
+
+def _load_cookie():
+    """Read the auth cookie; servers that authenticate by uid accept zeros"""
+    paths = [os.environ.get('PULSE_COOKIE'),
+             os.path.expanduser('~/.config/pulse/cookie'),
+             os.path.expanduser('~/.pulse-cookie')]
+    for path in paths:
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    cookie = f.read(COOKIE_LENGTH)
+                if len(cookie) == COOKIE_LENGTH:
+                    return cookie
+            except OSError:
+                pass
+    return b'\0' * COOKIE_LENGTH
+
+
+class PulseSourceOutputMonitor:
+    """
+    Follows PulseAudio source outputs (recording clients) over one connection.
+
+    The client subscribes to source-output events, keeps the recording clients
+    in memory and reconnects with backoff when the server restarts, so
+    get_status() never has to run pactl.
+    """
+
+    def __init__(self, server_path=None, client_name='luxstatus',
+                 reconnect_delay=0.5, max_reconnect_delay=10.0, startup_timeout=1.0):
+        """
+        Args:
+            server_path: Unix socket of the server (defaults to the user's session socket)
+            client_name: Name shown in the server's client list
+            reconnect_delay: First delay before reconnecting; doubles up to max_reconnect_delay
+            startup_timeout: Seconds start() waits for the initial source output list
+        """
+        self.server_path = server_path or default_server_path()
+        self.client_name = client_name
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.startup_timeout = startup_timeout
+        self.version = None
+        self.connections = 0
+        self._outputs = {}
+        self._status = self._build_status({})
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._sock = None
+        self._tag = 0
+        self._pending = {}
+        self._running = False
+        self._thread = None
+        self._ready = threading.Event()
+
+    @staticmethod
+    def _build_status(outputs):
+        apps = []
+        for output in outputs.values():
+            if output['corked'] or output['resample_method'] == 'peaks':
+                # Paused streams and peak meters are not recording
+                continue
+            props = output['props']
+            app = (props.get('application.name') or props.get('application.process.binary')
+                   or f"source output {output['index']}")
+            if app not in apps:
+                apps.append(app)
+        return {
+            'in_use': len(apps) > 0,
+            'using_apps': apps,
+            'platform': 'linux'
+        }
+
+    def start(self):
+        """Connect in the background and wait briefly for the initial state"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='pulseaudio-monitor', daemon=True)
+        self._thread.start()
+        self._ready.wait(self.startup_timeout)
+
+    def stop(self):
+        """Close the connection and stop the background thread"""
+        self._running = False
+        sock = self._sock
+        if sock:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def watch(self, callback):
+        """
+        Call ``callback(status)`` whenever the set of recording clients changes.
+
+        Returns:
+            PulseSubscription: Handle whose stop() detaches the callback
+        """
+        self._listeners.append(callback)
+        return PulseSubscription(self, callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def get_status(self):
+        """
+        Get current microphone status from memory.
+
+        Returns:
+            dict: Status object with 'in_use' and 'using_apps' fields
+        """
+        with self._lock:
+            status = self._status
+        return dict(status, using_apps=list(status['using_apps']))
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                self._connect()
+                delay = self.reconnect_delay
+                self._dispatch_forever()
+            except (OSError, ConnectionError, PulseProtocolError) as e:
+                if self._running:
+                    logging.debug(f"PulseAudio connection lost: {e}")
+            finally:
+                self._close()
+
+            # Recording clients do not survive a server restart
+            self._set_outputs({})
+            self._ready.set()
+            if self._running:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _close(self):
+        if self._sock:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        self._pending.clear()
+
+    def _send(self, command, writer=None):
+        """Send a command and return its tag"""
+        self._tag = (self._tag + 1) & 0x7FFFFFFF
+        payload = TagWriter().u32(command).u32(self._tag).to_bytes()
+        if writer is not None:
+            payload += writer.to_bytes()
+        self._sock.sendall(encode_packet(payload))
+        return self._tag
+
+    def _request(self, command, writer=None):
+        """Send a command and block for its reply (used during the handshake)"""
+        tag = self._send(command, writer)
+        while True:
+            reader = self._read_control()
+            reply_command, reply_tag = reader.u32(), reader.u32()
+            if reply_tag != tag:
+                continue
+            if reply_command == COMMAND_ERROR:
+                raise PulseProtocolError(f"Command {command} failed with error {reader.u32()}")
+            return reader
+
+    def _read_control(self):
+        while True:
+            channel, payload = read_packet(self._sock)
+            if channel == CONTROL_CHANNEL:
+                return TagReader(payload)
+
+    def _connect(self):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(self.server_path)
+        self._tag = 0
+
+        auth = TagWriter().u32(PROTOCOL_VERSION).arbitrary(_load_cookie())
+        payload = TagWriter().u32(COMMAND_AUTH).u32(0).to_bytes() + auth.to_bytes()
+        credentials = getattr(socket, 'SCM_CREDENTIALS', None)
+        if credentials is not None:
+            # Lets servers authenticate us by uid when the cookie is not used
+            ucred = struct.pack('iII', os.getpid(), os.getuid(), os.getgid())
+            self._sock.sendmsg([encode_packet(payload)], [(socket.SOL_SOCKET, credentials, ucred)])
+        else:
+            self._sock.sendall(encode_packet(payload))
+        reader = self._read_control()
+        if reader.u32() != COMMAND_REPLY:
+            raise PulseProtocolError("Authentication rejected by PulseAudio server")
+        reader.u32()
+        self.version = min(PROTOCOL_VERSION, reader.u32() & 0xFFFF)
+
+        name = TagWriter()
+        if self.version >= 13:
+            name.proplist({'application.name': self.client_name})
+        else:
+            name.string(self.client_name)
+        self._request(COMMAND_SET_CLIENT_NAME, name)
+        self._request(COMMAND_SUBSCRIBE, TagWriter().u32(SUBSCRIPTION_MASK_SOURCE_OUTPUT))
+
+        reader = self._request(COMMAND_GET_SOURCE_OUTPUT_INFO_LIST)
+        outputs = {}
+        while not reader.eof():
+            output = parse_source_output(reader, self.version)
+            outputs[output['index']] = output
+        self.connections += 1
+        logging.info(f"🔌 Connected to PulseAudio (protocol {self.version}), {len(outputs)} source outputs")
+        self._set_outputs(outputs)
+        self._ready.set()
+
+    def _dispatch_forever(self):
+        while self._running:
+            reader = self._read_control()
+            command, tag = reader.u32(), reader.u32()
+            if command == COMMAND_SUBSCRIBE_EVENT:
+                self._on_event(reader.u32(), reader.u32())
+            elif tag in self._pending:
+                index = self._pending.pop(tag)
+                if command == COMMAND_REPLY:
+                    output = parse_source_output(reader, self.version)
+                    self._update_output(output['index'], output)
+                elif command == COMMAND_ERROR:
+                    # Gone before we asked about it
+                    self._update_output(index, None)
+
+    def _on_event(self, event, index):
+        if event & EVENT_FACILITY_MASK != EVENT_SOURCE_OUTPUT:
+            return
+        if event & EVENT_TYPE_MASK == EVENT_REMOVE:
+            self._update_output(index, None)
+        else:
+            tag = self._send(COMMAND_GET_SOURCE_OUTPUT_INFO, TagWriter().u32(index))
+            self._pending[tag] = index
+
+    def _update_output(self, index, output):
+        outputs = dict(self._outputs)
+        if output is None:
+            if outputs.pop(index, None) is None:
+                return
+        else:
+            outputs[index] = output
+        self._set_outputs(outputs)
+
+    def _set_outputs(self, outputs):
+        status = self._build_status(outputs)
+        with self._lock:
+            previous = self._status
+            self._outputs = outputs
+            self._status = status
+        if (status['in_use'], status['using_apps']) != (previous['in_use'], previous['using_apps']):
+            for callback in list(self._listeners):
+                try:
+                    callback(dict(status))
+                except Exception as e:
+                    logging.error(f"Error in PulseAudio listener: {e}")
+
+
+class PulseSubscription:
+    """Listener handle returned by PulseSourceOutputMonitor.watch()"""
+
+    def __init__(self, monitor, callback):
+        self.monitor = monitor
+        self.callback = callback
+
+    def stop(self):
+        self.monitor.remove_listener(self.callback)
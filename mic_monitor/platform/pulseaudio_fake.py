@@ -0,0 +1,221 @@
+"""
+Small in-process PulseAudio server speaking just enough of the native protocol
+to exercise PulseSourceOutputMonitor's subscription and reconnect paths
+without a sound server.
+"""
+import logging
+import os
+import socket
+import threading
+
+from .pulseaudio import (
+    COMMAND_AUTH, COMMAND_ERROR, COMMAND_GET_SOURCE_OUTPUT_INFO,
+    COMMAND_GET_SOURCE_OUTPUT_INFO_LIST, COMMAND_REPLY, COMMAND_SET_CLIENT_NAME,
+    COMMAND_SUBSCRIBE, COMMAND_SUBSCRIBE_EVENT, CONTROL_CHANNEL, ERROR_NOENTITY,
+    EVENT_CHANGE, EVENT_NEW, EVENT_REMOVE, EVENT_SOURCE_OUTPUT, PROTOCOL_VERSION,
+    SUBSCRIPTION_MASK_SOURCE_OUTPUT, TagReader, TagWriter, encode_packet, read_packet,
+)
+
+ERROR_NOTSUPPORTED = 19
+
+
+class FakePulseServer:
+    """
+    Fake server on a Unix socket.
+
+    Example:
+        server = FakePulseServer('/tmp/pulse-test')
+        server.start()
+        index = server.add_source_output('Zoom', pid=1234)
+        ...
+        server.restart()   # drops every client, like a server restart
+    """
+
+    def __init__(self, path, version=PROTOCOL_VERSION):
+        self.path = path
+        self.version = version
+        self._outputs = {}
+        self._next_index = 0
+        self._clients = []
+        self._lock = threading.Lock()
+        self._listener = None
+        self._thread = None
+
+    def start(self):
+        """Start listening for clients"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.path)
+        self._listener.listen(8)
+        self._thread = threading.Thread(target=self._accept_loop, args=(self._listener,),
+                                        name='fake-pulse-server', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Close the listening socket and drop every client"""
+        listener, self._listener = self._listener, None
+        if listener:
+            try:
+                listener.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            listener.close()
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def restart(self, clear=True):
+        """Simulate a server restart; recording clients are dropped by default"""
+        self.stop()
+        if clear:
+            with self._lock:
+                self._outputs.clear()
+        self.start()
+
+    @property
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def add_source_output(self, app, pid=None, corked=False, peak_detect=False):
+        """Add a recording client and notify subscribers; returns its index"""
+        with self._lock:
+            index = self._next_index
+            self._next_index += 1
+            props = {'application.name': app}
+            if pid is not None:
+                props['application.process.id'] = pid
+            self._outputs[index] = {'props': props, 'corked': corked,
+                                    'resample_method': 'peaks' if peak_detect else 'copy'}
+        self._broadcast(EVENT_NEW, index)
+        return index
+
+    def set_corked(self, index, corked):
+        """Pause or resume a recording client"""
+        with self._lock:
+            self._outputs[index]['corked'] = corked
+        self._broadcast(EVENT_CHANGE, index)
+
+    def remove_source_output(self, index):
+        """Remove a recording client"""
+        with self._lock:
+            self._outputs.pop(index, None)
+        self._broadcast(EVENT_REMOVE, index)
+
+    def _encode_output(self, writer, index, output):
+        writer.u32(index).string(f"Recording {index}").u32(0xFFFFFFFF).u32(index).u32(0)
+        writer.sample_spec(3, 1, 48000).channel_map([0]).usec(0).usec(0)
+        writer.string(output['resample_method']).string('protocol-native.c')
+        if self.version >= 13:
+            writer.proplist(output['props'])
+        if self.version >= 19:
+            writer.boolean(output['corked'])
+        if self.version >= 22:
+            writer.cvolume([0x10000]).boolean(False).boolean(True).boolean(True)
+            writer.format_info(1, {})
+
+    def _broadcast(self, event_type, index):
+        payload = (TagWriter().u32(COMMAND_SUBSCRIBE_EVENT).u32(0xFFFFFFFF)
+                   .u32(event_type | EVENT_SOURCE_OUTPUT).u32(index).to_bytes())
+        with self._lock:
+            clients = [client for client in self._clients if client.mask & SUBSCRIPTION_MASK_SOURCE_OUTPUT]
+        for client in clients:
+            client.send(payload)
+
+    def _accept_loop(self, listener):
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            client = _FakeClient(self, conn)
+            with self._lock:
+                self._clients.append(client)
+            threading.Thread(target=client.serve, daemon=True).start()
+
+    def _drop(self, client):
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+
+class _FakeClient:
+    """One connection to the fake server"""
+
+    def __init__(self, server, conn):
+        self.server = server
+        self.conn = conn
+        self.mask = 0
+        self._send_lock = threading.Lock()
+
+    def send(self, payload):
+        try:
+            with self._send_lock:
+                self.conn.sendall(encode_packet(payload))
+        except OSError:
+            self.close()
+
+    def close(self):
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
+        self.server._drop(self)
+
+    def reply(self, tag, writer=None):
+        payload = TagWriter().u32(COMMAND_REPLY).u32(tag).to_bytes()
+        self.send(payload + (writer.to_bytes() if writer else b''))
+
+    def error(self, tag, code):
+        self.send(TagWriter().u32(COMMAND_ERROR).u32(tag).u32(code).to_bytes())
+
+    def serve(self):
+        try:
+            while True:
+                channel, payload = read_packet(self.conn)
+                if channel == CONTROL_CHANNEL:
+                    self.handle(TagReader(payload))
+        except (OSError, ConnectionError):
+            pass
+        except Exception as e:
+            logging.debug(f"Fake PulseAudio client error: {e}")
+        finally:
+            self.close()
+
+    def handle(self, reader):
+        server = self.server
+        command, tag = reader.u32(), reader.u32()
+        if command == COMMAND_AUTH:
+            self.reply(tag, TagWriter().u32(server.version))
+        elif command == COMMAND_SET_CLIENT_NAME:
+            self.reply(tag, TagWriter().u32(0))
+        elif command == COMMAND_SUBSCRIBE:
+            self.mask = reader.u32()
+            self.reply(tag)
+        elif command == COMMAND_GET_SOURCE_OUTPUT_INFO_LIST:
+            writer = TagWriter()
+            with server._lock:
+                outputs = sorted(server._outputs.items())
+            for index, output in outputs:
+                server._encode_output(writer, index, output)
+            self.reply(tag, writer)
+        elif command == COMMAND_GET_SOURCE_OUTPUT_INFO:
+            index = reader.u32()
+            with server._lock:
+                output = server._outputs.get(index)
+            if output is None:
+                self.error(tag, ERROR_NOENTITY)
+            else:
+                writer = TagWriter()
+                server._encode_output(writer, index, output)
+                self.reply(tag, writer)
+        else:
+            self.error(tag, ERROR_NOTSUPPORTED)
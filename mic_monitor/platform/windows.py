@@ -1,17 +1,43 @@
 import winreg
 import logging
-import psutil
 import time
 import subprocess
 import json
+from ..engine import DetectionEngine, Probe, run_in_thread
+from ..processes import CpuSampler, ProcessTable
 from .windows_audio_api import WindowsAudioMonitor
 
+# Per-probe deadlines in seconds
+AUDIO_API_DEADLINE = 5.0
+REGISTRY_DEADLINE = 2.0
+PROCESS_TABLE_DEADLINE = 2.0
+
+# Known communication/recording apps that should be trusted when registry says they're using mic
+KNOWN_COMMUNICATION_APPS = {
+    'teams.exe', 'ms-teams.exe', 'zoom.exe', 'zoomwebservice.exe',
+    'discord.exe', 'skype.exe', 'webexmta.exe', 'ciscowebexstart.exe',
+    'obs64.exe', 'obs32.exe', 'streamlabs obs.exe',
+    'audacity.exe', 'vlc.exe'
+}
+
+# Apps that need extra verification (often have permission but rarely use it):
+# executable -> CPU percent that indicates an active call
+CPU_CHECKED_APPS = {
+    'chrome.exe': 10.0, 'msedge.exe': 10.0, 'firefox.exe': 10.0,
+    'slack.exe': 10.0, 'whatsapp.exe': 10.0, 'telegram.exe': 10.0,
+    # Audio processing apps need a higher threshold
+    'nvidia broadcast.exe': 15.0, 'nvidiabroadcast.exe': 15.0,
+    'krisp.exe': 15.0, 'voicemod.exe': 15.0, 'vb-audio.exe': 15.0,
+}
+
 class WindowsMicrophoneMonitor:
     """Windows-specific implementation of microphone monitoring using Registry"""
     
     def __init__(self):
         self.registry_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\CapabilityAccessManager\ConsentStore\microphone\NonPackaged"
         self.audio_monitor = WindowsAudioMonitor()
+        self.engine = DetectionEngine()
+        self.cpu = CpuSampler()
     
     def get_active_apps(self):
         """
@@ -21,29 +47,70 @@ class WindowsMicrophoneMonitor:
         Returns:
             list: Names of applications currently using the microphone
         """
-        using_apps = []
+        return self.engine.run(self.get_active_apps_async())
+    
+    async def get_active_apps_async(self):
+        """
+        Run the Audio Session API, registry and process table probes
+        concurrently, then verify every candidate. A tick takes about as long
+        as the slowest probe; each probe has its own deadline. The process
+        table and CPU samples are read once per tick and shared by every
+        check, so verification itself never waits.
+        """
+        results = await self.engine.gather([
+            Probe('audio_api', self.audio_monitor.get_active_microphone_apps_async, AUDIO_API_DEADLINE),
+            Probe('registry', lambda: run_in_thread(self._get_registry_candidates), REGISTRY_DEADLINE),
+            Probe('processes', lambda: run_in_thread(self._sample_processes), PROCESS_TABLE_DEADLINE),
+        ])
+        audio_apps = results['audio_api'] or []
+        processes = results['processes']
+        registry_apps = []
+        for exe_name in results['registry'] or []:
+            # If the process table could not be read, assume it's running to be safe
+            if processes is None or processes.is_running(exe_name):
+                registry_apps.append(exe_name)
+            else:
+                logging.debug(f"❌ Registry shows {exe_name} using mic, but process not running (stale entry)")
+        processes = processes or ProcessTable()
+        verified = {app: self._is_actually_recording(app, processes)
+                    for app in dict.fromkeys(audio_apps + registry_apps)}
         
-        # First try Windows Audio Session API (like Windows itself uses)
-        try:
-            audio_apps = self.audio_monitor.get_active_microphone_apps()
-            if audio_apps:
-                # Filter the apps through our verification logic
-                verified_apps = []
-                for app in audio_apps:
-                    if self._is_actually_recording(app):
-                        verified_apps.append(app)
-                        print(f"🎤 Process {app} detected and verified as actively recording")
-                    else:
-                        print(f"⏰ Process {app} has mic permission but not actively recording")
-                
-                if verified_apps:
-                    return verified_apps
-                # If no apps passed verification, continue to registry check
-        except Exception as e:
-            logging.debug(f"Audio API detection failed: {e}")
+        # Windows Audio Session API results take precedence (like Windows itself uses)
+        verified_apps = []
+        for app in audio_apps:
+            if verified.get(app):
+                verified_apps.append(app)
+                print(f"🎤 Process {app} detected and verified as actively recording")
+            else:
+                print(f"⏰ Process {app} has mic permission but not actively recording")
+        if verified_apps:
+            return verified_apps
         
         # Fallback to registry method
+        using_apps = []
+        for exe_name in registry_apps:
+            if verified.get(exe_name):
+                using_apps.append(exe_name)
+                logging.info(f"✅ Active microphone use detected: {exe_name}")
+            else:
+                logging.debug(f"⏰ {exe_name} has mic permission but not actively recording")
+        return using_apps
+    
+    def _sample_processes(self):
+        """Read the process table and the CPU times of every app that needs a CPU check"""
+        return self.cpu.scan(lambda processes: [
+            entry for exe_name in CPU_CHECKED_APPS for entry in processes.find(exe_name)
+        ])
+    
+    def _get_registry_candidates(self):
+        """
+        Walk the microphone consent store for apps that claim to be using the mic.
+        Whether they are still running is checked against the tick's process table.
         
+        Returns:
+            list: Executable names
+        """
+        candidates = []
         try:
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_path, 0, winreg.KEY_READ) as key:
                 i = 0
@@ -60,17 +127,7 @@ class WindowsMicrophoneMonitor:
                                     # Clean up the path (e.g., 'C:#...#obs64.exe' -> 'obs64.exe')
                                     clean_name = app_key_name.replace('#', '\\')
                                     exe_name = clean_name.split('\\')[-1]
-                                    
-                                    # Check if process is actually running
-                                    if self._is_process_running(exe_name):
-                                        # Verify if the app is actually recording (not just has permission)
-                                        if self._is_actually_recording(exe_name):
-                                            using_apps.append(exe_name)
-                                            logging.info(f"✅ Active microphone use detected: {exe_name}")
-                                        else:
-                                            logging.debug(f"⏰ {exe_name} has mic permission but not actively recording")
-                                    else:
-                                        logging.debug(f"❌ Registry shows {exe_name} using mic, but process not running (stale entry)")
+                                    candidates.append(exe_name)
                             except FileNotFoundError:
                                 continue
                     except OSError:
@@ -81,105 +138,42 @@ class WindowsMicrophoneMonitor:
         except Exception as e:
             logging.error(f"Error reading Windows Registry: {e}")
             
-        return using_apps
-    
-    def _is_process_running(self, exe_name):
-        """Check if a process with the given executable name is actually running"""
-        try:
-            for proc in psutil.process_iter(['name']):
-                if proc.info['name'] and proc.info['name'].lower() == exe_name.lower():
-                    return True
-            return False
-        except Exception as e:
-            logging.debug(f"Error checking if process {exe_name} is running: {e}")
-            # If we can't check, assume it's running to be safe
-            return True
+        return candidates
     
-    def _is_actually_recording(self, exe_name):
+    def _is_actually_recording(self, exe_name, processes):
         """
         Check if an application is actually recording audio.
         We'll be MORE restrictive to avoid false positives.
+        
+        CPU use comes from the deltas sampled in _sample_processes(), so this
+        never sleeps; an app seen for the first time counts as idle until
+        the next tick.
         """
-        try:
-            # Known communication/recording apps that should be trusted when registry says they're using mic
-            # BUT only when they're likely in an actual call
-            known_communication_apps = [
-                'teams.exe', 'ms-teams.exe', 'zoom.exe', 'zoomwebservice.exe',
-                'discord.exe', 'skype.exe', 'webexmta.exe', 'ciscowebexstart.exe',
-                'obs64.exe', 'obs32.exe', 'streamlabs obs.exe',
-                'audacity.exe', 'vlc.exe'
-            ]
-            
-            # Apps that need extra verification (often have permission but rarely use it)
-            apps_needing_cpu_check = [
-                'chrome.exe', 'msedge.exe', 'firefox.exe',
-                'slack.exe', 'whatsapp.exe', 'telegram.exe'
-            ]
-            
-            # Apps that often have mic permission but rarely actually use it
-            # These need additional verification
-            apps_needing_verification = [
-                'nvidia broadcast.exe', 'nvidiabroadcast.exe',
-                'krisp.exe', 'voicemod.exe', 'vb-audio.exe'
-            ]
-            
-            exe_lower = exe_name.lower()
-            
-            # Check if it's a known communication app that we trust
-            if exe_lower in known_communication_apps:
-                # Trust these apps when registry says they're using mic
-                logging.debug(f"✅ Known communication app {exe_name} is using microphone")
-                return True
-            
-            # Check if it needs CPU verification (browsers, Slack, etc.)
-            elif exe_lower in apps_needing_cpu_check:
-                # These apps often have permission but aren't actively in calls
-                # Check if process is actually running with significant activity
-                for proc in psutil.process_iter(['name', 'pid', 'cpu_percent']):
-                    if proc.info['name'] and proc.info['name'].lower() == exe_lower:
-                        try:
-                            proc_obj = psutil.Process(proc.info['pid'])
-                            # Get CPU usage over a short interval
-                            cpu = proc_obj.cpu_percent(interval=0.5)
-                            # Require significant CPU usage as indicator of active call
-                            if cpu > 10.0:
-                                logging.debug(f"✅ {exe_name} appears to be in active call (CPU: {cpu:.1f}%)")
-                                return True
-                            else:
-                                logging.debug(f"⚠️ {exe_name} has mic permission but low activity (CPU: {cpu:.1f}%)")
-                                return False
-                        except:
-                            pass
-                return False
-            
-            # For apps that need verification
-            elif exe_lower in apps_needing_verification:
-                # These apps often have permission but aren't actively recording
-                # Only consider them active if they have high CPU usage
-                for proc in psutil.process_iter(['name', 'pid']):
-                    if proc.info['name'] and proc.info['name'].lower() == exe_lower:
-                        try:
-                            proc_obj = psutil.Process(proc.info['pid'])
-                            cpu = proc_obj.cpu_percent(interval=0.5)
-                            if cpu > 15.0:  # Higher threshold for these apps
-                                logging.debug(f"✅ {exe_name} appears to be processing audio (CPU: {cpu:.1f}%)")
-                                return True
-                            else:
-                                logging.debug(f"⚠️ {exe_name} has permission but likely idle (CPU: {cpu:.1f}%)")
-                                return False
-                        except:
-                            pass
-                return False
-            
-            # Unknown apps - be very conservative
-            else:
-                logging.debug(f"❓ Unknown app {exe_name} - not considering as actively recording")
+        exe_lower = exe_name.lower()
+        
+        # Check if it's a known communication app that we trust
+        if exe_lower in KNOWN_COMMUNICATION_APPS:
+            # Trust these apps when registry says they're using mic
+            logging.debug(f"✅ Known communication app {exe_name} is using microphone")
+            return True
+        
+        # Browsers, Slack, audio processing apps: these often have permission but
+        # aren't actively in calls, so require significant CPU use by any instance
+        threshold = CPU_CHECKED_APPS.get(exe_lower)
+        if threshold is not None:
+            cpu = self.cpu.busiest(processes.find(exe_lower))
+            if cpu is None:
+                logging.debug(f"⚠️ {exe_name} has mic permission but no CPU sample yet")
                 return False
-                
-        except Exception as e:
-            logging.debug(f"Error checking if {exe_name} is actually recording: {e}")
-            # If we can't check, assume not recording to avoid false positives
+            if cpu > threshold:
+                logging.debug(f"✅ {exe_name} appears to be in active call (CPU: {cpu:.1f}%)")
+                return True
+            logging.debug(f"⚠️ {exe_name} has mic permission but low activity (CPU: {cpu:.1f}%)")
             return False
+        
+        # Unknown apps - be very conservative
+        logging.debug(f"❓ Unknown app {exe_name} - not considering as actively recording")
+        return False
     
     def get_status(self):
         """
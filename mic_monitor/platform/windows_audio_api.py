@@ -1,101 +1,171 @@
 """
 Windows Audio Session API integration for real-time microphone detection
 """
+import asyncio
 import subprocess
 import json
 import logging
 import psutil
 
+from ..engine import run_command
+from ..helper_host import HelperError, HelperProcess
+
+
+# PowerShell script that checks for ACTUAL microphone usage
+# More conservative approach to avoid false positives
+POWERSHELL_SCRIPT = '''
+try {
+    $audioApps = @()
+    $debugInfo = @()
+
+    # Check microphone usage through Windows capability manager
+    $micPath = "HKCU:\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\CapabilityAccessManager\\ConsentStore\\microphone"
+
+    if (Test-Path $micPath) {
+        # Check NonPackaged apps (desktop applications)
+        $nonPackagedPath = "$micPath\\NonPackaged"
+        if (Test-Path $nonPackagedPath) {
+            $apps = Get-ChildItem $nonPackagedPath -ErrorAction SilentlyContinue
+
+            foreach ($app in $apps) {
+                try {
+                    $lastUsedStop = Get-ItemProperty -Path $app.PSPath -Name "LastUsedTimeStop" -ErrorAction SilentlyContinue
+
+                    # If LastUsedTimeStop is 0, the app claims to be using the microphone
+                    if ($lastUsedStop -and $lastUsedStop.LastUsedTimeStop -eq 0) {
+                        # Extract process name from registry key
+                        $appName = $app.Name -replace ".*\\\\", "" -replace "#", "\\" 
+                        $exeName = ($appName -split "\\\\")[-1]
+
+                        # Verify the process is actually running
+                        $process = Get-Process -Name ($exeName -replace "\\.exe$", "") -ErrorAction SilentlyContinue
+                        if ($process) {
+                            # Additional check: see if the process has significant CPU usage
+                            # This helps filter out apps that just have permission but aren't active
+                            $cpuUsage = $process.CPU
+                            if ($cpuUsage -gt 0) {
+                                $audioApps += $exeName
+                                $debugInfo += "Found: $exeName (CPU: $cpuUsage)"
+                            } else {
+                                $debugInfo += "Skipped: $exeName (no CPU activity)"
+                            }
+                        }
+                    }
+                } catch {
+                    # Ignore individual app errors
+                }
+            }
+        }
+    }
+
+    # Remove duplicates and return as JSON
+    $uniqueApps = $audioApps | Sort-Object -Unique
+    if ($uniqueApps.Count -eq 0) {
+        Write-Output "[]"
+    } else {
+        $uniqueApps | ConvertTo-Json
+    }
+} catch {
+    Write-Output "[]"
+}
+'''
+
+# Keeps one PowerShell running and runs the script above once per request line,
+# replying with its output (see HelperProcess for the protocol)
+POWERSHELL_HELPER_SCRIPT = '''
+$detect = {
+''' + POWERSHELL_SCRIPT + '''
+}
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    $id = $null
+    try {
+        $id = ($line | ConvertFrom-Json).id
+        $output = (& $detect | Out-String)
+        $reply = @{ id = $id; ok = $true; result = $output }
+    } catch {
+        $reply = @{ id = $id; ok = $false; error = $_.Exception.Message }
+    }
+    [Console]::Out.WriteLine((ConvertTo-Json $reply -Compress))
+    [Console]::Out.Flush()
+}
+'''
+
+
+# Seconds the PowerShell helper has to answer, well inside the probe's
+# deadline so a one-off PowerShell run still fits after a stall
+HELPER_TIMEOUT = 1.5
+
 
 class WindowsAudioMonitor:
     """Monitor microphone usage using Windows Audio Session API"""
     
+    def __init__(self):
+        # Starting PowerShell costs hundreds of ms and tens of MB, so it is kept running
+        self.helper = HelperProcess('PowerShell', self._command(POWERSHELL_HELPER_SCRIPT),
+                                    timeout=HELPER_TIMEOUT, creationflags=subprocess.CREATE_NO_WINDOW)
+    
+    def _command(self, script=POWERSHELL_SCRIPT):
+        return ['powershell', '-WindowStyle', 'Hidden', '-ExecutionPolicy', 'Bypass', '-Command', script]
+    
+    def _parse_output(self, stdout):
+        """Parse the JSON (or plain text) list of apps printed by the script"""
+        if not stdout.strip():
+            return []
+        try:
+            apps = json.loads(stdout.strip())
+            if isinstance(apps, list):
+                return [app for app in apps if app and isinstance(app, str)]
+            elif isinstance(apps, str) and apps:
+                return [apps]
+        except json.JSONDecodeError:
+            # If JSON parsing fails, try to extract app names from text output
+            lines = stdout.strip().split('\n')
+            return [line.strip() for line in lines if line.strip().endswith('.exe')]
+        return []
+    
     def get_active_microphone_apps(self):
         """
         Get applications currently using microphone using Windows native detection.
         This mirrors how Windows itself detects microphone usage.
         """
         try:
-            # PowerShell script that checks for ACTUAL microphone usage
-            # More conservative approach to avoid false positives
-            powershell_script = '''
-            try {
-                $audioApps = @()
-                $debugInfo = @()
-                
-                # Check microphone usage through Windows capability manager
-                $micPath = "HKCU:\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\CapabilityAccessManager\\ConsentStore\\microphone"
-                
-                if (Test-Path $micPath) {
-                    # Check NonPackaged apps (desktop applications)
-                    $nonPackagedPath = "$micPath\\NonPackaged"
-                    if (Test-Path $nonPackagedPath) {
-                        $apps = Get-ChildItem $nonPackagedPath -ErrorAction SilentlyContinue
-                        
-                        foreach ($app in $apps) {
-                            try {
-                                $lastUsedStop = Get-ItemProperty -Path $app.PSPath -Name "LastUsedTimeStop" -ErrorAction SilentlyContinue
-                                
-                                # If LastUsedTimeStop is 0, the app claims to be using the microphone
-                                if ($lastUsedStop -and $lastUsedStop.LastUsedTimeStop -eq 0) {
-                                    # Extract process name from registry key
-                                    $appName = $app.Name -replace ".*\\\\", "" -replace "#", "\\" 
-                                    $exeName = ($appName -split "\\\\")[-1]
-                                    
-                                    # Verify the process is actually running
-                                    $process = Get-Process -Name ($exeName -replace "\\.exe$", "") -ErrorAction SilentlyContinue
-                                    if ($process) {
-                                        # Additional check: see if the process has significant CPU usage
-                                        # This helps filter out apps that just have permission but aren't active
-                                        $cpuUsage = $process.CPU
-                                        if ($cpuUsage -gt 0) {
-                                            $audioApps += $exeName
-                                            $debugInfo += "Found: $exeName (CPU: $cpuUsage)"
-                                        } else {
-                                            $debugInfo += "Skipped: $exeName (no CPU activity)"
-                                        }
-                                    }
-                                }
-                            } catch {
-                                # Ignore individual app errors
-                            }
-                        }
-                    }
-                }
-                
-                # Remove duplicates and return as JSON
-                $uniqueApps = $audioApps | Sort-Object -Unique
-                if ($uniqueApps.Count -eq 0) {
-                    Write-Output "[]"
-                } else {
-                    $uniqueApps | ConvertTo-Json
-                }
-            } catch {
-                Write-Output "[]"
-            }
-            '''
-            
             result = subprocess.run(
-                ['powershell', '-WindowStyle', 'Hidden', '-ExecutionPolicy', 'Bypass', '-Command', powershell_script],
+                self._command(),
                 capture_output=True, text=True, timeout=5, creationflags=subprocess.CREATE_NO_WINDOW
             )
             
-            if result.returncode == 0 and result.stdout.strip():
-                try:
-                    apps = json.loads(result.stdout.strip())
-                    if isinstance(apps, list):
-                        return [app for app in apps if app and isinstance(app, str)]
-                    elif isinstance(apps, str) and apps:
-                        return [apps]
-                except json.JSONDecodeError:
-                    # If JSON parsing fails, try to extract app names from text output
-                    lines = result.stdout.strip().split('\n')
-                    return [line.strip() for line in lines if line.strip().endswith('.exe')]
+            if result.returncode == 0:
+                return self._parse_output(result.stdout)
                     
         except Exception as e:
             logging.debug(f"Windows Audio API check failed: {e}")
             
         return []
+    
+    async def get_active_microphone_apps_async(self, timeout=5):
+        """
+        Async version of get_active_microphone_apps() for the detection engine.
+        
+        The script runs in the long-lived PowerShell helper. While the helper
+        cannot be used (it failed to start, crashed or is backing off after a
+        stall) the script runs in a one-off PowerShell process as before,
+        with whatever is left of ``timeout``. The one-off process is killed if
+        the probe is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            return self._parse_output(await self.helper.request({'op': 'detect'}, min(timeout, HELPER_TIMEOUT)) or '')
+        except HelperError as e:
+            logging.debug(f"PowerShell helper unavailable, running the script directly: {e}")
+        returncode, stdout = await run_command(
+            self._command(), max(0.0, deadline - loop.time()), creationflags=subprocess.CREATE_NO_WINDOW
+        )
+        if returncode == 0:
+            return self._parse_output(stdout)
+        return []
 
 
 def test_audio_monitor():
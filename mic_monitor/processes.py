@@ -0,0 +1,196 @@
+"""
+Per-tick snapshot of the process table
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+import psutil
+
+
+class ProcessEntry(NamedTuple):
+    """
+    One running process.
+
+    (pid, create_time) identifies a process; a pid alone may have been reused
+    by another process since it was seen.
+    """
+    pid: int
+    name: str
+    create_time: Optional[float]
+
+
+class ProcessTable:
+    """
+    The process table read once, indexed by lower-cased executable name.
+
+    Backends build one table per tick and answer every "is X running" and
+    "which pids are X" question from it instead of walking the process list
+    again for each app. Lookups are dictionary reads; the table is not
+    updated, so a process started after scan() is seen on the next tick.
+    """
+
+    def __init__(self, processes=()):
+        """
+        Args:
+            processes: Iterable of (pid, name, create_time); entries without a name are skipped
+        """
+        self._by_pid: Dict[int, ProcessEntry] = {}
+        self._by_name: Dict[str, List[ProcessEntry]] = {}
+        self._matches: Dict[str, List[ProcessEntry]] = {}
+        for pid, name, create_time in processes:
+            if not name:
+                continue
+            entry = ProcessEntry(pid, name, create_time)
+            self._by_pid[pid] = entry
+            self._by_name.setdefault(name.lower(), []).append(entry)
+        self.taken_at = time.monotonic()
+
+    @classmethod
+    def scan(cls) -> 'ProcessTable':
+        """Read the running processes (one pass over the OS process list)"""
+        return cls(
+            (proc.info['pid'], proc.info['name'], proc.info['create_time'])
+            for proc in psutil.process_iter(['pid', 'name', 'create_time'])
+        )
+
+    def __len__(self):
+        return len(self._by_pid)
+
+    def __contains__(self, name) -> bool:
+        return name.lower() in self._by_name
+
+    def is_running(self, name: str) -> bool:
+        """Whether a process with this executable name (any case) is running"""
+        return name.lower() in self._by_name
+
+    def find(self, name: str) -> List[ProcessEntry]:
+        """Processes with this executable name (any case)"""
+        return self._by_name.get(name.lower(), [])
+
+    def matching(self, fragment: str) -> List[ProcessEntry]:
+        """
+        Processes whose name contains ``fragment`` (any case), e.g. "zoom"
+        for "zoom.us". Scans the names once per fragment and table.
+        """
+        key = fragment.lower()
+        entries = self._matches.get(key)
+        if entries is None:
+            entries = self._matches[key] = [
+                entry for name, group in self._by_name.items() if key in name for entry in group
+            ]
+        return entries
+
+    def get(self, pid: int) -> Optional[ProcessEntry]:
+        """The process with this pid when the table was taken"""
+        return self._by_pid.get(pid)
+
+    def contains(self, entry: ProcessEntry) -> bool:
+        """Whether the same process (pid and start time) is still in this table"""
+        current = self._by_pid.get(entry.pid)
+        return current is not None and current.create_time == entry.create_time
+
+
+def open_process(entry: ProcessEntry) -> Optional[psutil.Process]:
+    """
+    A psutil handle for a table entry.
+
+    Returns:
+        psutil.Process, or None if the process exited or its pid now belongs to another process
+    """
+    try:
+        process = psutil.Process(entry.pid)
+        if entry.create_time is not None and process.create_time() != entry.create_time:
+            return None
+        return process
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+# Deltas over shorter windows are mostly scheduler noise
+MIN_SAMPLE_INTERVAL = 0.2
+
+
+class CpuSampler:
+    """
+    CPU utilisation of processes, from the change in their CPU times between ticks.
+
+    update() reads the CPU times of the tracked processes once per tick and
+    never sleeps; percent() is a dictionary read. Like psutil's
+    cpu_percent(), 100% is one full core. A process has no value until it
+    has been seen on two ticks at least ``min_interval`` seconds apart.
+    """
+
+    def __init__(self, min_interval=MIN_SAMPLE_INTERVAL):
+        self.min_interval = min_interval
+        # (pid, create_time) -> psutil.Process, (cpu seconds, monotonic time), percent
+        self._handles = {}
+        self._samples = {}
+        self._percent = {}
+        self._scanning = threading.Lock()
+
+    def scan(self, select) -> Optional[ProcessTable]:
+        """
+        Read the process table and sample the processes ``select(table)`` returns.
+
+        Probes run this in an executor thread, which keeps running after its
+        probe misses the deadline. While an earlier scan is still running this
+        returns None without reading anything, so only one thread at a time
+        updates the samples.
+
+        Returns:
+            ProcessTable, or None if an earlier scan is still running
+        """
+        if not self._scanning.acquire(blocking=False):
+            logging.debug("Previous process scan still running, skipping this one")
+            return None
+        try:
+            processes = ProcessTable.scan()
+            self.update(select(processes))
+            return processes
+        finally:
+            self._scanning.release()
+
+    def update(self, entries):
+        """
+        Sample the given processes; processes not passed in are forgotten.
+
+        Args:
+            entries: ProcessEntry items from this tick's ProcessTable
+        """
+        now = time.monotonic()
+        seen = set()
+        for entry in entries:
+            key = (entry.pid, entry.create_time)
+            if key in seen:
+                continue
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = open_process(entry)
+                if handle is None:
+                    continue
+                self._handles[key] = handle
+            try:
+                times = handle.cpu_times()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            seen.add(key)
+            cpu = times.user + times.system
+            previous = self._samples.get(key)
+            if previous is None:
+                self._samples[key] = (cpu, now)
+            elif now - previous[1] >= self.min_interval:
+                self._percent[key] = max(0.0, (cpu - previous[0]) / (now - previous[1]) * 100)
+                self._samples[key] = (cpu, now)
+        for mapping in (self._handles, self._samples, self._percent):
+            for key in [key for key in mapping if key not in seen]:
+                del mapping[key]
+
+    def percent(self, entry: ProcessEntry) -> Optional[float]:
+        """CPU use of a process over the last sampled interval, or None if not known yet"""
+        return self._percent.get((entry.pid, entry.create_time))
+
+    def busiest(self, entries) -> Optional[float]:
+        """Highest CPU use among processes (e.g. all instances of an app), or None if none is known"""
+        values = [value for value in map(self.percent, entries) if value is not None]
+        return max(values) if values else None
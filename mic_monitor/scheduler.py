@@ -0,0 +1,167 @@
+"""
+Adaptive polling interval for the monitor loop
+"""
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Long-lived children (probe helpers, pw-dump) are never waited for while
+# they run, so os.times() does not see them; their CPU is read through psutil
+_children = {}
+_children_lock = threading.Lock()
+
+
+def track_child(pid):
+    """Count a long-lived child process's CPU time as monitor CPU until it exits"""
+    if psutil is None:
+        return
+    try:
+        process = psutil.Process(pid)
+    except (psutil.Error, ValueError):
+        return
+    with _children_lock:
+        _children[pid] = process
+
+
+def untrack_child(pid):
+    """Stop reading a child's CPU time (once it has been waited for, os.times() counts it)"""
+    with _children_lock:
+        _children.pop(pid, None)
+
+
+def _children_cpu():
+    with _children_lock:
+        children = list(_children.items())
+    total = 0.0
+    for pid, process in children:
+        try:
+            times = process.cpu_times()
+        except psutil.Error:
+            untrack_child(pid)
+            continue
+        total += times.user + times.system
+    return total
+
+
+def _cpu_seconds():
+    """
+    CPU time of the whole monitor process (every thread, including the
+    executor threads probes run in), its tracked long-lived children and
+    any child processes that were waited for. Windows does not report the
+    CPU of waited-for children, so there only tracked children are counted.
+    """
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system + _children_cpu()
+
+
+class AdaptivePollScheduler:
+    """
+    Chooses the sleep between probes from their measured cost.
+
+    The interval starts at ``min_interval`` after a transition (a new app,
+    a meeting ending) and stretches while the state stays stable. It never
+    exceeds ``max_latency``, the guaranteed worst-case detection delay, and
+    is stretched further only when needed to keep probe CPU time within
+    ``cpu_budget`` (a fraction of one core). When the latency bound and the
+    budget conflict, the latency bound wins and the overrun is counted.
+    """
+
+    def __init__(self, cpu_budget=0.002, max_latency=5.0, min_interval=0.5,
+                 growth=1.25, smoothing=0.2):
+        """
+        Args:
+            cpu_budget: Probe CPU time allowed per wall-clock second (0.002 = 0.2% of a core)
+            max_latency: Longest allowed interval between probes, in seconds
+            min_interval: Interval used right after a transition, in seconds
+            growth: Factor applied to the interval after each stable probe
+            smoothing: Weight of the newest sample in the moving average of probe cost
+        """
+        self.cpu_budget = cpu_budget
+        self.max_latency = max_latency
+        self.min_interval = min(min_interval, max_latency)
+        self.growth = growth
+        self.smoothing = smoothing
+        self.interval = self.min_interval
+        self.probe_cost = None
+        self.probes = 0
+        self.transitions = 0
+        self.budget_overruns = 0
+        self.total_cpu = 0.0
+        self._started = time.monotonic()
+        self._started_cpu = _cpu_seconds()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a scheduler from the user configuration"""
+        return cls(
+            cpu_budget=config['cpu_budget_percent'] / 100.0,
+            max_latency=config['max_detection_latency'],
+            min_interval=config['min_poll_interval'],
+        )
+
+    def start_probe(self):
+        """Mark the start of a probe; pass the result to finish_probe()"""
+        return _cpu_seconds()
+
+    def finish_probe(self, token, changed: bool) -> float:
+        """
+        Record a probe and choose the next interval.
+
+        Args:
+            token: Value returned by start_probe()
+            changed: True if the probe saw a different state than the previous one
+
+        Returns:
+            float: Seconds to wait before the next probe
+        """
+        cost = max(0.0, _cpu_seconds() - token)
+        self.probes += 1
+        self.total_cpu += cost
+        if self.probe_cost is None:
+            self.probe_cost = cost
+        else:
+            self.probe_cost += self.smoothing * (cost - self.probe_cost)
+
+        if changed:
+            self.transitions += 1
+            interval = self.min_interval
+        else:
+            interval = self.interval * self.growth
+
+        # Stretch to stay within the CPU budget
+        if self.cpu_budget > 0:
+            interval = max(interval, self.probe_cost / self.cpu_budget)
+
+        if interval > self.max_latency:
+            if self.cpu_budget > 0 and self.probe_cost / self.cpu_budget > self.max_latency:
+                self.budget_overruns += 1
+            interval = self.max_latency
+
+        self.interval = interval
+        return interval
+
+    def next_interval(self) -> float:
+        """Seconds to wait before the next probe"""
+        return self.interval
+
+    def stats(self) -> dict:
+        """Scheduler statistics for the status widget and logs"""
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        cost = self.probe_cost or 0.0
+        return {
+            'probes': self.probes,
+            'transitions': self.transitions,
+            'interval_seconds': round(self.interval, 3),
+            'probe_cpu_ms': round(cost * 1000, 3),
+            'cpu_budget_percent': round(self.cpu_budget * 100, 3),
+            'cpu_usage_percent': round(self.total_cpu / elapsed * 100, 3),
+            # Everything the monitor and its helpers used, including work between probes
+            'process_cpu_percent': round((_cpu_seconds() - self._started_cpu) / elapsed * 100, 3),
+            'max_detection_latency': self.max_latency,
+            'budget_overruns': self.budget_overruns,
+        }
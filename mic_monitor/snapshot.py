@@ -0,0 +1,164 @@
+"""
+Immutable status snapshot shared by every consumer of a monitor tick
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Effective states, in priority order: overrides first, then the microphone
+STATE_AWAY = 'away'
+STATE_DND = 'dnd'
+STATE_AVAILABLE = 'available'
+STATE_MEETING = 'meeting'
+
+# Selected modes (what the user asked for, as opposed to what is shown)
+MODE_AUTO = 'auto'
+MODE_AWAY = 'away'
+MODE_DND = 'dnd'
+MODE_AVAILABLE = 'available'
+
+# Simplified color scheme used by the tray icon and the Luxafor flag
+STATE_COLORS = {
+    STATE_AWAY: (255, 255, 0),      # 🟡 Yellow - Away
+    STATE_DND: (255, 0, 0),         # 🔴 Red - Do Not Disturb
+    STATE_MEETING: (255, 0, 0),     # 🔴 Red - In Meeting
+    STATE_AVAILABLE: (0, 255, 0),   # 🟢 Green - Available
+}
+
+BUSY_STATES = frozenset((STATE_DND, STATE_MEETING))
+
+# Away countdowns are shown in steps so the label (and the tray menu built
+# from it) changes a few times per hour: (up to minutes, step)
+AWAY_COUNTDOWN_STEPS = ((5, 1), (60, 5), (240, 15))
+AWAY_COUNTDOWN_STEP = 60
+# Longer than this counts as "until I change it"
+AWAY_PERMANENT_MINUTES = 1440
+
+
+def resolve_mode(manual_busy: bool = False, manual_free: bool = False,
+                 ignore_until: Optional[datetime] = None) -> str:
+    """Resolve which override mode is selected"""
+    if ignore_until:
+        return MODE_AWAY
+    if manual_busy:
+        return MODE_DND
+    if manual_free:
+        return MODE_AVAILABLE
+    return MODE_AUTO
+
+
+def resolve_state(mic_in_use: bool, manual_busy: bool = False, manual_free: bool = False,
+                  ignore_until: Optional[datetime] = None) -> str:
+    """
+    Resolve the effective status.
+
+    Priority order: away > do not disturb > manual available > microphone.
+    This is the single place where the busy/away/available decision is made.
+    """
+    mode = resolve_mode(manual_busy, manual_free, ignore_until)
+    if mode == MODE_AWAY:
+        return STATE_AWAY
+    if mode == MODE_DND:
+        return STATE_DND
+    if mode == MODE_AVAILABLE:
+        return STATE_AVAILABLE
+    return STATE_MEETING if mic_in_use else STATE_AVAILABLE
+
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    """Status computed once per tick and handed to the tray, menu, tooltip and widget"""
+
+    mic_in_use: bool = False
+    using_apps: Tuple[str, ...] = ()
+    manual_busy: bool = False
+    manual_free: bool = False
+    ignore_until: Optional[datetime] = None
+    devices: Tuple[dict, ...] = ()
+    platform: Optional[str] = None
+    mode: str = MODE_AUTO
+    state: str = STATE_AVAILABLE
+    timestamp: float = field(default_factory=time.time)
+
+    @classmethod
+    def capture(cls, mic_status: Optional[dict] = None, manual_busy: bool = False,
+                manual_free: bool = False, ignore_until: Optional[datetime] = None,
+                devices=()) -> 'StatusSnapshot':
+        """
+        Build a snapshot from a platform monitor status and the override flags.
+
+        Args:
+            mic_status: Result of a platform monitor's get_status(), or None
+            devices: Status dicts of the connected devices (copied)
+        """
+        mic_status = mic_status or {}
+        mic_in_use = bool(mic_status.get('in_use', False))
+        return cls(
+            mic_in_use=mic_in_use,
+            using_apps=tuple(mic_status.get('using_apps') or ()),
+            manual_busy=bool(manual_busy),
+            manual_free=bool(manual_free),
+            ignore_until=ignore_until,
+            devices=tuple(dict(status) for status in devices),
+            platform=mic_status.get('platform'),
+            mode=resolve_mode(manual_busy, manual_free, ignore_until),
+            state=resolve_state(mic_in_use, manual_busy, manual_free, ignore_until),
+        )
+
+    @property
+    def is_auto(self) -> bool:
+        """True when no override is active"""
+        return self.mode == MODE_AUTO
+
+    @property
+    def is_busy(self) -> bool:
+        """True when the user should not be disturbed (DND or in a meeting)"""
+        return self.state in BUSY_STATES
+
+    @property
+    def in_meeting(self) -> bool:
+        """True when auto mode detected an active microphone"""
+        return self.state == STATE_MEETING
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        """RGB color for the current state"""
+        return STATE_COLORS[self.state]
+
+    @property
+    def luxafor(self) -> dict:
+        """Status of the first connected Luxafor flag, else the first one, or an empty dict"""
+        flags = [status for status in self.devices if status.get('driver') == 'luxafor']
+        return next((status for status in flags if status.get('connected')), flags[0] if flags else {})
+
+    def mic_status(self) -> dict:
+        """The platform monitor status this snapshot was built from"""
+        return {
+            'in_use': self.mic_in_use,
+            'using_apps': list(self.using_apps),
+            'platform': self.platform,
+        }
+
+    def away_minutes_left(self, now: Optional[datetime] = None) -> int:
+        """Whole minutes left in away mode (0 when not away)"""
+        if not self.ignore_until:
+            return 0
+        remaining = self.ignore_until - (now or datetime.now())
+        return max(0, int(remaining.total_seconds() / 60))
+
+    def away_countdown(self, now: Optional[datetime] = None) -> Optional[int]:
+        """
+        Minutes left in away mode rounded up to a display step: exact below
+        5 minutes, then 5, 15 and 60 minute steps.
+
+        Returns:
+            int, or None when not away or away until changed
+        """
+        if not self.ignore_until:
+            return None
+        minutes = self.away_minutes_left(now)
+        if minutes > AWAY_PERMANENT_MINUTES:
+            return None
+        step = next((step for limit, step in AWAY_COUNTDOWN_STEPS if minutes <= limit), AWAY_COUNTDOWN_STEP)
+        return -(-minutes // step) * step
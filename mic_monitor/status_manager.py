@@ -1,98 +1,284 @@
 import time
 import logging
+import threading
+from dataclasses import replace
 from datetime import datetime, timedelta
 from typing import Optional, List
-from .devices import StatusDevice
+from . import metrics
+from .config import DEFAULTS
+from .devices import (CAPABILITY_COLOR, CAPABILITY_DETAILED_STATUS, CAPABILITY_HOTPLUG, CAPABILITY_STATE,
+                      StatusDevice, detect_capabilities, load_device_driver)
+from .devices.worker import DeviceWorker
+from .hysteresis import MeetingDebouncer
+from .overrides import OverrideScheduler
+from .snapshot import StatusSnapshot
+
+REFRESH_SECONDS = metrics.histogram('mic_monitor_refresh_seconds', "Time to resolve a tick and queue device writes")
+UPDATE_STATUS_CALLS = metrics.counter('mic_monitor_update_status_total',
+                                      "Calls to the legacy update_status() entry point")
+DEVICE_WRITES = metrics.ByLabel(metrics.counter, 'mic_monitor_device_writes_total',
+                                "Status writes queued for devices", 'driver')
 
 class StatusManager:
     """Manages microphone status and connected devices"""
     
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config or DEFAULTS
         self.manual_busy = False
         self.manual_free = False
         self.ignore_until: Optional[datetime] = None
         self._devices: List[StatusDevice] = []
+        # Per device: capabilities, worker, last submitted/acknowledged command
+        # and when it was submitted. Workers update 'acked' from their own threads.
+        self._registrations = {}
+        self._registrations_lock = threading.Lock()
+        self.reconcile_interval = self.config['device_reconcile_seconds']
+        self.write_timeout = self.config['device_write_timeout']
+        self.device_writes = 0
+        # Background helpers returned by driver setup (e.g. USB hotplug), stopped in cleanup()
+        self._services = []
+        self._last_snapshot: Optional[StatusSnapshot] = None
+        # The monitor loop, the tray and the override scheduler all refresh;
+        # the debouncer and the last snapshot are updated by one of them at a time
+        self._refresh_lock = threading.Lock()
+        self.debouncer = MeetingDebouncer.from_config(self.config)
+        # Timed overrides end on the scheduler thread; only the newest one
+        # (the current handle) may clear the override it belongs to
+        self.overrides = OverrideScheduler()
+        self._override_lock = threading.Lock()
+        self._override_handle = None
+        # Called with no arguments after a timed override ended
+        self.on_override_expired = None
         
-        # Try to initialize Luxafor device
-        self._init_luxafor()
+        self._init_devices()
         
-    def _init_luxafor(self):
-        """Initialize Luxafor device if available"""
-        try:
-            from .devices.luxafor import LuxaforDevice
-            device = LuxaforDevice()
-            if device.connect(max_retries=3, retry_delay=1):
-                self._devices.append(device)
-                logging.info("✅ Luxafor Flag integration enabled")
-                # Set initial color to green (available)
-                device.set_color(0, 255, 0)
-            else:
-                logging.warning(f"⚠️ Luxafor Flag not available: {device.status.get('error')}")
-        except Exception as e:
-            logging.error(f"❌ Error initializing Luxafor: {e}", exc_info=True)
+    def _init_devices(self):
+        """
+        Set up the device drivers enabled in the 'devices' config key.
+
+        Drivers are imported only here, and only when enabled; a driver that
+        fails to load or set up is logged and skipped.
+        """
+        for name, options in (self.config.get('devices') or {}).items():
+            options = dict(options or {})
+            if not options.pop('enabled', True):
+                continue
+            try:
+                driver = load_device_driver(name)
+                service = driver.setup(self, options)
+            except NotImplementedError as e:
+                logging.warning(f"⚠️ {e}")
+                continue
+            except Exception as e:
+                logging.error(f"❌ Error initializing device '{name}': {e}", exc_info=True)
+                continue
+            if service is not None:
+                self._services.append(service)
             
+    def register_device(self, device: StatusDevice):
+        """Add a device; its capabilities are detected once, here, and it gets its own worker"""
+        registration = {
+            'capabilities': detect_capabilities(device),
+            'submitted': None,
+            'acked': None,
+            'written_at': None,
+        }
+        registration['worker'] = DeviceWorker(
+            device,
+            on_result=lambda key, ok: self._on_write_result(device, registration, key, ok),
+            timeout=self.write_timeout
+        )
+        # The hotplug thread registers devices while the monitor thread iterates them
+        with self._registrations_lock:
+            self._registrations[id(device)] = registration
+            self._devices.append(device)
+
+    def unregister_device(self, device: StatusDevice):
+        """Remove a device and stop its worker"""
+        with self._registrations_lock:
+            if device in self._devices:
+                self._devices.remove(device)
+            registration = self._registrations.pop(id(device), None)
+        if registration:
+            registration['worker'].stop(timeout=self.write_timeout)
+
+    def _registered(self) -> list:
+        """(device, registration) pairs, copied so the hotplug thread can register devices meanwhile"""
+        with self._registrations_lock:
+            return [(device, self._registrations[id(device)]) for device in self._devices]
+
+    def wait_for_devices(self, timeout=None) -> bool:
+        """Wait until every device worker has finished its queued writes"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for _, registration in self._registered():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not registration['worker'].wait_idle(remaining):
+                return False
+        return True
+
+    def snapshot(self, mic_status: Optional[dict] = None) -> StatusSnapshot:
+        """Build a status snapshot without touching the devices"""
+        return StatusSnapshot.capture(
+            mic_status,
+            manual_busy=self.manual_busy,
+            manual_free=self.manual_free,
+            ignore_until=self.ignore_until,
+            devices=self.get_device_status()
+        )
+
+    def refresh(self, mic_status: Optional[dict] = None) -> StatusSnapshot:
+        """
+        Resolve the status for one tick and push it to all devices (thread-safe).
+
+        Args:
+            mic_status: Result of the platform monitor's get_status()
+
+        Returns:
+            StatusSnapshot: The resolved status, including the device state after the update
+        """
+        with self._refresh_lock, REFRESH_SECONDS.time():
+            # Only confirmed meeting transitions reach the devices and the UI
+            snapshot = self.snapshot(self.debouncer.filter(mic_status))
+            self._last_snapshot = snapshot
+            self._update_devices(snapshot)
+        return replace(snapshot, devices=tuple(dict(status) for status in self.get_device_status()))
+
     def update_status(self, is_mic_in_use: bool) -> bool:
         """Update status based on mic usage and manual overrides"""
-        # Check if we should ignore mic status
-        if self.ignore_until:
-            if datetime.now() > self.ignore_until:
-                self.ignore_until = None
-            else:
-                is_mic_in_use = False
-                
-        # Apply manual overrides
-        if self.manual_busy:
-            is_mic_in_use = True
-        elif self.manual_free:
-            is_mic_in_use = False
-            
-        # Update all connected devices with enhanced status
-        for device in self._devices:
-            try:
-                # Pass enhanced status information for better color control
-                if hasattr(device, 'set_status') and len(device.set_status.__code__.co_varnames) > 2:
-                    # Enhanced device (like Luxafor) that supports detailed status
-                    if not device.set_status(
-                        mic_in_use=is_mic_in_use,
-                        manual_busy=self.manual_busy,
-                        manual_free=self.manual_free,
-                        ignore_until=self.ignore_until
-                    ):
-                        logging.warning(f"Failed to update device: {device.status['error']}")
-                else:
-                    # Legacy device interface
-                    if not device.set_status(is_mic_in_use):
-                        logging.warning(f"Failed to update device: {device.status['error']}")
-            except Exception as e:
-                logging.error(f"Error updating device: {e}")
-                
-        return is_mic_in_use
+        UPDATE_STATUS_CALLS.inc()
+        return self.refresh({'in_use': is_mic_in_use, 'using_apps': []}).is_busy
+
+    def _device_command(self, capabilities, snapshot: StatusSnapshot):
+        """
+        Choose how to drive a device for a snapshot.
+
+        Returns:
+            tuple: (command key used to detect changes, callable taking the device)
+        """
+        if CAPABILITY_STATE in capabilities:
+            # The device renders each state itself (e.g. on-device animations),
+            # so states that share a color are still distinct commands
+            state = snapshot.state
+            return ('state', state), lambda device: device.set_state(state)
+        if CAPABILITY_COLOR in capabilities:
+            color = snapshot.color
+            return ('color', color), lambda device: device.set_color(*color)
+        if CAPABILITY_DETAILED_STATUS in capabilities:
+            # Enhanced device that supports detailed status
+            return ('state', snapshot.state), lambda device: device.set_status(
+                mic_in_use=snapshot.mic_in_use,
+                manual_busy=snapshot.manual_busy,
+                manual_free=snapshot.manual_free,
+                ignore_until=snapshot.ignore_until
+            )
+        # Legacy device interface
+        return ('busy', snapshot.is_busy), lambda device: device.set_status(snapshot.is_busy)
+
+    def _update_devices(self, snapshot: StatusSnapshot):
+        """
+        Queue a resolved snapshot for every device whose state differs.
+
+        Writes run on the per-device workers, so this never blocks on USB and
+        devices are updated in parallel. A command is skipped if it is already
+        queued or acknowledged; devices are rewritten every reconcile_interval
+        seconds even without a change, to recover flags that were unplugged or reset.
+        """
+        now = time.monotonic()
+        for device, registration in self._registered():
+            registration['worker'].check_stalled()
+            if CAPABILITY_HOTPLUG in registration['capabilities'] and not device.status.get('connected'):
+                # Written by resync_device() once it is attached again
+                continue
+            self._submit(device, registration, snapshot, now)
+
+    def _submit(self, device: StatusDevice, registration: dict, snapshot: StatusSnapshot, now, force=False):
+        """Queue a snapshot on a device's worker unless it is already queued and fresh"""
+        key, write = self._device_command(registration['capabilities'], snapshot)
+        with self._registrations_lock:
+            stale = (force or registration['written_at'] is None
+                     or now - registration['written_at'] >= self.reconcile_interval)
+            if key == registration['submitted'] and not stale:
+                return
+            registration['submitted'] = key
+            registration['written_at'] = now
+        self.device_writes += 1
+        DEVICE_WRITES[device.status.get('driver') or type(device).__name__].inc()
+        registration['worker'].submit(key, write)
+
+    def resync_device(self, device: StatusDevice):
+        """Rewrite the current status to a device, e.g. after it was plugged back in (thread-safe)"""
+        registration = self._registrations.get(id(device))
+        snapshot = self._last_snapshot
+        if registration is None or snapshot is None:
+            # The first refresh sets the initial color
+            return
+        self._submit(device, registration, snapshot, time.monotonic(), force=True)
+
+    def _on_write_result(self, device: StatusDevice, registration: dict, key, ok: bool):
+        """Record a finished write (called on the device's worker thread)"""
+        with self._registrations_lock:
+            if ok:
+                registration['acked'] = key
+                return
+            registration['acked'] = None
+            # Retry on the next tick unless a newer command is already queued
+            if registration['submitted'] == key:
+                registration['submitted'] = None
+        logging.warning(f"Failed to update device: {device.status.get('error')}")
         
-    def set_manual_status(self, is_busy: bool):
-        """Set manual busy/free status"""
-        self.manual_busy = is_busy
-        self.manual_free = not is_busy
-        self.ignore_until = None
+    def _set_override(self, manual_busy=False, manual_free=False, ignore_until=None, until=None):
+        """Replace the current override, cancelling the expiry of the previous one"""
+        with self._override_lock:
+            self.overrides.cancel(self._override_handle)
+            self._override_handle = None
+            self.manual_busy = manual_busy
+            self.manual_free = manual_free
+            self.ignore_until = ignore_until
+            if until is not None:
+                self._override_handle = self.overrides.call_at(until.timestamp(), self._expire_override)
+
+    def _expire_override(self, handle):
+        """End a timed override (called on the scheduler thread)"""
+        with self._override_lock:
+            if handle != self._override_handle:
+                # Replaced or cleared while this expiry was being dispatched
+                return
+            self._override_handle = None
+            self.manual_busy = False
+            self.manual_free = False
+            self.ignore_until = None
+        if self.on_override_expired:
+            self.on_override_expired()
+
+    def set_manual_status(self, is_busy: bool, minutes: Optional[int] = None):
+        """Set manual busy/free status, returning to auto after ``minutes`` if given"""
+        until = datetime.now() + timedelta(minutes=minutes) if minutes else None
+        self._set_override(manual_busy=is_busy, manual_free=not is_busy, until=until)
         
     def ignore_mic_for(self, minutes: int):
         """Ignore microphone status for specified duration"""
-        self.ignore_until = datetime.now() + timedelta(minutes=minutes)
-        self.manual_busy = False
-        self.manual_free = False
+        until = datetime.now() + timedelta(minutes=minutes)
+        self._set_override(ignore_until=until, until=until)
         
     def clear_override(self):
         """Clear all manual overrides"""
-        self.manual_busy = False
-        self.manual_free = False
-        self.ignore_until = None
+        self._set_override()
         
     def get_device_status(self) -> list:
         """Get status of all connected devices"""
-        return [device.status for device in self._devices]
+        with self._registrations_lock:
+            devices = list(self._devices)
+        return [device.status for device in devices]
         
     def cleanup(self):
         """Clean up all devices"""
-        for device in self._devices:
+        self.overrides.stop()
+        for service in self._services:
+            service.stop()
+        registered = self._registered()
+        for _, registration in registered:
+            registration['worker'].stop(timeout=self.write_timeout)
+        for device, _ in registered:
             try:
                 device.disconnect()
             except Exception as e:
@@ -9,36 +9,73 @@ import sys
 import time
 import json
 import logging
+import queue
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime, timedelta
 from typing import Optional, List
 import pystray
-from PIL import Image, ImageDraw
 
 # Add mic_monitor to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'mic_monitor'))
 
-# Import platform-specific monitor
-if sys.platform == 'win32':
-    from mic_monitor.platform.windows import WindowsMicrophoneMonitor as MicrophoneMonitor
-elif sys.platform == 'darwin':
-    from mic_monitor.platform.macos import MacOSMicrophoneMonitor as MicrophoneMonitor
-else:
-    # Linux or other platforms
-    logging.warning(f"Platform {sys.platform} not fully supported yet")
-    from mic_monitor.platform.windows import WindowsMicrophoneMonitor as MicrophoneMonitor
-
+# Platform backends are imported lazily when the monitor is created
+from mic_monitor import metrics
+from mic_monitor.platform import get_platform_monitor
+from mic_monitor.config import load_config
+from mic_monitor.icons import IconCache, pick_size, tray_icon_size
+from mic_monitor.scheduler import AdaptivePollScheduler
 from mic_monitor.status_manager import StatusManager
+from mic_monitor.snapshot import MODE_AWAY, MODE_DND, MODE_AVAILABLE
+
+# With a push-style watcher, ticks only refresh countdowns and expire overrides
+EVENT_DRIVEN_INTERVAL = 15
+
+# Distinct tray menus kept at once
+MENU_CACHE_SIZE = 16
+
+# How often the visible widget checks its update queue (milliseconds)
+WIDGET_DRAIN_MS = 200
+
+# Looked up once; the monitor thread records into them every tick
+TICK_SECONDS = metrics.histogram('mic_monitor_tick_seconds', "Time from probing the microphone to updating the tray")
+DETECTION_SECONDS = metrics.histogram('mic_monitor_detection_seconds',
+                                      "Time the platform backend took to report the microphone status")
+MIC_CHANGES = metrics.counter('mic_monitor_mic_changes_total', "Times the microphone went in or out of use")
+WAIT_SECONDS = metrics.gauge('mic_monitor_wait_seconds', "Current wait between monitor ticks")
 
 class StatusWidget:
-    """Desktop widget showing detailed status information"""
+    """
+    Desktop widget showing detailed status information.
+
+    The monitor thread publishes each tick's snapshot; only text that
+    differs from what was last published is queued, and the Tk event loop
+    drains the queue and rewrites just the label or lines that changed.
+    """
     
     def __init__(self, status_monitor):
         self.status_monitor = status_monitor
         self.window = None
         self.is_visible = False
+        self._updates = queue.Queue()
+        self._published = None   # (status text, detail lines) last queued, monitor thread
+        self._shown_text = None  # What the Tk widgets currently display, Tk thread
+        self._shown_lines = []
+        self._draining = False
+
+    def publish(self, snapshot):
+        """Queue a snapshot for display (thread-safe; called by the monitor thread)"""
+        view = (self._get_status_text(snapshot), self._format_details(snapshot).split("\n"))
+        if view == self._published:
+            return
+        self._published = view
+        # Keep at most one pending view: older ones would be overwritten anyway
+        while True:
+            try:
+                self._updates.get_nowait()
+            except queue.Empty:
+                break
+        self._updates.put(view)
         
     def create_window(self):
         """Create the status widget window"""
@@ -96,8 +133,11 @@ class StatusWidget:
         # Handle window close
         self.window.protocol("WM_DELETE_WINDOW", self.hide)
         
-        # Start updating
-        self.update_display()
+        # Show the latest snapshot, then follow published updates
+        status = self.status_monitor.get_full_status()
+        self._render(self._get_status_text(status), self._format_details(status).split("\n"))
+        self.is_visible = True
+        self._start_draining()
         
     def show(self):
         """Show the status widget"""
@@ -107,11 +147,15 @@ class StatusWidget:
             self.window.deiconify()
             self.window.lift()
             self.window.focus()
+            self.is_visible = True
+            self._start_draining()
             
     def hide(self):
         """Hide the status widget"""
         if self.window:
             self.window.withdraw()
+            # Stop draining; the newest queued view is applied when shown again
+            self.is_visible = False
             
     def set_status(self, status_type):
         """Set status from widget buttons"""
@@ -124,36 +168,56 @@ class StatusWidget:
         elif status_type == 'auto':
             self.status_monitor.return_to_auto()
             
+    def _start_draining(self):
+        if not self._draining:
+            self._draining = True
+            self.update_display()
+
     def update_display(self):
-        """Update widget display"""
-        if not self.window:
+        """Apply the newest queued update, if any, and check again shortly while visible"""
+        if not self.window or not self.is_visible:
+            self._draining = False
             return
             
-        status = self.status_monitor.get_full_status()
-        
-        # Update status text
-        status_text = self._get_status_text(status)
-        self.status_label.configure(text=status_text)
-        
-        # Update details
-        details = self._format_details(status)
-        self.details_text.delete('1.0', tk.END)
-        self.details_text.insert('1.0', details)
-        
-        # Schedule next update
-        self.window.after(1000, self.update_display)
+        view = None
+        while True:
+            try:
+                view = self._updates.get_nowait()
+            except queue.Empty:
+                break
+        # Only the newest view matters; nothing is touched while the status is stable
+        if view is not None:
+            self._render(*view)
+        
+        self.window.after(WIDGET_DRAIN_MS, self.update_display)
+
+    def _render(self, status_text, lines):
+        """Rewrite the label and the detail lines that differ from what is shown"""
+        if status_text != self._shown_text:
+            self.status_label.configure(text=status_text)
+            self._shown_text = status_text
+
+        shown = self._shown_lines
+        for index, line in enumerate(lines[:len(shown)]):
+            if line != shown[index]:
+                row = index + 1
+                self.details_text.delete(f"{row}.0", f"{row}.end")
+                self.details_text.insert(f"{row}.0", line)
+        if len(lines) > len(shown):
+            prefix = "\n" if shown else ""
+            self.details_text.insert(tk.END + "-1c", prefix + "\n".join(lines[len(shown):]))
+        elif len(lines) < len(shown):
+            # Remove the surplus rows, including the newline that ends the last kept row
+            self.details_text.delete(f"{len(lines)}.end", tk.END + "-1c")
+        self._shown_lines = list(lines)
         
     def _get_status_text(self, status):
         """Get friendly status text"""
-        if status.get('ignore_until'):
-            remaining = status['ignore_until'] - datetime.now()
-            minutes = max(0, int(remaining.total_seconds() / 60))
-            return f"🟡 Away ({minutes}m left)"
-        elif status.get('manual_busy'):
+        if status.mode == MODE_AWAY:
+            return f"🟡 Away ({status.away_minutes_left()}m left)"
+        elif status.mode == MODE_DND:
             return "🔵 Do Not Disturb"
-        elif status.get('manual_free'):
-            return "🟢 Available"
-        elif status.get('mic_in_use'):
+        elif status.in_meeting:
             return "🔴 In Meeting"
         else:
             return "🟢 Available"
@@ -163,17 +227,15 @@ class StatusWidget:
         lines = []
         
         # Show override status
-        if status.get('ignore_until'):
-            remaining = status['ignore_until'] - datetime.now()
-            minutes = max(0, int(remaining.total_seconds() / 60))
+        if status.mode == MODE_AWAY:
             lines.append(f"🟡 Away Mode active")
-            lines.append(f"Will return to Auto Mode in {minutes} minutes")
+            lines.append(f"Will return to Auto Mode in {status.away_minutes_left()} minutes")
             
-        elif status.get('manual_busy'):
+        elif status.mode == MODE_DND:
             lines.append("🔵 Do Not Disturb Mode active")
             lines.append("Manually set to busy")
             
-        elif status.get('manual_free'):
+        elif status.mode == MODE_AVAILABLE:
             lines.append("🟢 Available Mode active")
             lines.append("Manually set to available")
             
@@ -182,8 +244,8 @@ class StatusWidget:
             lines.append("Following microphone status")
             
         # Show microphone status
-        if status.get('mic_in_use'):
-            apps = status.get('using_apps', [])
+        if status.mic_in_use:
+            apps = status.using_apps
             if apps:
                 lines.append(f"\nMicrophone in use by:")
                 for app in apps:
@@ -194,7 +256,7 @@ class StatusWidget:
             lines.append("\nMicrophone not in use")
             
         # Show Luxafor status if available
-        luxafor = status.get('luxafor', {})
+        luxafor = status.luxafor
         if luxafor:
             lines.append("\nLuxafor Flag:")
             if luxafor.get('connected'):
@@ -225,122 +287,144 @@ class StatusWidget:
 class SecureMicrophoneMonitor:
     """Main application - secure microphone monitor with no open ports"""
     
-    def __init__(self):
-        self.mic_monitor = MicrophoneMonitor()
-        self.status_manager = StatusManager()
+    def __init__(self, config=None):
+        self.config = config or load_config()
+        self.scheduler = AdaptivePollScheduler.from_config(self.config)
+        self.mic_monitor = get_platform_monitor()
+        self.status_manager = StatusManager(self.config)
+        self.status_manager.on_override_expired = self._on_override_expired
+        self.snapshot = self.status_manager.snapshot()
+        self.last_probe = {'in_use': False, 'using_apps': []}
+        self._last_mic_in_use = None
         self.status_widget = StatusWidget(self)
         self.current_status = "🟢 Available"
         self.icon = None
+        # Every status color is rendered once; the tray only gets a new bitmap when the color changes
+        self.icons = IconCache()
+        self.icon_size = pick_size(self.config['tray_icon_size']) if self.config['tray_icon_size'] else tray_icon_size()
+        self._icon_color = None
+        self._icon_title = None
+        # Built menus keyed by _menu_key(); pystray only gets a new menu when the key changes
+        self._menus = {}
+        self._menu_key = None
         self.running = True
+        self.watcher = None
+        self._wakeup = threading.Event()
+        self.metrics_writer = metrics.MetricsWriter.from_config(metrics.REGISTRY, self.config)
         
         # Setup logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
         
     def get_full_status(self):
-        """Get complete status information"""
-        mic_status = self.mic_monitor.get_status()
-        return {
-            'mic_in_use': mic_status['in_use'],
-            'using_apps': mic_status['using_apps'],
-            'manual_busy': self.status_manager.manual_busy,
-            'manual_free': self.status_manager.manual_free,
-            'ignore_until': self.status_manager.ignore_until,
-            'luxafor': self.status_manager.get_device_status()[0] if self.status_manager.get_device_status() else {}
-        }
-        
-    def set_manual_status(self, is_busy: bool):
-        """Set manual status"""
-        self.status_manager.set_manual_status(is_busy)
+        """Get the status snapshot from the latest monitor tick"""
+        return self.snapshot
+        
+    def get_stats(self):
+        """Get runtime statistics"""
+        return {'scheduler': self.scheduler.stats()}
+        
+    def _apply_override(self):
+        """
+        Push an override to the devices right away, reusing the last mic probe.
+
+        Called on the Tk and override scheduler threads; StatusManager.refresh()
+        serialises this with the monitor loop's tick.
+        """
+        self.snapshot = self.status_manager.refresh(self.last_probe)
+        # Let the monitor loop redraw the tray right away
+        self._wakeup.set()
+        
+    def set_manual_status(self, is_busy: bool, minutes=None):
+        """Set manual status, returning to auto after ``minutes`` if given"""
+        self.status_manager.set_manual_status(is_busy, minutes)
         # Update devices immediately
-        self.status_manager.update_status(False)  # mic_in_use will be overridden by manual status
+        self._apply_override()
         
     def set_away_for(self, minutes: int):
         """Set away status"""
         self.status_manager.ignore_mic_for(minutes)
         # Update devices immediately
-        self.status_manager.update_status(False)
+        self._apply_override()
         
     def set_away_permanently(self):
         """Set away status until manually changed"""
         # Set ignore for a very long time (10 years = effectively permanent)
         self.status_manager.ignore_mic_for(10 * 365 * 24 * 60)  # 10 years in minutes
         # Update devices immediately
-        self.status_manager.update_status(False)
+        self._apply_override()
         print("🟡 Set to Away")
         
     def clear_override(self):
         """Clear all overrides"""
         self.status_manager.clear_override()
         # Update devices immediately
-        self.status_manager.update_status(False)
-        
-    def create_icon_image(self):
-        """Create system tray icon with status indicator"""
-        # Create base icon
-        image = Image.new('RGB', (64, 64), color=(245, 245, 245))
-        draw = ImageDraw.Draw(image)
-        
-        # Draw microphone shape
-        draw.ellipse([20, 15, 44, 35], fill=(100, 100, 100))
-        draw.rectangle([30, 35, 34, 45], fill=(100, 100, 100))
-        draw.rectangle([25, 45, 39, 50], fill=(100, 100, 100))
-        
-        # Add status indicator dot
-        status_color = self._get_status_color()
-        draw.ellipse([45, 15, 55, 25], fill=status_color)
+        self._apply_override()
+
+    def _on_override_expired(self):
+        """A timed override ended (called on the override scheduler thread)"""
+        self._apply_override()
+        print("🤖 Returned to Auto Mode")
         
-        return image
+    def create_icon_image(self, snapshot=None):
+        """Get the cached system tray icon for the current status"""
+        status_color = self._get_status_color(snapshot or self.snapshot)
+        return self.icons.get(status_color, self.icon_size)
             
-    def _get_status_color(self):
+    def _get_status_color(self, status):
         """Get status indicator color for tray icon"""
-        status = self.get_full_status()
-        
-        if status.get('ignore_until'):
-            return (255, 255, 0)  # Yellow - Away
-        elif status.get('manual_busy') or status.get('mic_in_use'):
-            return (255, 0, 0)    # Red - Do Not Disturb/In Meeting
-        elif status.get('manual_free'):
-            return (0, 255, 0)    # Green - Available
-        else:
-            return (0, 255, 0)    # Green - Available
+        # Yellow - Away, Red - Do Not Disturb/In Meeting, Green - Available
+        return status.color
             
-    def update_status_text(self):
+    def update_status_text(self, snapshot=None):
         """Update status text for tray"""
-        status = self.get_full_status()
+        status = snapshot or self.snapshot
         
-        if status.get('ignore_until'):
-            remaining = status['ignore_until'] - datetime.now()
-            minutes = max(0, int(remaining.total_seconds() / 60))
-            # If more than 24 hours (1440 minutes), treat as permanent
-            if minutes > 1440:
+        if status.mode == MODE_AWAY:
+            # More than 24 hours counts as permanent; the countdown moves in coarse steps
+            minutes = status.away_countdown()
+            if minutes is None:
                 self.current_status = "◐ Away"
             else:
                 self.current_status = f"◐ Away ({minutes}m left)"
-        elif status.get('manual_busy'):
+        elif status.mode == MODE_DND:
             self.current_status = "● Do Not Disturb (Busy)"
-        elif status.get('manual_free'):
+        elif status.mode == MODE_AVAILABLE:
             self.current_status = "○ Available"
-        elif status.get('mic_in_use'):
-            apps = status.get('using_apps', [])
+        elif status.in_meeting:
+            apps = status.using_apps
             app_text = f" • {apps[0]}" if apps else ""
             self.current_status = f"● In Meeting{app_text}"
         else:
             self.current_status = "○ Available"
             
-    def create_menu(self):
+    @staticmethod
+    def menu_key(snapshot):
+        """Everything the tray menu shows: a new menu is only built when this changes"""
+        app = snapshot.using_apps[0] if snapshot.in_meeting and snapshot.using_apps else None
+        away = snapshot.away_countdown() if snapshot.mode == MODE_AWAY else None
+        return snapshot.mode, snapshot.in_meeting, away, app
+
+    def get_menu(self, snapshot):
+        """Return the tray menu for a snapshot, building it only for an unseen key"""
+        key = self.menu_key(snapshot)
+        menu = self._menus.get(key)
+        if menu is None:
+            if len(self._menus) >= MENU_CACHE_SIZE:
+                # Countdown steps and app names come and go; start over rather than grow
+                self._menus.clear()
+            menu = self._menus[key] = self.create_menu(snapshot)
+        return key, menu
+
+    def create_menu(self, snapshot=None):
         """Create enhanced tray menu"""
-        status = self.get_full_status()
+        status = snapshot or self.snapshot
         
         # Determine current state for checkmarks
-        is_auto = not any([
-            status.get('manual_busy', False),
-            status.get('manual_free', False),
-            status.get('ignore_until')
-        ])
-        is_away = bool(status.get('ignore_until'))
-        is_dnd = status.get('manual_busy', False)
-        is_available_manual = status.get('manual_free', False)
-        is_in_meeting = status.get('mic_in_use', False) and is_auto
+        is_auto = status.is_auto
+        is_away = status.mode == MODE_AWAY
+        is_dnd = status.mode == MODE_DND
+        is_available_manual = status.mode == MODE_AVAILABLE
+        is_in_meeting = status.in_meeting
         
         menu_items = [
             # === CURRENT STATUS ===
@@ -419,24 +503,16 @@ class SecureMicrophoneMonitor:
         
     def set_available(self, minutes=None):
         """Set available status with optional duration"""
-        self.set_manual_status(False)
+        self.set_manual_status(False, minutes)
         if minutes:
-            # Schedule return to auto
-            timer = threading.Timer(minutes * 60, self.return_to_auto)
-            timer.daemon = True
-            timer.start()
             print(f"👋 Set to Available for {minutes} minutes")
         else:
             print("👋 Set to Available")
         
     def set_do_not_disturb(self, minutes=None):
         """Set do not disturb status with optional duration"""
-        self.set_manual_status(True)
+        self.set_manual_status(True, minutes)
         if minutes:
-            # Schedule return to auto
-            timer = threading.Timer(minutes * 60, self.return_to_auto)
-            timer.daemon = True
-            timer.start()
             print(f"🔵 Set to Do Not Disturb for {minutes} minutes")
         else:
             print("🔵 Set to Do Not Disturb")
@@ -505,34 +581,70 @@ Made with ❤️ by your friends at PySimpleGUI"""
         except:
             print(about_text)
             
-    def update_icon(self):
+    def update_icon(self, snapshot=None):
         """Update system tray icon"""
-        self.update_status_text()
-        self.icon.icon = self.create_icon_image()
-        self.icon.menu = self.create_menu()
-        self.icon.title = self.current_status
+        snapshot = snapshot or self.snapshot
+        self.update_status_text(snapshot)
+        # Assigning icon or title makes pystray push it to the OS, so only do it on change
+        if snapshot.color != self._icon_color:
+            self.icon.icon = self.create_icon_image(snapshot)
+            self._icon_color = snapshot.color
+        key, menu = self.get_menu(snapshot)
+        if key != self._menu_key:
+            self.icon.menu = menu
+            self._menu_key = key
+        if self.current_status != self._icon_title:
+            self.icon.title = self.current_status
+            self._icon_title = self.current_status
+        
+    def tick(self):
+        """
+        Probe the microphone once, update the devices, tray and widget.
+
+        Returns:
+            float: Seconds to wait before the next tick
+        """
+        tick_started = time.perf_counter()
+        probe = self.scheduler.start_probe()
+        mic_status = self.mic_monitor.get_status()
+        DETECTION_SECONDS.observe(time.perf_counter() - tick_started)
+        # Compare raw probes: the snapshot holds the old state while a transition is debounced
+        changed = (mic_status['in_use'], mic_status['using_apps']) != (
+            self.last_probe['in_use'], self.last_probe['using_apps'])
+        self.last_probe = mic_status
+        self.scheduler.finish_probe(probe, changed)
+        
+        # Log mic status changes for debugging
+        if mic_status['in_use'] != self._last_mic_in_use:
+            MIC_CHANGES.inc()
+            if mic_status['in_use']:
+                print(f"🎤 Microphone detected in use by: {mic_status['using_apps']}")
+            else:
+                print("🎤 Microphone not in use")
+            self._last_mic_in_use = mic_status['in_use']
+        
+        # Resolve the status once; every consumer shares this snapshot
+        self.snapshot = self.status_manager.refresh(mic_status)
+        
+        # Update icon and widget
+        self.update_icon(self.snapshot)
+        self.status_widget.publish(self.snapshot)
+        TICK_SECONDS.observe(time.perf_counter() - tick_started)
+        timeout = EVENT_DRIVEN_INTERVAL if self.watcher else self.scheduler.next_interval()
+        # Wake up in time to confirm a pending meeting start/end
+        pending = self.status_manager.debouncer.time_to_decision()
+        if pending is not None:
+            timeout = min(timeout, pending + 0.05)
+        WAIT_SECONDS.set(timeout)
+        return timeout
         
     def monitor_loop(self):
         """Main monitoring loop"""
-        last_mic_status = None
         while self.running:
             try:
-                # Check microphone status and update devices
-                mic_status = self.mic_monitor.get_status()
-                
-                # Log mic status changes for debugging
-                if mic_status['in_use'] != last_mic_status:
-                    if mic_status['in_use']:
-                        print(f"🎤 Microphone detected in use by: {mic_status['using_apps']}")
-                    else:
-                        print("🎤 Microphone not in use")
-                    last_mic_status = mic_status['in_use']
-                
-                self.status_manager.update_status(mic_status['in_use'])
-                
-                # Update icon every second
-                self.update_icon()
-                time.sleep(1)
+                # Sleep until the next tick or a watcher event
+                self._wakeup.wait(self.tick())
+                self._wakeup.clear()
             except Exception as e:
                 logging.error(f"Error in monitor loop: {e}")
                 time.sleep(5)  # Wait longer on error
@@ -555,12 +667,24 @@ Made with ❤️ by your friends at PySimpleGUI"""
         print("🎯 Tray icon should appear shortly")
         
         # Create and start system tray icon
+        self.update_status_text()
+        self._menu_key, menu = self.get_menu(self.snapshot)
         self.icon = pystray.Icon(
             "MicrophoneMonitor",
             self.create_icon_image(),
             self.current_status,
-            self.create_menu()
+            menu
         )
+        self._icon_color = self.snapshot.color
+        self._icon_title = self.current_status
+        
+        # Prefer push-style detection where the platform monitor supports it
+        watch = getattr(self.mic_monitor, 'watch', None)
+        if watch:
+            self.watcher = watch(lambda status: self._wakeup.set())
+        
+        if self.metrics_writer:
+            self.metrics_writer.start()
         
         # Start monitor thread
         monitor_thread = threading.Thread(target=self.monitor_loop)
@@ -573,6 +697,11 @@ Made with ❤️ by your friends at PySimpleGUI"""
     def stop(self):
         """Stop the application"""
         self.running = False
+        self._wakeup.set()
+        if self.watcher:
+            self.watcher.stop()
+        if self.metrics_writer:
+            self.metrics_writer.stop()
         self.icon.stop()
 
 def main():
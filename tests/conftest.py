@@ -0,0 +1,21 @@
+import time
+import pytest
+from mic_monitor.config import DEFAULTS
+
+
+@pytest.fixture
+def wait_until():
+    """Poll until a condition set by a background thread holds; fails the test on timeout"""
+    def wait(predicate, timeout=3.0, interval=0.01):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                pytest.fail(f"Timed out after {timeout}s waiting for {predicate}")
+            time.sleep(interval)
+    return wait
+
+
+@pytest.fixture
+def config():
+    """Settings without device drivers or dwell times, so transitions reach devices on the tick they happen"""
+    return dict(DEFAULTS, devices={}, meeting_confirm_seconds=0, meeting_end_seconds=0, metrics_interval=0)
@@ -0,0 +1,49 @@
+"""
+Stand-in helper for exercising HelperProcess without PowerShell or osascript
+
+    python tests/helper_stub.py
+
+Speaks the same line protocol as the real helpers. Requests pick a
+behaviour with "op":
+
+    echo   reply with the request's "value"
+    sleep  wait "seconds" before replying (a stalled helper)
+    crash  exit without replying
+    noise  print a non-JSON line before the reply
+    fail   reply with ok=false
+    pid    reply with the helper's process id (to tell restarts apart)
+"""
+import json
+import os
+import sys
+import time
+
+
+def reply(request_id, **fields):
+    sys.stdout.write(json.dumps(dict(fields, id=request_id)) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    for line in sys.stdin:
+        request = json.loads(line)
+        request_id = request.get('id')
+        op = request.get('op')
+        if op == 'sleep':
+            time.sleep(request.get('seconds', 60))
+            reply(request_id, ok=True, result=None)
+        elif op == 'crash':
+            sys.exit(1)
+        elif op == 'noise':
+            sys.stdout.write("WARNING: not a reply\n")
+            reply(request_id, ok=True, result=request.get('value'))
+        elif op == 'fail':
+            reply(request_id, ok=False, error="requested failure")
+        elif op == 'pid':
+            reply(request_id, ok=True, result=os.getpid())
+        else:
+            reply(request_id, ok=True, result=request.get('value'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+HelperProcess and HelperPool against the stub helper
+"""
+import asyncio
+import os
+import sys
+import time
+import pytest
+from mic_monitor.helper_host import HelperError, HelperPool, HelperProcess
+
+STUB = [sys.executable, os.path.join(os.path.dirname(__file__), 'helper_stub.py')]
+
+
+def run(helper, body):
+    """Run ``body(helper)`` in a fresh event loop and close the helper afterwards"""
+    async def main():
+        try:
+            return await body(helper)
+        finally:
+            await helper.close()
+    return asyncio.run(main())
+
+
+def test_requests_share_one_process():
+    async def body(helper):
+        results = [await helper.request({'op': 'echo', 'value': n}) for n in range(3)]
+        return results, await helper.request({'op': 'noise', 'value': 'after'})
+
+    helper = HelperProcess('stub', STUB)
+    assert run(helper, body) == ([0, 1, 2], 'after')
+    assert helper.starts == 1
+    assert helper.requests == 4
+
+
+def test_error_reply_keeps_the_helper():
+    async def body(helper):
+        pid = await helper.request({'op': 'pid'})
+        with pytest.raises(HelperError, match="requested failure"):
+            await helper.request({'op': 'fail'})
+        return pid, await helper.request({'op': 'pid'})
+
+    helper = HelperProcess('stub', STUB)
+    first, second = run(helper, body)
+    assert first == second
+    assert helper.failures == 0
+
+
+def test_crashed_helper_restarts_after_backoff():
+    async def body(helper):
+        pid = await helper.request({'op': 'pid'})
+        with pytest.raises(HelperError, match="exited"):
+            await helper.request({'op': 'crash'})
+        # Requests during the back-off fail without starting a process
+        with pytest.raises(HelperError, match="restarting"):
+            await helper.request({'op': 'pid'})
+        await asyncio.sleep(0.25)
+        return pid, await helper.request({'op': 'pid'})
+
+    helper = HelperProcess('stub', STUB, restart_delay=0.2)
+    first, second = run(helper, body)
+    assert first != second
+    assert helper.starts == 2
+    assert helper.failures == 1
+
+
+def test_stalled_helper_is_killed():
+    async def body(helper):
+        with pytest.raises(HelperError, match="stalled"):
+            await helper.request({'op': 'sleep', 'seconds': 30}, timeout=0.3)
+        return helper.running
+
+    helper = HelperProcess('stub', STUB, restart_delay=0.0)
+    assert run(helper, body) is False
+    assert helper.failures == 1
+
+
+def test_cancelled_request_does_not_kill_the_helper():
+    async def body(helper):
+        pid = await helper.request({'op': 'pid'})
+        with pytest.raises(asyncio.TimeoutError):
+            # The caller's deadline, not the helper's timeout
+            await asyncio.wait_for(helper.request({'op': 'sleep', 'seconds': 0.3}), 0.05)
+        # The late reply to the abandoned request is skipped
+        return pid, await helper.request({'op': 'pid'})
+
+    helper = HelperProcess('stub', STUB)
+    first, second = run(helper, body)
+    assert first == second
+    assert helper.failures == 0
+
+
+def test_timeout_starts_when_the_request_is_sent():
+    async def body(helper):
+        slow = asyncio.ensure_future(helper.request({'op': 'sleep', 'seconds': 0.4}))
+        await asyncio.sleep(0)
+        # Queued for 0.4 s behind the first request, longer than its own timeout
+        queued = await helper.request({'op': 'echo', 'value': 'queued'}, timeout=0.3)
+        await slow
+        return queued
+
+    helper = HelperProcess('stub', STUB, timeout=1.0)
+    assert run(helper, body) == 'queued'
+    assert helper.failures == 0
+
+
+def test_pool_runs_requests_in_parallel():
+    async def body(pool):
+        # Start every helper first so process start-up is not timed
+        await asyncio.gather(*(pool.request({'op': 'echo'}) for _ in range(3)))
+        started = time.monotonic()
+        await asyncio.gather(*(pool.request({'op': 'sleep', 'seconds': 0.3}) for _ in range(6)))
+        return time.monotonic() - started
+
+    pool = HelperPool('stub', STUB, size=3)
+    elapsed = run(pool, body)
+    # Two rounds of three, not six in a row
+    assert 0.6 <= elapsed < 1.2
+    assert [helper.starts for helper in pool.helpers] == [1, 1, 1]
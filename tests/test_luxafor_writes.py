@@ -0,0 +1,135 @@
+"""
+USB writes per status transition, counted with RecordingTransport
+"""
+import pytest
+from mic_monitor.devices.luxafor import LuxaforDevice
+from mic_monitor.devices.luxafor_hid import HidTransport, LoopbackBackend
+from mic_monitor.devices.luxafor_protocol import (EFFECT_STATIC, MODE_FADE, MODE_STROBE, Effect,
+                                                  LibraryTransport, RecordingTransport, static_report)
+from mic_monitor.snapshot import STATE_COLORS
+from mic_monitor.status_manager import StatusManager
+
+IDLE = {'in_use': False, 'using_apps': []}
+MEETING = {'in_use': True, 'using_apps': ['zoom']}
+
+
+@pytest.fixture
+def flag(config):
+    """A StatusManager driving one attached flag; yields (manager, device, transport)"""
+    transport = RecordingTransport()
+    device = LuxaforDevice(transport_factory=lambda: transport,
+                           effects={'meeting': Effect('strobe', STATE_COLORS['meeting'], speed=20, repeat=255)})
+    assert device.attach()
+    manager = StatusManager(config)
+    manager.register_device(device)
+    yield manager, device, transport
+    manager.cleanup()
+
+
+def tick(manager, mic_status):
+    manager.refresh(mic_status)
+    assert manager.wait_for_devices(2.0)
+
+
+def test_one_write_per_transition(flag):
+    manager, _, transport = flag
+
+    tick(manager, IDLE)
+    assert transport.writes == 1
+    for _ in range(10):
+        tick(manager, IDLE)
+    assert transport.writes == 1
+
+    tick(manager, MEETING)
+    tick(manager, MEETING)
+    assert transport.writes == 2
+    assert transport.reports[-1][0] == MODE_STROBE
+
+    tick(manager, IDLE)
+    assert transport.writes == 3
+    assert transport.reports[-1] == static_report(0xFF, *STATE_COLORS['available'])
+
+
+def test_forced_resync_writes_once(flag):
+    manager, device, transport = flag
+    tick(manager, MEETING)
+
+    manager.resync_device(device)
+    assert manager.wait_for_devices(2.0)
+    tick(manager, MEETING)
+
+    assert transport.writes == 2
+    assert transport.reports[0] == transport.reports[1]
+
+
+def test_failed_write_is_retried_after_reattach(flag):
+    manager, device, transport = flag
+    transport.fail = OSError(32, "Broken pipe")
+
+    tick(manager, IDLE)
+    assert not device.is_connected()
+    tick(manager, IDLE)
+    assert transport.writes == 0
+
+    transport.fail = None
+    assert device.attach()
+    manager.resync_device(device)
+    assert manager.wait_for_devices(2.0)
+    assert transport.writes == 1
+
+
+def test_effect_is_a_single_report():
+    transport = RecordingTransport()
+    device = LuxaforDevice(transport_factory=lambda: transport)
+    device.attach()
+
+    assert device.play(Effect('strobe', (255, 0, 0), speed=20, repeat=255))
+    assert device.fade_to(0, 255, 0)
+
+    assert transport.writes == 2
+    assert [report[0] for report in transport.reports] == [MODE_STROBE, MODE_FADE]
+
+
+def test_hid_handle_is_kept_open_and_closed_on_failure():
+    backend = LoopbackBackend()
+    device = LuxaforDevice(transport_factory=lambda: HidTransport(backend))
+    assert device.attach()
+
+    for _ in range(3):
+        assert device.set_color(255, 0, 0)
+    assert (backend.opens, len(backend.buffers)) == (1, 3)
+
+    backend.fail = OSError(19, "No such device")
+    assert not device.set_color(0, 255, 0)
+    assert not device.is_connected()
+    assert backend.closes == 1
+
+    backend.fail = None
+    assert device.attach()
+    assert device.set_color(0, 255, 0)
+    assert (backend.opens, len(backend.buffers)) == (2, 4)
+
+
+class StaticOnlyHandle:
+    """A luxafor library handle from the versions without write()"""
+
+    def __init__(self):
+        self.colors = []
+
+    def set_color(self, r, g, b, led):
+        self.colors.append((r, g, b, led))
+
+
+def test_unsupported_effect_falls_back_to_a_solid_color():
+    handle = StaticOnlyHandle()
+    device = LuxaforDevice(transport_factory=lambda: LibraryTransport(handle),
+                           effects={'meeting': Effect('strobe', STATE_COLORS['meeting'], speed=20, repeat=255)})
+    device.attach()
+
+    assert device.set_state('meeting')
+    assert device.set_state('meeting')
+
+    # The flag stays attached and shows the status color instead of the strobe
+    assert device.is_connected()
+    assert handle.colors == [(*STATE_COLORS['meeting'], 0xFF)] * 2
+    assert device.status['last_effect'] == EFFECT_STATIC
@@ -0,0 +1,131 @@
+"""
+PipeWire backend against recorded pw-dump output replayed through a stub process
+"""
+import os
+import threading
+from mic_monitor.platform.pipewire import JsonStreamSplitter, PipeWireStreamMonitor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'pw-dump')
+
+
+def fixture(name) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def first_documents(data, count) -> bytes:
+    """The first ``count`` updates of a recording (each starts with "[" at the start of a line)"""
+    return b'\n['.join(data.split(b'\n[')[:count]) + b'\n'
+
+
+class StubStdout:
+    """Hands out recorded output in fixed-size reads, then blocks like an idle pw-dump"""
+
+    def __init__(self, data, chunk_size):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.closed = threading.Event()
+
+    def read1(self, size):
+        if not self.data:
+            self.closed.wait()
+            return b''
+        chunk, self.data = self.data[:self.chunk_size], self.data[self.chunk_size:]
+        return chunk
+
+    read = read1
+
+
+class StubProcess:
+    pid = -1
+
+    def __init__(self, data, chunk_size=65536):
+        self.stdout = StubStdout(data, chunk_size)
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.returncode = -15
+        self.stdout.closed.set()
+
+    def wait(self):
+        self.stdout.closed.wait()
+        return self.returncode
+
+
+def start_monitor(data, chunk_size=65536):
+    processes = []
+
+    def popen(command, **kwargs):
+        processes.append(StubProcess(data, chunk_size))
+        return processes[-1]
+
+    monitor = PipeWireStreamMonitor(popen_factory=popen, restart_delay=0.01, startup_timeout=2.0)
+    return monitor, processes
+
+
+def replay(data, chunk_size=65536):
+    """Feed recorded output through _consume() and collect listener notifications"""
+    monitor = PipeWireStreamMonitor()
+    notifications = []
+    monitor.watch(notifications.append)
+    monitor._running = True
+    process = StubProcess(data, chunk_size)
+    process.terminate()
+    monitor._consume(process.stdout)
+    return monitor, notifications
+
+
+def test_idle_dump_has_no_recording_clients():
+    monitor, notifications = replay(fixture('idle.json'))
+
+    assert monitor.get_status() == {'in_use': False, 'using_apps': [], 'devices': [], 'platform': 'linux'}
+    assert notifications == []
+
+
+def test_meeting_start_and_end_are_notified_once_each():
+    monitor, notifications = replay(fixture('meeting.json'))
+
+    assert [(status['in_use'], status['using_apps']) for status in notifications] == [
+        (True, ['ZOOM VoiceEngine']),
+        (False, []),
+    ]
+    assert notifications[0]['devices'] == ['Audio interne Stéréo analogique']
+    assert monitor.get_status()['in_use'] is False
+    assert monitor.graph.links == {}
+
+
+def test_peak_meters_are_not_recording():
+    monitor, _ = replay(first_documents(fixture('meeting.json'), 2))
+
+    # pavucontrol's peak-detect stream is running alongside Zoom's
+    assert monitor.get_status()['using_apps'] == ['ZOOM VoiceEngine']
+
+
+def test_characters_split_across_reads_are_decoded_whole():
+    monitor, notifications = replay(fixture('meeting.json'), chunk_size=1)
+
+    assert notifications[0]['devices'] == ['Audio interne Stéréo analogique']
+    assert [status['in_use'] for status in notifications] == [True, False]
+
+
+def test_splitter_ignores_text_between_documents_and_brackets_in_strings():
+    splitter = JsonStreamSplitter()
+
+    values = splitter.feed('warning: x\n[{"name": "a]}"},')
+    values += splitter.feed(' {"id": 2}]\n[]')
+
+    assert values == [[{'name': 'a]}'}, {'id': 2}], []]
+
+
+def test_status_is_answered_from_the_running_process():
+    monitor, processes = start_monitor(first_documents(fixture('meeting.json'), 2))
+    monitor.start()
+    try:
+        assert monitor.get_status()['using_apps'] == ['ZOOM VoiceEngine']
+        assert len(processes) == 1
+    finally:
+        monitor.stop()
+    assert processes[0].poll() is not None
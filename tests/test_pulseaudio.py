@@ -0,0 +1,74 @@
+"""
+PulseSourceOutputMonitor against the in-process fake server
+"""
+import pytest
+from mic_monitor.platform.pulseaudio import PulseSourceOutputMonitor
+from mic_monitor.platform.pulseaudio_fake import FakePulseServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = FakePulseServer(str(tmp_path / 'native'))
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def monitor(server):
+    monitor = PulseSourceOutputMonitor(server_path=server.path, reconnect_delay=0.05, startup_timeout=2.0)
+    monitor.start()
+    yield monitor
+    monitor.stop()
+
+
+def test_recording_clients_are_followed(server, monitor, wait_until):
+    notifications = []
+    monitor.watch(notifications.append)
+    assert monitor.get_status()['in_use'] is False
+
+    zoom = server.add_source_output('Zoom', pid=1234)
+    wait_until(lambda: monitor.get_status()['in_use'])
+    assert monitor.get_status()['using_apps'] == ['Zoom']
+
+    server.set_corked(zoom, True)
+    wait_until(lambda: not monitor.get_status()['in_use'])
+    server.set_corked(zoom, False)
+    wait_until(lambda: monitor.get_status()['in_use'])
+
+    server.remove_source_output(zoom)
+    wait_until(lambda: not monitor.get_status()['in_use'])
+    assert [status['in_use'] for status in notifications] == [True, False, True, False]
+
+
+def test_peak_meters_are_not_recording(server, monitor, wait_until):
+    server.add_source_output('PulseAudio Volume Control', peak_detect=True)
+    server.add_source_output('Firefox')
+
+    wait_until(lambda: monitor.get_status()['in_use'])
+    assert monitor.get_status()['using_apps'] == ['Firefox']
+
+
+def test_reconnects_after_server_restart(server, monitor, wait_until):
+    server.add_source_output('Zoom')
+    wait_until(lambda: monitor.get_status()['in_use'])
+    assert monitor.connections == 1
+
+    server.restart()
+    wait_until(lambda: monitor.connections == 2)
+    assert monitor.get_status()['in_use'] is False
+
+    # Events are delivered on the new connection
+    server.add_source_output('Discord')
+    wait_until(lambda: monitor.get_status()['in_use'])
+    assert monitor.get_status()['using_apps'] == ['Discord']
+
+
+def test_clients_present_at_connect_are_listed(server):
+    server.add_source_output('Zoom')
+    monitor = PulseSourceOutputMonitor(server_path=server.path, startup_timeout=2.0)
+    monitor.start()
+    try:
+        assert monitor.get_status()['using_apps'] == ['Zoom']
+    finally:
+        monitor.stop()
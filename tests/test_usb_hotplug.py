@@ -0,0 +1,230 @@
+"""
+UsbConnectionManager against a fake sysfs tree
+"""
+import time
+import pytest
+from mic_monitor.devices.luxafor import LUXAFOR_PRODUCT_ID, LUXAFOR_VENDOR_ID, LuxaforDevice
+from mic_monitor.devices.luxafor_protocol import LED_ALL, LED_BACK, LED_FRONT, RecordingTransport, static_report
+from mic_monitor.devices.usb_hotplug import UsbConnectionManager, find_usb_devices
+from mic_monitor.snapshot import STATE_COLORS
+from mic_monitor.status_manager import StatusManager
+
+IDLE = {'in_use': False, 'using_apps': []}
+
+
+def plug(sysfs, bus_path, serial='A1B2C3'):
+    device = sysfs / bus_path
+    device.mkdir()
+    (device / 'idVendor').write_text(LUXAFOR_VENDOR_ID + '\n')
+    (device / 'idProduct').write_text(LUXAFOR_PRODUCT_ID + '\n')
+    if serial is not None:
+        (device / 'serial').write_text(serial + '\n')
+
+
+def unplug(sysfs, bus_path):
+    for attribute in (sysfs / bus_path).iterdir():
+        attribute.unlink()
+    (sysfs / bus_path).rmdir()
+
+
+class Flags:
+    """Device factory whose transports share one failure switch; counts every attach"""
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.fail = None
+        self.transports = []
+
+    def open(self):
+        transport = RecordingTransport()
+        transport.fail = self.fail
+        self.transports.append(transport)
+        return transport
+
+    def create(self, bus_path, serial):
+        return LuxaforDevice.from_config(self.config, transport_factory=self.open, bus_path=bus_path, serial=serial)
+
+    @property
+    def attaches(self):
+        return len(self.transports)
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    (tmp_path / 'usb1').mkdir()
+    # An interface entry, which has no IDs of its own
+    (tmp_path / '1-2:1.0').mkdir()
+    return tmp_path
+
+
+def write_on_attach(device):
+    """Stands in for StatusManager.resync_device(): rewrite the status as soon as the flag is attached"""
+    device.set_color(0, 255, 0)
+
+
+def test_find_usb_devices(sysfs):
+    plug(sysfs, '1-2', serial='A1')
+    plug(sysfs, '1-4.1', serial='B2')
+
+    assert find_usb_devices(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, str(sysfs)) == {'1-2': 'A1', '1-4.1': 'B2'}
+    assert find_usb_devices(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, str(sysfs / 'missing')) is None
+
+
+def test_attach_on_plug_and_detach_on_unplug(sysfs):
+    flags = Flags()
+    manager = UsbConnectionManager(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, flags.create,
+                                   on_attach=write_on_attach, sysfs_root=str(sysfs))
+    manager.check()
+    assert manager.devices == []
+
+    plug(sysfs, '1-2')
+    manager.check()
+    (device,) = manager.devices
+    assert device.is_connected()
+    assert flags.transports[0].writes == 1
+
+    unplug(sysfs, '1-2')
+    manager.check()
+    assert not device.is_connected()
+
+    plug(sysfs, '1-2')
+    manager.check()
+    assert device.is_connected()
+    assert flags.attaches == 2
+
+
+def test_write_failures_back_off_exponentially(sysfs):
+    flags = Flags()
+    flags.fail = OSError(5, "Input/output error")
+    manager = UsbConnectionManager(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, flags.create,
+                                   on_attach=write_on_attach, sysfs_root=str(sysfs),
+                                   retry_delay=1.0, max_retry_delay=4.0)
+    plug(sysfs, '1-2')
+
+    # The flag opens, the first write fails and detaches it again
+    now = time.monotonic()
+    manager.check(now)
+    assert flags.attaches == 1
+    manager.check(now)
+    assert flags.attaches == 1
+
+    slot = manager._slots['1-2']
+    delays = [slot.next_attempt - time.monotonic()]
+    for _ in range(3):
+        manager.check(slot.next_attempt + 0.001)
+        delays.append(slot.next_attempt - time.monotonic())
+    assert flags.attaches == 4
+    assert [round(delay) for delay in delays] == [1, 2, 4, 4]
+
+    # A successful write resets the backoff
+    flags.fail = None
+    manager.check(slot.next_attempt + 0.001)
+    assert manager.devices[0].is_connected()
+    assert slot.backoff == 1.0
+
+
+def test_failing_flag_does_not_spin(sysfs, config):
+    flags = Flags()
+    flags.fail = OSError(32, "Broken pipe")
+    status = StatusManager(config)
+    status.refresh(IDLE)
+    manager = UsbConnectionManager(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, flags.create,
+                                   on_new_device=status.register_device, on_attach=status.resync_device,
+                                   sysfs_root=str(sysfs), retry_delay=0.2)
+    plug(sysfs, '1-2')
+    manager.start()
+    try:
+        time.sleep(1.0)
+    finally:
+        manager.stop()
+        status.cleanup()
+
+    # Attempts at 0, 0.2, 0.6 s; before the fix this was thousands
+    assert 2 <= flags.attaches <= 4
+
+
+def test_replugged_flag_replaces_its_device(sysfs, config):
+    flags = Flags()
+    status = StatusManager(config)
+    status.refresh(IDLE)
+    manager = UsbConnectionManager(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, flags.create,
+                                   on_new_device=status.register_device, on_attach=status.resync_device,
+                                   on_removed_device=status.unregister_device, sysfs_root=str(sysfs))
+    try:
+        plug(sysfs, '1-2', serial='A1')
+        manager.check()
+        unplug(sysfs, '1-2')
+        manager.check()
+        plug(sysfs, '1-3', serial='A1')
+        manager.check()
+
+        # The device left at the old port is unregistered, not kept as a disconnected ghost
+        assert [device.bus_path for device in manager.devices] == ['1-3']
+        (flag,) = status.get_device_status()
+        assert (flag['bus_path'], flag['connected']) == ('1-3', True)
+        assert status.snapshot().luxafor['bus_path'] == '1-3'
+    finally:
+        status.cleanup()
+
+
+def test_flag_without_serial_is_forgotten_after_a_while(sysfs):
+    flags = Flags()
+    removed = []
+    manager = UsbConnectionManager(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, flags.create,
+                                   on_removed_device=removed.append, sysfs_root=str(sysfs), forget_after=10.0)
+    plug(sysfs, '1-2', serial=None)
+    now = time.monotonic()
+    manager.check(now)
+    (device,) = manager.devices
+
+    unplug(sysfs, '1-2')
+    manager.check(now + 1)
+    assert manager.devices == [device]
+    manager.check(now + 11)
+    assert manager.devices == []
+    assert removed == [device]
+
+
+def test_every_flag_gets_its_own_device_and_leds(sysfs, config):
+    config['luxafor_flags'] = {
+        'A1': {'led': 'front'},
+        # The serial number takes precedence over the bus path
+        '1-2': {'led': 'back'},
+        '1-4.2': {'led': 'back'},
+        'C3': {'led': 3},
+        'D4': {'enabled': False},
+        '*': {'led': 'all'},
+    }
+    flags = Flags(config)
+    status = StatusManager(config)
+    manager = UsbConnectionManager(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, flags.create,
+                                   on_new_device=status.register_device, on_attach=status.resync_device,
+                                   sysfs_root=str(sysfs))
+    for bus_path, serial in [('1-2', 'A1'), ('1-4.2', 'B2'), ('1-5', 'C3'), ('1-6', 'D4'), ('1-7', 'E5')]:
+        plug(sysfs, bus_path, serial=serial)
+    try:
+        manager.check()
+        status.refresh(IDLE)
+        assert status.wait_for_devices(2.0)
+
+        leds = {device.bus_path: device.led for device in manager.devices}
+        assert leds == {'1-2': LED_FRONT, '1-4.2': LED_BACK, '1-5': 3, '1-7': LED_ALL}
+        for device in manager.devices:
+            assert device.transport.reports == [static_report(device.led, *STATE_COLORS['available'])]
+        assert len(status.get_device_status()) == 4
+    finally:
+        status.cleanup()
+
+
+def test_flags_can_be_disabled_by_default(sysfs, config):
+    config['luxafor_flags'] = {'B2': {'led': 'back'}, '*': {'enabled': False}}
+    flags = Flags(config)
+    manager = UsbConnectionManager(LUXAFOR_VENDOR_ID, LUXAFOR_PRODUCT_ID, flags.create, sysfs_root=str(sysfs))
+    plug(sysfs, '1-2', serial='A1')
+    plug(sysfs, '1-3', serial='B2')
+
+    manager.check()
+    manager.check()
+
+    assert [(device.serial, device.led) for device in manager.devices] == [('B2', LED_BACK)]
+    assert flags.attaches == 1